@@ -0,0 +1,160 @@
+import asyncio
+import threading
+from contextlib import ExitStack
+
+import logs
+from benchmarks.runner import benchmark
+from logs import Filterer, Formatter, LogRecord, StreamHandler, get_logger
+from logs.bind import bind
+from logs.filters import ExtraFilter, NameFilter
+from logs.formatters import CompiledFormatter, JSONFormatter
+from logs.levels import FiltererLevel, LogLevel
+
+
+class _Sink:
+    """An in-memory stream that only counts what is written to it"""
+
+    def __init__(self) -> None:
+        self.written = 0
+
+    def write(self, text: str) -> int:
+        self.written += len(text)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def _reset() -> StreamHandler:
+    """Reset logging to a root logger that writes into a _Sink"""
+    logs.reset()
+    root = get_logger("")
+    for handler in list(root.handlers):
+        root.remove_handler(handler)
+    handler = StreamHandler(stream=_Sink())  # type: ignore[arg-type]
+    root.add_handler(handler)
+    return handler
+
+
+def _logger_at_depth(depth: int) -> logs.Logger:
+    return get_logger(".".join(f"level{idx}" for idx in range(depth)))
+
+
+def _passthrough(record: LogRecord) -> LogRecord:
+    return record
+
+
+for depth in (1, 5, 20):
+
+    @benchmark(f"disabled/depth={depth}", loops=100_000)
+    def disabled(depth: int = depth):
+        _reset()
+        logger = _logger_at_depth(depth)
+        return lambda: logger.debug("disabled {extra[key]}", extra={"key": 1})
+
+    @benchmark(f"enabled/stream/depth={depth}", loops=10_000)
+    def enabled(depth: int = depth):
+        _reset()
+        logger = _logger_at_depth(depth)
+        return lambda: logger.info("enabled {extra[key]}", extra={"key": 1})
+
+
+for nesting in (1, 5, 20):
+
+    @benchmark(f"bind/nesting={nesting}", loops=5_000)
+    def nested_bind(nesting: int = nesting):
+        _reset()
+        logger = get_logger("svc")
+
+        def run() -> None:
+            with ExitStack() as stack:
+                for idx in range(nesting):
+                    stack.enter_context(bind(logger, **{f"key{idx}": idx}))
+                logger.info("bound")
+
+        return run
+
+
+for chain in (0, 5, 50):
+
+    @benchmark(f"filters/chain={chain}", loops=10_000)
+    def filters(chain: int = chain):
+        _reset()
+        logger = get_logger("svc")
+        for _ in range(chain):
+            logger.add_filter(_passthrough)
+        return lambda: logger.info("filtered")
+
+
+def _replay_filterer() -> tuple[Filterer, list[LogRecord]]:
+    records = [
+        LogRecord("replayed", ("svc", "svc.db", "other")[idx % 3], list(LogLevel)[idx % 5], {"user": idx % 7})
+        for idx in range(10_000)
+    ]
+    filterer = Filterer(FiltererLevel.INFO)
+    filterer.add_filter(NameFilter("svc"))
+    filterer.add_filter(ExtraFilter("user", 3))
+    return filterer, records
+
+
+@benchmark("filters/replay=10000/per-record", loops=20)
+def replay_per_record():
+    filterer, records = _replay_filterer()
+    return lambda: [record for record in map(filterer.filter, records) if record is not None]
+
+
+@benchmark("filters/replay=10000/batch", loops=20)
+def replay_batch():
+    filterer, records = _replay_filterer()
+    return lambda: filterer.filter_batch(records)
+
+
+@benchmark("contention/threads=4x1000", loops=5)
+def contention():
+    _reset()
+    logger = get_logger("svc")
+
+    def emit() -> None:
+        for _ in range(1000):
+            logger.info("contended")
+
+    def run() -> None:
+        threads = [threading.Thread(target=emit) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return run
+
+
+@benchmark("asyncio/fanout=1000", loops=5)
+def fanout():
+    _reset()
+    logger = get_logger("svc")
+
+    async def task(idx: int) -> None:
+        with bind(logger, request_id=idx):
+            await asyncio.sleep(0)
+            logger.info("handled {extra[request_id]}")
+
+    async def main() -> None:
+        await asyncio.gather(*(task(idx) for idx in range(1000)))
+
+    return lambda: asyncio.run(main())
+
+
+for n_extra in (0, 5, 50):
+    for formatter_cls in (Formatter, CompiledFormatter):
+
+        @benchmark(f"format/{formatter_cls.__name__}/extra={n_extra}", loops=10_000)
+        def format_text(formatter_cls: type[Formatter] = formatter_cls, n_extra: int = n_extra):
+            record = LogRecord("request done", "svc.api", LogLevel.INFO, {f"key{idx}": idx for idx in range(n_extra)})
+            formatter = formatter_cls("{created_at} {level} {name} {message} {extra}")
+            return lambda: formatter.format(record)
+
+    @benchmark(f"format/JSONFormatter/extra={n_extra}", loops=10_000)
+    def format_json(n_extra: int = n_extra):
+        record = LogRecord("request done", "svc.api", LogLevel.INFO, {f"key{idx}": idx for idx in range(n_extra)})
+        formatter = JSONFormatter()
+        return lambda: formatter.format(record)
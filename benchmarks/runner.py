@@ -0,0 +1,135 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import timeit
+import typing as t
+
+# a benchmark is a function that does any setup and returns the callable to time
+Benchmark = t.Callable[[], t.Callable[[], object]]
+
+
+class Case(t.NamedTuple):
+    name: str
+    setup: Benchmark
+    # how many times the returned callable runs per timed sample
+    loops: int
+
+
+class Result(t.NamedTuple):
+    name: str
+    loops: int
+    # seconds per call
+    min: float
+    mean: float
+    stdev: float
+
+
+_cases: list[Case] = []
+
+
+def benchmark(name: str, loops: int = 1000) -> t.Callable[[Benchmark], Benchmark]:
+    def register(setup: Benchmark) -> Benchmark:
+        _cases.append(Case(name, setup, loops))
+        return setup
+
+    return register
+
+
+def cases() -> list[Case]:
+    import benchmarks.cases  # noqa: F401 (registers the benchmarks)
+
+    return list(_cases)
+
+
+def run_case(case: Case, repeat: int = 5, loops: int | None = None) -> Result:
+    loops = loops or case.loops
+    timings = [timing / loops for timing in timeit.Timer(case.setup()).repeat(repeat=repeat, number=loops)]
+    return Result(
+        name=case.name,
+        loops=loops,
+        min=min(timings),
+        mean=statistics.mean(timings),
+        stdev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    )
+
+
+def run(
+    selected: t.Sequence[str] = (),
+    repeat: int = 5,
+    loops: int | None = None,
+    out: t.TextIO = sys.stdout,
+) -> list[Result]:
+    results = []
+    for case in cases():
+        if selected and not any(name in case.name for name in selected):
+            continue
+        result = run_case(case, repeat=repeat, loops=loops)
+        out.write(f"{result.name:<55} {_format_time(result.min):>10} ± {_format_time(result.stdev)}\n")
+        results.append(result)
+    return results
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def to_json(results: t.Sequence[Result]) -> dict[str, t.Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": {result.name: result._asdict() for result in results},
+    }
+
+
+def compare(results: t.Sequence[Result], baseline: dict[str, t.Any], threshold: float, out: t.TextIO) -> list[str]:
+    """Print the change vs `baseline` and return the names of benchmarks that regressed by more than `threshold`"""
+    regressions = []
+    for result in results:
+        base = baseline["benchmarks"].get(result.name)
+        if base is None:
+            out.write(f"{result.name:<55} (new)\n")
+            continue
+        change = result.min / base["min"] - 1
+        marker = ""
+        if change > threshold:
+            marker = "  REGRESSION"
+            regressions.append(result.name)
+        elif change < -threshold:
+            marker = "  improvement"
+        before, after = _format_time(base["min"]), _format_time(result.min)
+        out.write(f"{result.name:<55} {before:>10} -> {after:>10} {change:+.1%}{marker}\n")
+    return regressions
+
+
+def main(argv: t.Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the logging emit path")
+    parser.add_argument("select", nargs="*", help="only run benchmarks whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=5, help="timed samples per benchmark")
+    parser.add_argument("--loops", type=int, default=None, help="override calls per sample")
+    parser.add_argument("--json", metavar="PATH", help="write machine readable results to PATH")
+    parser.add_argument("--compare", metavar="PATH", help="compare against results previously saved with --json")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown that counts as a regression")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for case in cases():
+            print(case.name)
+        return 0
+
+    results = run(args.select, repeat=args.repeat, loops=args.loops)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(to_json(results), f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        if compare(results, baseline, args.threshold, sys.stdout):
+            return 1
+    return 0
@@ -21,6 +21,8 @@ def main():
     def replace(record: LogRecord) -> LogRecord | None:
         new_record = record.copy()  # LogRecord implements .copy()
         new_record.template = "Not today junior!"
+        # changing a copy's extra leaves the original record, and the dict it was logged with, alone
+        new_record.extra["replaced"] = True
         return new_record
 
     logger.add_filter(replace)
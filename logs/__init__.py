@@ -1,31 +1,212 @@
 import functools
-import itertools
 import os
 import sys
 import threading
+import time
 import typing as t
-from dataclasses import dataclass, replace
+import weakref
+from collections import OrderedDict
+from contextvars import ContextVar
 from datetime import datetime
 
+from logs._batch import filter_batch
+from logs._templates import compile_template
 from logs.levels import FiltererLevel, LogLevel
 
+_pid = os.getpid()
+
+
+_UNSET: t.Any = object()
+
+
+class Lazy:
+    """A value that is only computed (by calling `func`) the first time it is needed.
+
+    Put it in `extra` for values that are expensive to build:
+    if the record is never rendered `func` is never called,
+    and it is called at most once no matter how many handlers render the record.
+    Formatting, `str()`, `repr()`, indexing and attribute access all go through to the value.
+    """
+
+    __slots__ = ("func", "_value", "_lock")
+
+    def __init__(self, func: t.Callable[[], t.Any]) -> None:
+        self.func = func
+        self._value = _UNSET
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> t.Any:
+        value = self._value
+        if value is _UNSET:
+            with self._lock:
+                value = self._value
+                if value is _UNSET:
+                    value = self._value = self.func()
+        return value
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+    def __format__(self, format_spec: str) -> str:
+        return format(self.value, format_spec)
+
+    def __getitem__(self, key: t.Any) -> t.Any:
+        return self.value[key]
+
+    def __getattr__(self, name: str) -> t.Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.value, name)
+
+
+Extra = t.MutableMapping[str, t.Any]
+
 
-@dataclass
 class LogRecord:
+    """A single logging event.
+
+    The timestamp is captured as integer nanoseconds since the epoch (`created_ns`)
+    and only converted into a `datetime` when `created_at` is first accessed.
+
+    `extra` is copy-on-write between a record and its copies: after `copy()` each of them
+    gets a dict of its own the first time its `extra` is accessed, so filters can change a copy's
+    `extra` without affecting the original record (or the dict it was logged with).
+    """
+
+    __slots__ = (
+        "template",
+        "name",
+        "level",
+        "_extra",
+        "process",
+        "thread",
+        "_created_ns",
+        "_created_at",
+        "_message",
+        "callsite",
+        "_extra_shared",
+    )
+
+    _fields = ("template", "name", "level", "extra", "created_at", "process", "thread")
+
     template: str
     name: str
     level: LogLevel
-    extra: t.MutableMapping[str, t.Any]
-    created_at: datetime
     process: int
     thread: int
+    # the logs.callsites id of the (name, template) pair, 0 until the record is logged with call sites enabled
+    callsite: int
 
-    @functools.cached_property
-    def message(self):
-        return self.template.format(**vars(self))
+    def __init__(
+        self,
+        template: str,
+        name: str,
+        level: LogLevel,
+        extra: Extra | t.Callable[[], Extra],
+        created_at: datetime | None = None,
+        process: int | None = None,
+        thread: int | None = None,
+        *,
+        created_ns: int | None = None,
+        callsite: int = 0,
+    ) -> None:
+        self.template = template
+        self.name = name
+        self.level = level
+        # a callable is only called the first time `extra` is accessed
+        self._extra = Lazy(extra) if callable(extra) else extra
+        # whether _extra is shared with a copy of this record (or the record this one is a copy of)
+        self._extra_shared = False
+        self.process = _pid if process is None else process
+        self.thread = threading.get_ident() if thread is None else thread
+        if created_ns is None and created_at is None:
+            created_ns = time.time_ns()
+        self._created_ns = created_ns
+        self._created_at = created_at
+        self._message: str | None = None
+        self.callsite = callsite
+
+    @property
+    def extra(self) -> Extra:
+        extra = self._extra
+        if extra.__class__ is Lazy:
+            extra = self._extra = extra.value  # type: ignore[union-attr]
+        if self._extra_shared:
+            extra = self._extra = dict(extra)  # type: ignore[arg-type]
+            self._extra_shared = False
+        return extra  # type: ignore[return-value]
+
+    @extra.setter
+    def extra(self, extra: Extra) -> None:
+        self._extra = extra
+        self._extra_shared = False
+
+    @property
+    def created_ns(self) -> int:
+        if self._created_ns is None:
+            created_at = t.cast(datetime, self._created_at)
+            self._created_ns = int(created_at.timestamp()) * 1_000_000_000 + created_at.microsecond * 1_000
+        return self._created_ns
+
+    @property
+    def created_at(self) -> datetime:
+        created_at = self._created_at
+        if created_at is None:
+            seconds, nanoseconds = divmod(t.cast(int, self._created_ns), 1_000_000_000)
+            created_at = self._created_at = datetime.fromtimestamp(seconds).replace(microsecond=nanoseconds // 1_000)
+        return created_at
+
+    @property
+    def message(self) -> str:
+        message = self._message
+        if message is None:
+            template = compile_template(self.template)
+            message = self._message = template.render([self.get_field(name) for name in template.fields])
+        return message
+
+    @message.setter
+    def message(self, message: str) -> None:
+        self._message = message
+
+    def get_field(self, name: str) -> t.Any:
+        """Look up a field by name for use in templates"""
+        if name not in _RECORD_FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def copy(self) -> "LogRecord":
+        new = LogRecord.__new__(LogRecord)
+        new.template = self.template
+        new.name = self.name
+        new.level = self.level
+        # a callable extra is still only called once, by whichever record needs it first
+        new._extra = self._extra
+        self._extra_shared = new._extra_shared = True
+        new.process = self.process
+        new.thread = self.thread
+        new._created_ns = self._created_ns
+        new._created_at = self._created_at
+        new._message = None
+        new.callsite = self.callsite
+        return new
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._fields)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"LogRecord({fields})"
 
-    def copy(self):
-        return replace(self)
+
+_RECORD_FIELDS = frozenset(LogRecord._fields)
 
 
 class Formatter:
@@ -41,7 +222,7 @@ class Formatter:
     def format(self, record: LogRecord) -> str:
         return self.fmt.format(
             **{
-                **vars(record),
+                **{name: getattr(record, name) for name in _RECORD_FIELDS if name != "created_at"},
                 "message": self.format_message(record),
                 "created_at": self.format_time(record),
             }
@@ -53,10 +234,37 @@ class Filter(t.Protocol):
         ...
 
 
+# Guards the cached effective levels and dispatch plans of every live Logger.
+# Any change that can alter which records reach a handler (levels, filters,
+# handlers, propagation or the logger tree) goes through _invalidate_caches().
+_config_lock = threading.RLock()
+_live_loggers: "weakref.WeakSet[Logger]" = weakref.WeakSet()
+# objects whose _at_fork_reinit() is called in forked children, see _after_fork_in_child()
+_fork_reinit: "weakref.WeakSet[t.Any]" = weakref.WeakSet()
+
+
+def _reinit_after_fork(obj: t.Any) -> None:
+    """Have `obj._at_fork_reinit()` called in every child forked from this process"""
+    with _config_lock:
+        _fork_reinit.add(obj)
+
+
+# the logs.metrics collector while metrics are enabled, which Logger.log then hands every record to
+_metrics: t.Any = None
+# the logs.callsites registry while call sites are tracked
+_callsites: t.Any = None
+
+
+def _invalidate_caches() -> None:
+    with _config_lock:
+        for logger in list(_live_loggers):
+            logger._effective_level = None
+            logger._dispatch_plan = None
+
+
 class Filterer:
 
-    filters: list[Filter]
-    level: FiltererLevel
+    filters: t.Sequence[Filter]
 
     def __init__(
         self,
@@ -64,15 +272,41 @@ class Filterer:
     ) -> None:
         self._lock = threading.RLock()
         self.filters = []
-        self.level = level
+        # nothing can depend on a brand new Filterer yet, so skip invalidation
+        self._level = level
+        _reinit_after_fork(self)
+
+    @property
+    def level(self) -> FiltererLevel:
+        return self._level
+
+    @level.setter
+    def level(self, level: FiltererLevel) -> None:
+        self._level = level
+        _invalidate_caches()
+
+    def _at_fork_reinit(self) -> None:
+        # locks may have been held by threads that do not exist in a forked child
+        self._lock = threading.RLock()
+
+    def __getstate__(self) -> dict[str, t.Any]:
+        # pickled into another process (e.g. a ProcessQueueListener started with "spawn"), which gets its own locks
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, t.Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+        _reinit_after_fork(self)
 
     def at_level(self, level: FiltererLevel) -> bool:
-        if level.value < self.level.value:
+        if level.value < self._level.value:
             return False
         return True
 
     def filter(self, record: LogRecord) -> LogRecord | None:
-        if not self.at_level(FiltererLevel(record.level.value)):
+        if record.level.value < self._level.value:
             return None
         for filter in self.filters:
             filtered = filter(record)
@@ -81,15 +315,22 @@ class Filterer:
             record = filtered
         return record
 
+    def filter_batch(self, records: t.Sequence[LogRecord]) -> list[LogRecord]:
+        """Filter many records at once, equivalent to calling `filter` on each of them"""
+        return filter_batch(records, self._level.value, self.filters)
+
+    # filters (and Logger.handlers) are copy-on-write:
+    # the emit path iterates whatever list it grabbed without holding a lock
+
     def add_filter(self, filter: Filter) -> None:
         with self._lock:
-            self.filters.append(filter)
+            self.filters = [*self.filters, filter]
 
     def remove_filter(self, filter: Filter) -> None:
         with self._lock:
             for other_idx, other in enumerate(self.filters):
                 if filter is other:
-                    self.filters.pop(other_idx)
+                    self.filters = [*self.filters[:other_idx], *self.filters[other_idx + 1 :]]
                     return
         raise ValueError(f"Filter {filter} not found amongst the current filters")
 
@@ -108,6 +349,20 @@ class Handler(Filterer):
     def handle(self, record: LogRecord) -> None:
         ...
 
+    def handle_batch(self, records: t.Sequence[LogRecord]) -> None:
+        for record in records:
+            self.handle(record)
+
+    def flush(self) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+    def _before_fork(self) -> None:
+        # write out buffered output now, otherwise a forked child inherits it and writes it a second time
+        ...
+
 
 class StreamHandler(Handler):
     def __init__(self, level: FiltererLevel = FiltererLevel.NOTSET, stream: t.TextIO = sys.stderr) -> None:
@@ -119,13 +374,100 @@ class StreamHandler(Handler):
         filtered = self.filter(record)
         if filtered is None:
             return
+        text = self.formatter.format(filtered) + "\n"
+        if _callsites is not None:
+            _callsites.formatted(filtered, len(text))
+        self.write(text)
+
+    def handle_batch(self, records: t.Sequence[LogRecord]) -> None:
+        formatter = self.formatter
+        records = self.filter_batch(records)
+        lines = [formatter.format(record) for record in records]
+        if not lines:
+            return
+        if _callsites is not None:
+            _callsites.formatted_batch(records, lines)
+        lines.append("")
+        self.write("\n".join(lines))
+
+    def _at_fork_reinit(self) -> None:
+        super()._at_fork_reinit()
+        self._stream_lock = threading.RLock()
+
+    def __getstate__(self) -> dict[str, t.Any]:
+        state = super().__getstate__()
+        del state["_stream_lock"]
+        state["stream"] = self._stream_state()
+        return state
+
+    def __setstate__(self, state: dict[str, t.Any]) -> None:
+        super().__setstate__(state)
+        self._stream_lock = threading.RLock()
+        self.stream = self._restore_stream(state["stream"])
+
+    def _stream_state(self) -> t.Any:
+        # only the standard streams have a counterpart in another process
+        for name in ("stdout", "stderr"):
+            if self.stream is getattr(sys, name) or self.stream is getattr(sys, f"__{name}__"):
+                return name
+        raise TypeError(f"Cannot pickle a {type(self).__name__} writing to {self.stream!r}, only to stdout or stderr")
+
+    def _restore_stream(self, state: t.Any) -> t.TextIO:
+        return getattr(sys, state)
+
+    def _before_fork(self) -> None:
+        with self._stream_lock:
+            self.stream.flush()
+
+    def write(self, text: str) -> None:
+        """Write already formatted text to the stream"""
+        with self._stream_lock:
+            self.stream.write(text)
+
+    def flush(self) -> None:
         with self._stream_lock:
-            self.stream.write(self.formatter.format(filtered))
-            self.stream.write("\n")
+            self.stream.flush()
+
+
+def _merge_extra(extra: t.Callable[[], Extra], bound: Extra) -> Extra:
+    return {**extra(), **bound}
+
+
+class _BoundContext(t.NamedTuple):
+    extra: dict[str, t.Any]
+    loggers: frozenset["Logger"]
+
+
+# values bound with logs.bind.bind(), merged into records as they are created
+_bound_context: ContextVar[_BoundContext | None] = ContextVar("_bound_context", default=None)
+
+
+class _Hop(t.NamedTuple):
+    """One logger on a record's way up the tree, with the settings it had when the plan was built"""
+
+    logger: "Logger"
+    level: int
+    filters: tuple[Filter, ...]
+    handlers: tuple[Handler, ...]
+
+
+_DispatchPlan = tuple[_Hop, ...]
+
+
+def _apply_filters(record: LogRecord, level: int, filters: tuple[Filter, ...]) -> LogRecord | None:
+    if record.level.value < level:
+        return None
+    for filter in filters:
+        filtered = filter(record)
+        if filtered is None:
+            return None
+        record = filtered
+    return record
 
 
 class Logger(Filterer):
-    handlers: list[Handler]
+    _filters: tuple[Filter, ...]
+    _handlers: tuple[Handler, ...]
     parent: t.Union["Logger", None]
 
     def __init__(
@@ -134,11 +476,15 @@ class Logger(Filterer):
         level: FiltererLevel = FiltererLevel.NOTSET,
         propagate: bool = True,
     ) -> None:
-        super().__init__(level=level)
+        self._effective_level: int | None = None
+        self._dispatch_plan: _DispatchPlan | None = None
         self.name = name
-        self.propagate = propagate
         self.parent = None
-        self.handlers = []
+        self._handlers = ()
+        super().__init__(level=level)
+        self._propagate = propagate
+        with _config_lock:
+            _live_loggers.add(self)
 
     def __hash__(self) -> int:
         return hash(self.name)
@@ -146,126 +492,446 @@ class Logger(Filterer):
     def __repr__(self) -> str:
         return f'Logger("{self.name}")'
 
+    def _configured(self) -> None:
+        # a configured logger is kept even if it was created by get_logger() and is no longer recently used
+        _log_manager._pin(self)
+        _invalidate_caches()
+
+    @property
+    def level(self) -> FiltererLevel:
+        return self._level
+
+    @level.setter
+    def level(self, level: FiltererLevel) -> None:
+        self._level = level
+        self._configured()
+
+    @property
+    def filters(self) -> tuple[Filter, ...]:
+        return self._filters
+
+    @filters.setter
+    def filters(self, filters: t.Iterable[Filter]) -> None:
+        # a tuple for the same reason as handlers
+        initialized = "_filters" in self.__dict__
+        self._filters = tuple(filters)
+        if initialized:
+            self._configured()
+
+    @property
+    def handlers(self) -> tuple[Handler, ...]:
+        return self._handlers
+
+    @handlers.setter
+    def handlers(self, handlers: t.Iterable[Handler]) -> None:
+        # a tuple, so that changing it in place fails instead of going unnoticed by the dispatch plans
+        with self._lock:
+            self._handlers = tuple(handlers)
+        self._configured()
+
+    @property
+    def propagate(self) -> bool:
+        return self._propagate
+
+    @propagate.setter
+    def propagate(self, propagate: bool) -> None:
+        self._propagate = propagate
+        self._configured()
+
+    @property
+    def effective_level(self) -> FiltererLevel:
+        """The lowest level for which a record can reach at least one handler"""
+        return FiltererLevel(self._get_effective_level())
+
+    def _get_effective_level(self) -> int:
+        effective_level = self._effective_level
+        if effective_level is None:
+            with _config_lock:
+                effective_level = self._effective_level = self._compute_effective_level()
+        return effective_level
+
+    def _compute_effective_level(self) -> int:
+        # walk the chain from the top down: a logger lets through whatever
+        # its most permissive sink (own handlers or the rest of the chain) accepts
+        threshold = FiltererLevel.DISABLED.value
+        for hop in reversed(self._get_dispatch_plan()):
+            for handler in hop.handlers:
+                threshold = min(threshold, handler.level.value)
+            threshold = max(hop.level, threshold)
+        return threshold
+
+    def _get_dispatch_plan(self) -> _DispatchPlan:
+        plan = self._dispatch_plan
+        if plan is None:
+            with _config_lock:
+                plan = self._dispatch_plan = self._build_dispatch_plan()
+        return plan
+
+    def _build_dispatch_plan(self) -> _DispatchPlan:
+        plan = []
+        logger: Logger | None = self
+        while logger is not None:
+            if type(logger).filter is Logger.filter:
+                hop = _Hop(logger, logger._level.value, logger._filters, logger._handlers)
+            else:
+                # a subclass filtering records its own way: leave it up to its filter()
+                hop = _Hop(logger, FiltererLevel.NOTSET.value, (logger.filter,), logger._handlers)
+            plan.append(hop)
+            if not logger._propagate:
+                break
+            logger = logger.parent
+        return tuple(plan)
+
+    def filter(self, record: LogRecord) -> LogRecord | None:
+        if type(self).filter is not Logger.filter:
+            # called by an override through super(), the dispatch plan holds the override itself
+            return super().filter(record)
+        # the same level and filters that log() applies
+        hop = self._get_dispatch_plan()[0]
+        return _apply_filters(record, hop.level, hop.filters)
+
+    def filter_batch(self, records: t.Sequence[LogRecord]) -> list[LogRecord]:
+        if type(self).filter is not Logger.filter:
+            return super().filter_batch(records)
+        hop = self._get_dispatch_plan()[0]
+        return filter_batch(records, hop.level, hop.filters)
+
+    def is_enabled_for(self, level: FiltererLevel) -> bool:
+        effective_level = self._effective_level
+        if effective_level is None:
+            effective_level = self._get_effective_level()
+        return level.value >= effective_level
+
     def add_handler(self, handler: Handler) -> None:
         with self._lock:
-            self.handlers.append(handler)
+            self._handlers = (*self._handlers, handler)
+        self._configured()
 
     def remove_handler(self, handler: Handler) -> None:
         with self._lock:
-            for other_idx, other in enumerate(self.handlers):
+            for other_idx, other in enumerate(self._handlers):
                 if handler is other:
-                    self.handlers.pop(other_idx)
-                    return
-        raise ValueError(f"Handler {handler} not found amongst the current handlers")
+                    self._handlers = self._handlers[:other_idx] + self._handlers[other_idx + 1 :]
+                    break
+            else:
+                raise ValueError(f"Handler {handler} not found amongst the current handlers")
+        self._configured()
 
     def log(self, record: LogRecord) -> None:
-        filtered = self.filter(record)
-        if filtered is None:
-            return None
-        record = filtered
-        for handler in self.handlers:
-            handler.handle(record)
-        if self.propagate and self.parent:
-            self.parent.log(record)
-
-    def _create_record(self, template: str, level: LogLevel, extra: dict[str, t.Any] | None):
+        if _callsites is not None:
+            # None if the call site is silenced
+            record = _callsites.emit(record)
+            if record is None:
+                return None
+        if _metrics is not None:
+            return _metrics.log(self, record)
+        plan = self._dispatch_plan
+        if plan is None:
+            plan = self._get_dispatch_plan()
+        # every hop uses the level, filters and handlers its logger had when the plan was built,
+        # so a record is dispatched entirely by the configuration before or after a change
+        for _, level, filters, handlers in plan:
+            filtered = _apply_filters(record, level, filters)
+            if filtered is None:
+                if _callsites is not None:
+                    _callsites.drop(record)
+                return None
+            record = filtered
+            for handler in handlers:
+                handler.handle(record)
+
+    def log_many(self, records: t.Iterable[LogRecord]) -> None:
+        if _callsites is not None:
+            records = [emitted for record in records if (emitted := _callsites.emit(record)) is not None]
+        if _metrics is not None:
+            for record in records:
+                _metrics.log(self, record)
+            return
+        batch = list(records)
+        for _, level, filters, handlers in self._get_dispatch_plan():
+            if _callsites is not None:
+                batch = _callsites.filter(level, filters, batch)
+            else:
+                batch = filter_batch(batch, level, filters)
+            if not batch:
+                return
+            for handler in handlers:
+                handler.handle_batch(batch)
+
+    def _is_bound(self, loggers: frozenset["Logger"]) -> bool:
+        # binds apply to records that propagate through the logger they were bound to
+        for hop in self._get_dispatch_plan():
+            if hop.logger in loggers:
+                return True
+        return False
+
+    def _create_record(self, template: str, level: LogLevel, extra: Extra | t.Callable[[], Extra] | None):
+        if extra is None:
+            extra = {}
+        bound = _bound_context.get()
+        if bound is not None and self._is_bound(bound.loggers):
+            if callable(extra):
+                extra = functools.partial(_merge_extra, extra, bound.extra)
+            else:
+                extra = {**extra, **bound.extra}
         return LogRecord(
             template=template,
             level=level,
             name=self.name,
-            extra=extra if extra is not None else {},
-            created_at=datetime.now(),
-            process=os.getpid(),
-            thread=threading.get_ident(),
+            extra=extra,
+            process=_pid,
+            created_ns=time.time_ns(),
         )
 
-    def debug(self, template: str, extra: dict[str, t.Any] | None = None) -> None:
-        if self.at_level(FiltererLevel.DEBUG):
+    def debug(self, template: str, extra: Extra | t.Callable[[], Extra] | None = None) -> None:
+        if self.is_enabled_for(FiltererLevel.DEBUG):
             self.log(self._create_record(template=template, level=LogLevel.DEBUG, extra=extra))
 
-    def info(self, template: str, extra: dict[str, t.Any] | None = None) -> None:
-        if self.at_level(FiltererLevel.INFO):
+    def info(self, template: str, extra: Extra | t.Callable[[], Extra] | None = None) -> None:
+        if self.is_enabled_for(FiltererLevel.INFO):
             self.log(self._create_record(template=template, level=LogLevel.INFO, extra=extra))
 
-    def warning(self, template: str, extra: dict[str, t.Any] | None = None) -> None:
-        if self.at_level(FiltererLevel.WARNING):
+    def warning(self, template: str, extra: Extra | t.Callable[[], Extra] | None = None) -> None:
+        if self.is_enabled_for(FiltererLevel.WARNING):
             self.log(self._create_record(template=template, level=LogLevel.WARNING, extra=extra))
 
-    def error(self, template: str, extra: dict[str, t.Any] | None = None) -> None:
-        if self.at_level(FiltererLevel.ERROR):
+    def error(self, template: str, extra: Extra | t.Callable[[], Extra] | None = None) -> None:
+        if self.is_enabled_for(FiltererLevel.ERROR):
             self.log(self._create_record(template=template, level=LogLevel.ERROR, extra=extra))
 
-    def critical(self, template: str, extra: dict[str, t.Any] | None = None) -> None:
-        if self.at_level(FiltererLevel.CRITICAL):
+    def critical(self, template: str, extra: Extra | t.Callable[[], Extra] | None = None) -> None:
+        if self.is_enabled_for(FiltererLevel.CRITICAL):
             self.log(self._create_record(template=template, level=LogLevel.CRITICAL, extra=extra))
 
 
 class _LoggerManager:
 
+    # loggers that are always kept alive (all of them, unless max_loggers is set)
     _loggers: dict[str, Logger]
-    _children: dict[Logger, t.Set[Logger]]
-
-    def __init__(self) -> None:
+    # loggers created by get_logger() while max_loggers is set: only the most recently
+    # used ones are kept alive by the manager, the rest live as long as something references them
+    _dynamic: "weakref.WeakValueDictionary[str, Logger]"
+    _recent: "OrderedDict[str, Logger]"
+    _children: "weakref.WeakKeyDictionary[Logger, weakref.WeakSet[Logger]]"
+    max_loggers: int | None
+
+    def __init__(self, max_loggers: int | None = None) -> None:
         self._lock = threading.RLock()
+        self.max_loggers = max_loggers
         self.initialize()
 
-    def register_logger(self, logger: Logger) -> None:
-        path = logger.name.split(".")
-        parent = self._root
-        with self._lock:
-            if current := self._loggers.pop(logger.name, None):
-                # we already have a logger under this name
-                # se we can replace it and copy over it's children w/o
-                # traversing the log heirachy
-                logger.parent = current.parent
-                for child in self._children.pop(current):
-                    child.parent = logger
+    def _find(self, name: str) -> Logger | None:
+        logger = self._loggers.get(name)
+        if logger is None:
+            logger = self._dynamic.get(name)
+        return logger
+
+    def _register(self, logger: Logger, pinned: bool) -> bool:
+        """Add `logger` to the tree, returning True if other loggers were affected"""
+        current = self._find(logger.name)
+        if current is logger:
+            return False
+        if current is not None:
+            self._forget(current)
+        if pinned:
+            self._loggers[logger.name] = logger
+        else:
+            self._dynamic[logger.name] = logger
+            self._remember(logger)
+        if current is not None:
+            # we already have a logger under this name
+            # se we can replace it and copy over it's children w/o
+            # traversing the log heirachy
+            logger.parent = current.parent
+            children = self._children.pop(current)
+            for child in children:
+                child.parent = logger
+            self._children[logger] = children
+            if logger.parent is not None:
+                self._children[logger.parent].discard(current)
+                self._children[logger.parent].add(logger)
+            else:
+                self._root = logger
+            return True
+        # find the closest existing ancestor, creating any missing ones in between
+        missing: list[str] = []
+        parent_name = logger.name
+        while True:
+            parent_name = parent_name.rpartition(".")[0]
+            parent = self._find(parent_name)
+            if parent is not None:
+                break
+            missing.append(parent_name)
+        for name in reversed(missing):
+            intermediate = Logger(name)
+            intermediate.parent = parent
+            self._children[intermediate] = weakref.WeakSet()
+            self._children[parent].add(intermediate)
+            if pinned or self.max_loggers is None:
+                self._loggers[name] = intermediate
             else:
-                # make sure there are loggers from the root logger to this logger
-                for subpath in itertools.accumulate(path[:-1], lambda path, leaf: f"{path}.{leaf}"):
-                    if subpath not in self._loggers:
-                        self._loggers[subpath] = Logger(subpath)
-                        self._loggers[subpath].parent = parent
-                        self._children[self._loggers[subpath]] = set()
-                    parent = self._loggers[subpath]
-                # set the last logger we saw in the heirachy as this logger's parent
-                logger.parent = parent
-                # initialize this loggers children to an empty set
-                self._children[logger] = set()
-                # register the logger
+                self._dynamic[name] = intermediate
+            parent = intermediate
+        # set the last logger we saw in the heirachy as this logger's parent
+        logger.parent = parent
+        self._children[parent].add(logger)
+        # initialize this loggers children to an empty set
+        self._children[logger] = weakref.WeakSet()
+        # a new leaf only changes its own cached state
+        logger._effective_level = None
+        logger._dispatch_plan = None
+        return False
+
+    def _forget(self, logger: Logger) -> None:
+        for mapping in (self._loggers, self._dynamic, self._recent):
+            if mapping.get(logger.name) is logger:
+                del mapping[logger.name]
+
+    def _remember(self, logger: Logger) -> None:
+        self._recent[logger.name] = logger
+        self._recent.move_to_end(logger.name)
+        self._evict()
+
+    def _pin(self, logger: Logger) -> None:
+        # dict lookups are atomic, only take the lock for a logger that is not pinned yet
+        if self._dynamic.get(logger.name) is not logger:
+            return
+        with self._lock:
+            if self._dynamic.get(logger.name) is logger:
                 self._loggers[logger.name] = logger
+                del self._dynamic[logger.name]
+                self._recent.pop(logger.name, None)
+
+    def _evict(self) -> None:
+        recent = self._recent
+        while self.max_loggers is not None and len(recent) > self.max_loggers:
+            _, evicted = recent.popitem(last=False)
+            if (
+                evicted.handlers
+                or evicted.filters
+                or evicted.level is not FiltererLevel.NOTSET
+                or not evicted.propagate
+            ):
+                # never drop configuration on the floor
+                self._loggers[evicted.name] = evicted
+                self._dynamic.pop(evicted.name, None)
+
+    def register_logger(self, logger: Logger) -> None:
+        with self._lock:
+            affected = self._register(logger, pinned=True)
+        if affected:
+            _invalidate_caches()
+
+    def register_loggers(self, loggers: t.Iterable[Logger]) -> None:
+        affected = False
+        with self._lock:
+            # parents first so that they never have to replace a placeholder
+            for logger in sorted(loggers, key=lambda logger: logger.name.count(".")):
+                affected |= self._register(logger, pinned=True)
+        if affected:
+            _invalidate_caches()
 
     def remove_logger(self, name: str) -> None:
         if name == "":
             self.initialize()
             return
         with self._lock:
-            to_remove: list[str] = [name]
+            removed = self._find(name)
+            if removed is None:
+                raise KeyError(name)
+            if removed.parent is not None:
+                self._children[removed.parent].discard(removed)
+            to_remove: list[Logger] = [removed]
             while to_remove:
-                current = self._loggers.pop(to_remove.pop())
-                children = self._children.pop(current)
-                for child in children:
-                    to_remove.append(child.name)
+                current = to_remove.pop()
+                self._forget(current)
+                to_remove.extend(self._children.pop(current, ()))
+        _invalidate_caches()
 
     def initialize(self) -> None:
         with self._lock:
             self._root = Logger(name="", level=FiltererLevel.INFO)
-            self._root.add_handler(StreamHandler())
+            # not through add_handler(), which would look the root logger up in this manager
+            self._root._handlers = (StreamHandler(),)
             self._loggers = {"": self._root}
-            self._children = {self._root: set()}
+            self._dynamic = weakref.WeakValueDictionary()
+            self._recent = OrderedDict()
+            self._children = weakref.WeakKeyDictionary({self._root: weakref.WeakSet()})
+        _invalidate_caches()
+
+    def set_max_loggers(self, max_loggers: int | None) -> None:
+        with self._lock:
+            self.max_loggers = max_loggers
+            if max_loggers is None:
+                # pin everything that is still alive
+                self._loggers.update(self._dynamic)
+                self._dynamic = weakref.WeakValueDictionary()
+                self._recent.clear()
+            else:
+                self._evict()
 
     def get_logger(self, name: str) -> Logger:
+        # lock free fast path: dict lookups are atomic
+        logger = self._loggers.get(name)
+        if logger is not None:
+            return logger
+        if self.max_loggers is not None:
+            logger = self._dynamic.get(name)
+            if logger is not None:
+                try:
+                    self._recent.move_to_end(name)
+                except KeyError:
+                    with self._lock:
+                        self._remember(logger)
+                return logger
         with self._lock:
-            if current := self._loggers.get(name, None):
-                return current
-        logger = Logger(name)
-        self.register_logger(logger)
-        return logger
+            logger = self._find(name)
+            if logger is None:
+                logger = Logger(name)
+                self._register(logger, pinned=self.max_loggers is None)
+            return logger
 
 
 _log_manager = _LoggerManager()
 
 
+# A forked child only gets a copy of the thread that called fork(): any lock held by
+# another thread at that moment would stay locked forever in the child.
+# The global locks are taken around fork() so the child's copies are consistent,
+# every other lock is simply replaced in the child.
+
+
+def _before_fork() -> None:
+    with _config_lock:
+        handlers = [obj for obj in _fork_reinit if isinstance(obj, Handler)]
+    for handler in handlers:
+        try:
+            handler._before_fork()
+        except Exception:
+            pass
+    # same order as get_logger(), which creates Loggers (taking _config_lock) under the manager's lock
+    _log_manager._lock.acquire()
+    _config_lock.acquire()
+
+
+def _after_fork_in_parent() -> None:
+    _config_lock.release()
+    _log_manager._lock.release()
+
+
+def _after_fork_in_child() -> None:
+    global _pid, _config_lock
+    _pid = os.getpid()
+    _config_lock = threading.RLock()
+    _log_manager._lock = threading.RLock()
+    for obj in list(_fork_reinit):
+        obj._at_fork_reinit()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_before_fork, after_in_parent=_after_fork_in_parent, after_in_child=_after_fork_in_child)
+
+
 def reset() -> None:
     _log_manager.initialize()
 
@@ -278,5 +944,20 @@ def register_logger(logger: Logger) -> None:
     return _log_manager.register_logger(logger)
 
 
+def register_loggers(loggers: t.Iterable[Logger]) -> None:
+    return _log_manager.register_loggers(loggers)
+
+
 def remove_logger(name: str) -> None:
     return _log_manager.remove_logger(name)
+
+
+def set_max_loggers(max_loggers: int | None) -> None:
+    """Bound how many loggers created by `get_logger` are kept alive.
+
+    Once set, only the `max_loggers` most recently used loggers (plus any that have been
+    configured or registered with `register_logger`) are held by the library.
+    Others are garbage collected once nothing else references them.
+    `None` (the default) keeps every logger forever.
+    """
+    return _log_manager.set_max_loggers(max_loggers)
@@ -0,0 +1,112 @@
+import itertools
+import operator
+import typing as t
+from array import array
+
+if t.TYPE_CHECKING:
+    from logs import Extra, Filter, LogRecord
+
+# Enum.value is a property, _value_ is the plain attribute behind it
+_get_level = operator.attrgetter("level._value_")
+_get_name = operator.attrgetter("name")
+_get_extra = operator.attrgetter("extra")
+
+
+class RecordBatch:
+    """A sequence of records along with per-field columns that are built the first time a predicate needs them.
+
+    Selecting a subset keeps whichever columns have already been built,
+    so each column is extracted from the records at most once.
+    """
+
+    __slots__ = ("records", "_levels", "_names", "_dotted_names", "_extras")
+
+    def __init__(self, records: t.Sequence["LogRecord"]) -> None:
+        self.records = records
+        self._levels: array[int] | None = None
+        self._names: list[str] | None = None
+        self._dotted_names: list[str] | None = None
+        self._extras: list["Extra"] | None = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def levels(self) -> "array[int]":
+        if self._levels is None:
+            self._levels = array("i", map(_get_level, self.records))
+        return self._levels
+
+    @property
+    def names(self) -> list[str]:
+        if self._names is None:
+            self._names = list(map(_get_name, self.records))
+        return self._names
+
+    @property
+    def dotted_names(self) -> list[str]:
+        """Logger names with a trailing ".", so that prefix checks stop at name boundaries"""
+        if self._dotted_names is None:
+            self._dotted_names = [name + "." for name in self.names]
+        return self._dotted_names
+
+    @property
+    def extras(self) -> list["Extra"]:
+        if self._extras is None:
+            self._extras = list(map(_get_extra, self.records))
+        return self._extras
+
+    def select(self, mask: t.Iterable[bool]) -> "RecordBatch":
+        """The records for which `mask` is true"""
+        mask = list(mask)
+        if all(mask):
+            return self
+        selected = RecordBatch(list(itertools.compress(self.records, mask)))
+        if self._levels is not None:
+            selected._levels = array("i", itertools.compress(self._levels, mask))
+        if self._names is not None:
+            selected._names = list(itertools.compress(self._names, mask))
+        if self._dotted_names is not None:
+            selected._dotted_names = list(itertools.compress(self._dotted_names, mask))
+        if self._extras is not None:
+            selected._extras = list(itertools.compress(self._extras, mask))
+        return selected
+
+
+class Predicate:
+    """A filter that can also be evaluated over a whole RecordBatch at once"""
+
+    def matches(self, record: "LogRecord") -> bool:
+        raise NotImplementedError
+
+    def mask(self, batch: RecordBatch) -> t.Iterable[bool]:
+        return map(self.matches, batch.records)
+
+    def __call__(self, record: "LogRecord") -> "LogRecord | None":
+        if self.matches(record):
+            return record
+        return None
+
+
+def filter_batch(records: t.Sequence["LogRecord"], level: int, filters: t.Iterable["Filter"]) -> list["LogRecord"]:
+    """Apply a level check and then `filters`, in order, to `records`.
+
+    Predicates are evaluated column-wise over the records that are still left,
+    any other filter is called on each of them in turn.
+    """
+    batch = RecordBatch(records)
+    if level > 0:
+        batch = batch.select(map(level.__le__, batch.levels))
+    for filter in filters:
+        if not batch:
+            break
+        if isinstance(filter, Predicate):
+            batch = batch.select(filter.mask(batch))
+        else:
+            kept = []
+            for record in batch.records:
+                filtered = filter(record)
+                if filtered is not None:
+                    kept.append(filtered)
+            batch = RecordBatch(kept)
+    return list(batch.records)
@@ -0,0 +1,271 @@
+"""The binary log format written by BinaryHandler and read by logs.decode.
+
+A file starts with `MAGIC`, followed by entries: a varint length, then that many bytes.
+The first byte of an entry says what it holds:
+
+- `START`: written by each writer before anything else, it forgets every string and resets timestamps to 0,
+  so that a writer appending to an existing file does not depend on what came before it.
+  Writers also start over once they defined `max_strings` strings, which keeps both sides' tables bounded.
+- `STRING`: varint id, utf-8 text. Defines (or redefines) a string that later entries refer to by id,
+  used for logger names, templates and `extra` keys.
+- `RECORD`: varint logger name id, varint template id, level, zigzag varint difference between
+  `created_ns` and the previous record's, varint process id, varint thread id, then `extra`:
+  a varint number of items, each a varint key id followed by a tagged value.
+
+Integers are unsigned LEB128 varints, signed ones are zigzag encoded first.
+"""
+import mmap
+import struct
+import typing as t
+
+from logs import Lazy, LogRecord
+from logs.levels import LogLevel
+
+MAGIC = b"LOGS\x01"
+
+START = 0
+STRING = 1
+RECORD = 2
+
+# value tags
+_NONE = 0
+_TRUE = 1
+_FALSE = 2
+_INT = 3
+_FLOAT = 4
+_STR = 5
+_BYTES = 6
+_LIST = 7
+_DICT = 8
+
+_double = struct.Struct("<d")
+_LEVELS = {level.value: level for level in LogLevel}
+
+
+def _varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _encode_value(out: bytearray, value: t.Any) -> None:
+    cls = value.__class__
+    if cls is Lazy:
+        value = value.value
+        cls = value.__class__
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif cls is int:
+        out.append(_INT)
+        _varint(out, _zigzag(value))
+    elif cls is float:
+        out.append(_FLOAT)
+        out += _double.pack(value)
+    elif cls is str:
+        data = value.encode()
+        out.append(_STR)
+        _varint(out, len(data))
+        out += data
+    elif cls is bytes:
+        out.append(_BYTES)
+        _varint(out, len(value))
+        out += value
+    elif cls is list or cls is tuple:
+        out.append(_LIST)
+        _varint(out, len(value))
+        for item in value:
+            _encode_value(out, item)
+    elif cls is dict:
+        out.append(_DICT)
+        _varint(out, len(value))
+        for key, item in value.items():
+            # keys must come back hashable, and lists are what tuples come back as
+            _encode_value(out, key if key.__class__ is str or key.__class__ is int else str(key))
+            _encode_value(out, item)
+    elif isinstance(value, int):  # e.g. IntEnum
+        _encode_value(out, int(value))
+    elif isinstance(value, float):
+        _encode_value(out, float(value))
+    else:
+        # like JSONFormatter's default
+        _encode_value(out, str(value))
+
+
+class Encoder:
+    """Turns records into entries, defining each string the first time it is used.
+
+    Not thread safe: entries must be written in the order they were encoded.
+    """
+
+    def __init__(self, max_strings: int = 10_000) -> None:
+        self.max_strings = max_strings
+        self._ids: dict[str, int] = {}
+        self._last_ns = 0
+        self._started = False
+
+    def _start(self, out: bytearray) -> None:
+        out += bytes((1, START))
+        self._ids.clear()
+        self._last_ns = 0
+        self._started = True
+
+    def _id(self, out: bytearray, string: str) -> int:
+        string_id = self._ids.get(string)
+        if string_id is None:
+            string_id = self._ids[string] = len(self._ids)
+            body = bytearray((STRING,))
+            _varint(body, string_id)
+            body += string.encode()
+            _varint(out, len(body))
+            out += body
+        return string_id
+
+    def encode(self, record: LogRecord, out: bytearray) -> None:
+        """Append the entries for `record` to `out`"""
+        if not self._started or len(self._ids) >= self.max_strings:
+            # e.g. templates built with f-strings, which never repeat, would otherwise grow the table forever
+            self._start(out)
+        body = bytearray((RECORD,))
+        _varint(body, self._id(out, record.name))
+        _varint(body, self._id(out, record.template))
+        body.append(record.level.value)
+        created_ns = record.created_ns
+        _varint(body, _zigzag(created_ns - self._last_ns))
+        self._last_ns = created_ns
+        _varint(body, record.process)
+        _varint(body, record.thread)
+        extra = record.extra
+        _varint(body, len(extra))
+        for key, value in extra.items():
+            _varint(body, self._id(out, key))
+            _encode_value(body, value)
+        _varint(out, len(body))
+        out += body
+
+
+class DecodeError(ValueError):
+    pass
+
+
+def _read_varint(data: bytes | mmap.mmap, pos: int) -> tuple[int, int]:
+    """Returns the varint at `pos` and the position after it"""
+    byte = data[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    result = byte & 0x7F
+    shift = 7
+    while True:
+        pos += 1
+        byte = data[pos]
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos + 1
+        shift += 7
+
+
+def _read_value(data: bytes, pos: int) -> tuple[t.Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == _STR:
+        size, pos = _read_varint(data, pos)
+        return data[pos : pos + size].decode(), pos + size
+    if tag == _INT:
+        value, pos = _read_varint(data, pos)
+        return _unzigzag(value), pos
+    if tag == _NONE:
+        return None, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    if tag == _FLOAT:
+        return _double.unpack_from(data, pos)[0], pos + 8
+    if tag == _BYTES:
+        size, pos = _read_varint(data, pos)
+        return data[pos : pos + size], pos + size
+    if tag == _LIST:
+        size, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(size):
+            item, pos = _read_value(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == _DICT:
+        size, pos = _read_varint(data, pos)
+        mapping = {}
+        for _ in range(size):
+            key, pos = _read_value(data, pos)
+            mapping[key], pos = _read_value(data, pos)
+        return mapping, pos
+    raise DecodeError(f"Unknown value tag {tag}")
+
+
+class Decoder:
+    """Reads records back from a buffer (e.g. a memory mapped file), starting at `pos`"""
+
+    def __init__(self, data: bytes | mmap.mmap, pos: int = 0) -> None:
+        self.data = data
+        self.pos = pos
+        self._strings: dict[int, str] = {}
+        self._last_ns = 0
+
+    def records(self) -> t.Iterator[LogRecord]:
+        """Yield every record from the current position on, stopping at a truncated entry"""
+        data = self.data
+        size = len(data)
+        strings = self._strings
+        levels = _LEVELS
+        while self.pos < size:
+            try:
+                length, start = _read_varint(data, self.pos)
+            except IndexError:
+                return
+            if start + length > size:
+                # a partially written entry, e.g. the writer was killed mid-write
+                return
+            # copying the entry out of the buffer makes indexing it much cheaper
+            entry = data[start : start + length]
+            self.pos = start + length
+            kind = entry[0]
+            if kind == RECORD:
+                name_id, pos = _read_varint(entry, 1)
+                template_id, pos = _read_varint(entry, pos)
+                level = levels[entry[pos]]
+                delta, pos = _read_varint(entry, pos + 1)
+                created_ns = self._last_ns = self._last_ns + _unzigzag(delta)
+                process, pos = _read_varint(entry, pos)
+                thread, pos = _read_varint(entry, pos)
+                count, pos = _read_varint(entry, pos)
+                extra = {}
+                for _ in range(count):
+                    key_id, pos = _read_varint(entry, pos)
+                    extra[strings[key_id]], pos = _read_value(entry, pos)
+                yield LogRecord(
+                    strings[template_id],
+                    strings[name_id],
+                    level,
+                    extra,
+                    process=process,
+                    thread=thread,
+                    created_ns=created_ns,
+                )
+            elif kind == STRING:
+                string_id, pos = _read_varint(entry, 1)
+                strings[string_id] = entry[pos:].decode()
+            elif kind == START:
+                strings.clear()
+                self._last_ns = 0
+            # entries of unknown kinds are skipped, so newer writers can add some
@@ -0,0 +1,76 @@
+import functools
+import re
+import string
+import typing as t
+
+_parser = string.Formatter()
+_first_name = re.compile(r"[^.\[]*")
+
+
+def _escape(literal: str) -> str:
+    return literal.replace("{", "{{").replace("}", "}}")
+
+
+class CompiledTemplate:
+    """A `str.format` template parsed once up front.
+
+    `fields` lists the top level names the template references.
+    `render` takes their values (in the same order) and never looks at
+    anything the template does not use.
+    """
+
+    __slots__ = ("template", "fields", "static", "_positional")
+
+    template: str
+    fields: tuple[str, ...]
+    # the rendered output of templates without any replacement fields
+    static: str | None
+
+    def __init__(self, template: str) -> None:
+        self.template = template
+        fields: dict[str, int] = {}
+        chunks: list[str] = []
+        positional = True
+        for literal, field_name, spec, conversion in _parser.parse(template):
+            chunks.append(_escape(literal))
+            if field_name is None:
+                continue
+            first = _first_name.match(field_name).group()  # type: ignore[union-attr]
+            if not first or first.isdigit():
+                # "{}" / "{0}": leave it to str.format to complain about
+                positional = False
+                continue
+            idx = fields.setdefault(first, len(fields))
+            # spec is only None for literal text, which was skipped above
+            spec = spec or ""
+            if "{" in spec:
+                # nested replacement fields in the format spec, e.g. "{x:{width}}"
+                positional = False
+                for _, nested, _, _ in _parser.parse(spec):
+                    if nested:
+                        fields.setdefault(_first_name.match(nested).group(), len(fields))  # type: ignore[union-attr]
+                continue
+            chunk = f"{{{idx}{field_name[len(first):]}"
+            if conversion:
+                chunk += f"!{conversion}"
+            if spec:
+                chunk += f":{spec}"
+            chunks.append(chunk + "}")
+        self.fields = tuple(fields)
+        self.static = template.format() if not fields and positional else None
+        self._positional = "".join(chunks) if positional else None
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate({self.template!r})"
+
+    def render(self, values: t.Sequence[t.Any]) -> str:
+        if self.static is not None:
+            return self.static
+        if self._positional is not None:
+            return self._positional.format(*values)
+        return self.template.format_map(dict(zip(self.fields, values)))
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_template(template: str) -> CompiledTemplate:
+    return CompiledTemplate(template)
@@ -1,17 +1,7 @@
 from contextlib import contextmanager
-from contextvars import ContextVar
 from typing import Generator, Optional
 
-from logs import Logger, LogRecord, get_logger
-
-_ctx_var: ContextVar[dict] = ContextVar("_ctx_var")
-
-
-def _get_ctx() -> dict | None:
-    try:
-        return _ctx_var.get()
-    except LookupError:
-        return None
+from logs import Logger, _bound_context, _BoundContext, get_logger
 
 
 @contextmanager
@@ -21,36 +11,29 @@ def bind(logger: Optional[Logger] = None, /, **kwargs) -> Generator[None, None,
     Every log record emitted will have **kwargs injected into it,
     just like if you have logged with `logger.info(..., extra=kwargs)`.
 
+    Bound values live in a ContextVar and are merged into records as they are created,
+    so entering and exiting a bind does not touch any shared state.
+
     Parameters
     ----------
     logger : Logger
         Logger to bind to. Defaults to root logger.
-        Binds are injected by `logger` and effect all it's parents.
+        Binds are injected into records emitted by `logger` or any logger propagating to it.
     **kwargs : Dict[str, Any]
         Attributes to bind to all emitted log records.
     """
 
     logger = logger or get_logger("")
 
-    ctx = _get_ctx()
+    ctx = _bound_context.get()
     if ctx is None:
-        ctx = kwargs
+        ctx = _BoundContext(kwargs, frozenset((logger,)))
     else:
-        ctx = ctx.copy()
-        ctx.update(kwargs)
-    token = _ctx_var.set(ctx)
-
-    def filter(record: LogRecord) -> LogRecord:
-        cur_ctx = _get_ctx()
-        if cur_ctx:
-            record = record.copy()
-            record.extra.update(**cur_ctx)
-        return record
-
-    logger.add_filter(filter)
+        loggers = ctx.loggers if logger in ctx.loggers else ctx.loggers | {logger}
+        ctx = _BoundContext({**ctx.extra, **kwargs}, loggers)
+    token = _bound_context.set(ctx)
 
     try:
         yield
     finally:
-        _ctx_var.reset(token)
-        logger.remove_filter(filter)
+        _bound_context.reset(token)
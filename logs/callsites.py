@@ -0,0 +1,263 @@
+"""Statistics per call site, a (logger name, template) pair, to find and silence the noisiest ones.
+
+While enabled, every logged record gets a small integer `record.callsite` that is the same
+for all records a logger logs with the same template, and the registry counts per call site
+how many records were logged, how many of those a silencing, level or filter dropped,
+and how many characters handlers formatted for them.
+"""
+import operator
+import threading
+import typing as t
+from array import array
+
+import logs
+from logs import Filter, LogRecord
+
+# the id shared by call sites that are not tracked: those seen after max_callsites others already were
+UNTRACKED = 0
+
+
+class CallSite(t.NamedTuple):
+    id: int
+    name: str
+    template: str
+    emitted: int
+    # silenced, or dropped by a level or filter before reaching the end of the propagation chain
+    dropped: int
+    # characters of formatted output, summed over every handler that formatted the records
+    formatted: int
+    silenced: bool
+
+
+class _Counters:
+    """One thread's counters, indexed by call site id, so that threads never contend on updating them"""
+
+    __slots__ = ("emitted", "dropped", "formatted")
+
+    def __init__(self) -> None:
+        self.emitted = array("q")
+        self.dropped = array("q")
+        self.formatted = array("q")
+
+    def grow(self, size: int) -> None:
+        padding = array("q", bytes(8 * (size - len(self.emitted))))
+        for counts in (self.emitted, self.dropped, self.formatted):
+            counts.extend(padding)
+
+    def add(self, other: "_Counters") -> None:
+        if len(other.emitted) > len(self.emitted):
+            self.grow(len(other.emitted))
+        for totals, counts in zip(
+            (self.emitted, self.dropped, self.formatted), (other.emitted, other.dropped, other.formatted)
+        ):
+            for callsite, count in enumerate(counts):
+                if count:
+                    totals[callsite] += count
+
+
+class Registry:
+    def __init__(self, max_callsites: int = 10_000) -> None:
+        self.max_callsites = max_callsites
+        # name -> template -> id, read without locking
+        self._ids: dict[str, dict[str, int]] = {}
+        # (name, template) by id
+        self._sites: list[tuple[str, str]] = [("", "")]
+        self._full = False
+        self._silenced: frozenset[int] = frozenset()
+        self._local = threading.local()
+        # the counters of every thread that logged, until it exits and they are added to _finished
+        self._counters: list[tuple[threading.Thread, _Counters]] = []
+        self._finished = _Counters()
+        self._lock = threading.Lock()
+        logs._reinit_after_fork(self)
+
+    def _at_fork_reinit(self) -> None:
+        self._lock = threading.Lock()
+
+    def intern(self, name: str, template: str) -> int:
+        """The id of a call site, registering it if it is new"""
+        templates = self._ids.get(name)
+        if templates is not None:
+            callsite = templates.get(template)
+            if callsite is not None:
+                return callsite
+        if self._full:
+            # most likely templates built with f-strings or str.format, which never repeat
+            return UNTRACKED
+        with self._lock:
+            templates = self._ids.setdefault(name, {})
+            callsite = templates.get(template)
+            if callsite is None:
+                if len(self._sites) > self.max_callsites:
+                    self._full = True
+                    return UNTRACKED
+                callsite = len(self._sites)
+                self._sites.append((name, template))
+                templates[template] = callsite
+            return callsite
+
+    def lookup(self, callsite: int) -> tuple[str, str]:
+        """The (logger name, template) of a call site id"""
+        if callsite == UNTRACKED:
+            raise KeyError(callsite)
+        return self._sites[callsite]
+
+    def _thread_counters(self, callsite: int) -> _Counters:
+        try:
+            counters: _Counters = self._local.counters
+        except AttributeError:
+            counters = self._local.counters = _Counters()
+            with self._lock:
+                # a new thread, maybe in place of one that exited: keep the number of arrays bounded
+                self._fold_finished()
+                self._counters.append((threading.current_thread(), counters))
+        if callsite >= len(counters.emitted):
+            counters.grow(len(self._sites))
+        return counters
+
+    def _fold_finished(self) -> None:
+        # called with the lock held
+        running = []
+        for thread, counters in self._counters:
+            if thread.is_alive():
+                running.append((thread, counters))
+            else:
+                self._finished.add(counters)
+        self._counters = running
+
+    def emit(self, record: LogRecord) -> LogRecord | None:
+        callsite = record.callsite = self.intern(record.name, record.template)
+        counters = self._thread_counters(callsite)
+        counters.emitted[callsite] += 1
+        if callsite in self._silenced:
+            counters.dropped[callsite] += 1
+            return None
+        return record
+
+    def drop(self, record: LogRecord) -> None:
+        callsite = record.callsite
+        self._thread_counters(callsite).dropped[callsite] += 1
+
+    def filter(self, level: int, filters: tuple[Filter, ...], records: list[LogRecord]) -> list[LogRecord]:
+        """Filter a batch like Logger.log_many does, counting the records that are dropped"""
+        kept = []
+        for record in records:
+            filtered = logs._apply_filters(record, level, filters)
+            if filtered is None:
+                self.drop(record)
+            else:
+                kept.append(filtered)
+        return kept
+
+    def formatted(self, record: LogRecord, size: int) -> None:
+        callsite = record.callsite
+        self._thread_counters(callsite).formatted[callsite] += size
+
+    def formatted_batch(self, records: t.Sequence[LogRecord], lines: t.Sequence[str]) -> None:
+        for record, line in zip(records, lines):
+            callsite = record.callsite
+            # +1 for the newline each line is written with
+            self._thread_counters(callsite).formatted[callsite] += len(line) + 1
+
+    def silence(self, name: str, template: str) -> int:
+        """Drop every record logged from a call site from now on, returning its id"""
+        callsite = self.intern(name, template)
+        if callsite == UNTRACKED:
+            raise ValueError(f"Cannot silence {name!r} {template!r}: already tracking {self.max_callsites} call sites")
+        with self._lock:
+            self._silenced = self._silenced | {callsite}
+        return callsite
+
+    def unsilence(self, name: str, template: str) -> None:
+        callsite = self.intern(name, template)
+        with self._lock:
+            self._silenced = self._silenced - {callsite}
+
+    def stats(self) -> list[CallSite]:
+        """Every call site, with the untracked ones added up under id 0 if there were any"""
+        with self._lock:
+            self._fold_finished()
+            finished = self._finished
+            # _finished only changes while the lock is held, so copy it now
+            all_counts = [(finished.emitted[:], finished.dropped[:], finished.formatted[:])]
+            all_counts.extend(
+                (counters.emitted, counters.dropped, counters.formatted) for _, counters in self._counters
+            )
+            sites = list(self._sites)
+        emitted, dropped, formatted = ([0] * len(sites) for _ in range(3))
+        for counts_by_kind in all_counts:
+            # other threads keep updating (and growing) their counters: only ever read copies
+            for totals, counts in zip((emitted, dropped, formatted), counts_by_kind):
+                for callsite, count in enumerate(counts[: len(sites)]):
+                    totals[callsite] += count
+        silenced = self._silenced
+        stats = [
+            CallSite(
+                callsite,
+                name,
+                template,
+                emitted[callsite],
+                dropped[callsite],
+                formatted[callsite],
+                callsite in silenced,
+            )
+            for callsite, (name, template) in enumerate(sites)
+        ]
+        if not (emitted[UNTRACKED] or dropped[UNTRACKED] or formatted[UNTRACKED]):
+            del stats[UNTRACKED]
+        return stats
+
+    def top(self, n: int = 10, by: str = "emitted") -> list[CallSite]:
+        """The `n` call sites with the highest `by` count ("emitted", "dropped" or "formatted")"""
+        if by not in ("emitted", "dropped", "formatted"):
+            raise ValueError(f"Cannot sort call sites by {by!r}")
+        return sorted(self.stats(), key=operator.attrgetter(by), reverse=True)[:n]
+
+
+_registry = Registry()
+
+
+def enable(max_callsites: int | None = None) -> None:
+    """Start tracking call sites, this makes every record that is logged somewhat slower"""
+    if max_callsites is not None:
+        _registry.max_callsites = max_callsites
+    logs._callsites = _registry
+
+
+def disable() -> None:
+    """Stop tracking call sites, what was counted so far (and what was silenced) is kept"""
+    logs._callsites = None
+
+
+def is_enabled() -> bool:
+    return logs._callsites is not None
+
+
+def reset() -> None:
+    """Forget every call site and what was counted for it, and stop silencing any"""
+    global _registry
+    enabled = is_enabled()
+    _registry = Registry(_registry.max_callsites)
+    if enabled:
+        enable()
+
+
+def lookup(callsite: int) -> tuple[str, str]:
+    return _registry.lookup(callsite)
+
+
+def stats() -> list[CallSite]:
+    return _registry.stats()
+
+
+def top(n: int = 10, by: str = "emitted") -> list[CallSite]:
+    return _registry.top(n, by)
+
+
+def silence(name: str, template: str) -> int:
+    """Drop every record `name` logs with `template`, while call sites are tracked"""
+    return _registry.silence(name, template)
+
+
+def unsilence(name: str, template: str) -> None:
+    _registry.unsilence(name, template)
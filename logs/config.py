@@ -0,0 +1,382 @@
+"""Configure loggers, handlers, filters and formatters from a dict or a TOML / JSON file.
+
+    [formatters.plain]
+    fmt = "{created_at} {level} {name}: {message}"
+
+    [handlers.console]
+    class = "logs.StreamHandler"
+    stream = "ext://sys.stdout"
+    formatter = "plain"
+    level = "INFO"
+
+    [loggers."app.db"]
+    level = "DEBUG"
+    handlers = ["console"]
+    propagate = false
+
+Every section is a table of named objects. `class` is the dotted path of what to create
+(formatters default to CompiledFormatter, handlers to StreamHandler),
+the other keys are passed to it as keyword arguments, except for a handler's `level`,
+`formatter` and `filters` and everything about a logger. Argument values can refer to
+an importable object with "ext://module.attribute" or to another configured object
+with "cfg://<section>.<name>" (e.g. a QueueHandler's `handler`), and levels are given by name.
+
+Applying a configuration only touches the loggers it names (and loggers a previous configuration
+named, which go back to how get_logger() creates them). Objects whose configuration did not change are kept
+as they are, so e.g. a RateLimitFilter keeps its state across reloads.
+"""
+import importlib
+import json
+import os
+import sys
+import threading
+import traceback
+import typing as t
+
+import logs
+from logs import Filter, Handler, Logger, StreamHandler
+from logs.levels import FiltererLevel
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:  # pragma: no cover
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+Config = t.Mapping[str, t.Any]
+
+_SECTIONS = ("formatters", "filters", "handlers", "loggers")
+_DEFAULT_CLASSES = {
+    "formatters": "logs.formatters.CompiledFormatter",
+    "filters": None,
+    "handlers": "logs.StreamHandler",
+}
+# handler keys that configure the Handler itself rather than being passed to its class
+_HANDLER_KEYS = ("level", "formatter", "filters")
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def _import(path: str) -> t.Any:
+    module_name, _, attribute = path.rpartition(".")
+    if not module_name:
+        raise ConfigError(f"Expected a dotted path, got {path!r}")
+    try:
+        obj: t.Any = importlib.import_module(module_name)
+    except ImportError:
+        # e.g. "logs.handlers.FsyncPolicy.ALWAYS"
+        obj = _import(module_name)
+    try:
+        return getattr(obj, attribute)
+    except AttributeError:
+        raise ConfigError(f"Cannot import {path!r}") from None
+
+
+def _level(value: t.Any) -> FiltererLevel:
+    if isinstance(value, FiltererLevel):
+        return value
+    try:
+        return FiltererLevel[str(value).upper()]
+    except KeyError:
+        raise ConfigError(f"Unknown level {value!r}") from None
+
+
+class _Built(t.NamedTuple):
+    obj: t.Any
+    # the configuration of the object and of everything it refers to,
+    # if it is unchanged in a new configuration the object is reused
+    signature: t.Any
+
+
+class _Builder:
+    """Creates the objects a configuration describes, reusing those of `previous` where possible"""
+
+    def __init__(self, config: Config, previous: dict[tuple[str, str], _Built]) -> None:
+        unknown = set(config) - set(_SECTIONS)
+        if unknown:
+            raise ConfigError(f"Unknown configuration sections {sorted(unknown)}, expected {list(_SECTIONS)}")
+        self.config = config
+        self.previous = previous
+        self.built: dict[tuple[str, str], _Built] = {}
+        self._building: set[tuple[str, str]] = set()
+
+    def spec(self, section: str, name: str) -> t.Mapping[str, t.Any]:
+        try:
+            spec = self.config.get(section, {})[name]
+        except KeyError:
+            raise ConfigError(f"{section[:-1].capitalize()} {name!r} is not configured") from None
+        if not isinstance(spec, t.Mapping):
+            raise ConfigError(f"{section}.{name} should be a table, got {spec!r}")
+        return spec
+
+    def get(self, section: str, name: str) -> _Built:
+        key = (section, name)
+        built = self.built.get(key)
+        if built is not None:
+            return built
+        if key in self._building:
+            raise ConfigError(f"{section}.{name} refers to itself")
+        self._building.add(key)
+        try:
+            built = self.built[key] = self._build(section, name)
+        finally:
+            self._building.discard(key)
+        return built
+
+    def _resolve(self, name: str, value: t.Any, refs: list[t.Any]) -> t.Any:
+        if isinstance(value, str):
+            if value.startswith("ext://"):
+                return _import(value[len("ext://") :])
+            if value.startswith("cfg://"):
+                section, _, ref_name = value[len("cfg://") :].partition(".")
+                built = self.get(section, ref_name)
+                refs.append(built.signature)
+                return built.obj
+            if name.endswith("level"):
+                return _level(value)
+        if isinstance(value, list):
+            return [self._resolve(name, item, refs) for item in value]
+        return value
+
+    def _build(self, section: str, name: str) -> _Built:
+        spec = dict(self.spec(section, name))
+        refs: list[t.Any] = []
+        class_path = spec.pop("class", _DEFAULT_CLASSES.get(section))
+        if not isinstance(class_path, str):
+            raise ConfigError(f"{section}.{name} needs a class")
+        settings = {key: spec.pop(key) for key in _HANDLER_KEYS if key in spec} if section == "handlers" else {}
+        kwargs = {key: self._resolve(key, value, refs) for key, value in spec.items()}
+        formatter = filters = None
+        if "formatter" in settings:
+            built = self.get("formatters", settings["formatter"])
+            formatter = built.obj
+            refs.append(built.signature)
+        if "filters" in settings:
+            filters = []
+            for filter_name in settings["filters"]:
+                built = self.get("filters", filter_name)
+                filters.append(built.obj)
+                refs.append(built.signature)
+        signature = (self.spec(section, name), tuple(refs))
+
+        previous = self.previous.get((section, name))
+        if previous is not None and previous.signature == signature:
+            return previous
+
+        try:
+            obj = _import(class_path)(**kwargs)
+        except ConfigError:
+            raise
+        except Exception as exc:
+            raise ConfigError(f"Could not create {section}.{name}: {exc!r}") from exc
+        if section == "handlers":
+            if "level" in settings:
+                obj.level = _level(settings["level"])
+            if formatter is not None:
+                obj.formatter = formatter
+            if filters:
+                obj.filters = filters
+        return _Built(obj, signature)
+
+
+class _LoggerSettings(t.NamedTuple):
+    logger: Logger
+    level: FiltererLevel
+    handlers: list[Handler]
+    filters: list[Filter]
+    propagate: bool
+
+
+def _defaults(logger: Logger) -> _LoggerSettings:
+    """What a logger that is no longer configured goes back to"""
+    if logger.name == "":
+        # as set up by the logger manager
+        return _LoggerSettings(logger, FiltererLevel.INFO, [StreamHandler()], [], True)
+    return _LoggerSettings(logger, FiltererLevel.NOTSET, [], [], True)
+
+
+# serializes configure() calls, a Watcher thread may be holding it when the process forks
+_apply_lock = threading.Lock()
+logs._reinit_after_fork(_apply_lock)
+# what the last configure() created, and the loggers it configured
+_applied: dict[tuple[str, str], _Built] = {}
+_configured: dict[str, Logger] = {}
+# the root logger at the time, logs.reset() replaces it along with the rest of the tree
+_root: Logger | None = None
+
+
+def configure(config: Config, *, close_delay: float = 1.0) -> None:
+    """Apply a configuration, see the module docstring for its format.
+
+    Every object is created before any logger is touched, so if the configuration is invalid
+    (which raises ConfigError) the current one stays as it is, and the handlers created for the
+    invalid one are closed. Loggers are then updated
+    all at once: each record is routed either entirely according to the old configuration
+    or entirely according to the new one, no records are lost and emitting threads do not wait.
+    Handlers that are no longer used are closed after `close_delay` seconds,
+    once records that were already on their way to them have been written.
+    """
+    global _root
+    with _apply_lock:
+        root = logs.get_logger("")
+        if root is not _root:
+            # the loggers were reset since the last configure(): start over
+            _applied.clear()
+            _configured.clear()
+            _root = root
+        builder = _Builder(config, _applied)
+        # check the loggers first, so that a mistake there does not create (and leak) any handlers
+        loggers = []
+        for name, spec in config.get("loggers", {}).items():
+            spec = dict(spec)
+            level = _level(spec.pop("level", FiltererLevel.NOTSET))
+            handler_names = spec.pop("handlers", [])
+            filter_names = spec.pop("filters", [])
+            propagate = spec.pop("propagate", True)
+            if spec:
+                raise ConfigError(f"Unknown settings {sorted(spec)} for logger {name!r}")
+            for handler in handler_names:
+                builder.spec("handlers", handler)
+            for filter in filter_names:
+                builder.spec("filters", filter)
+            loggers.append((name, level, handler_names, filter_names, bool(propagate)))
+
+        try:
+            for section in ("formatters", "filters", "handlers"):
+                for name in config.get(section, {}):
+                    builder.get(section, name)
+        except BaseException:
+            # close what was created for this configuration, the current one keeps its own objects
+            current = {id(built.obj) for built in _applied.values()}
+            created = [built.obj for built in builder.built.values() if id(built.obj) not in current]
+            _close([obj for obj in created if isinstance(obj, Handler)])
+            raise
+
+        updates = []
+        for name, level, handler_names, filter_names, propagate in loggers:
+            handlers = [builder.get("handlers", handler).obj for handler in handler_names]
+            filters = [builder.get("filters", filter).obj for filter in filter_names]
+            updates.append(_LoggerSettings(logs.get_logger(name), level, handlers, filters, propagate))
+
+        configured = {settings.logger.name: settings.logger for settings in updates}
+        for name, logger in _configured.items():
+            if name not in configured:
+                updates.append(_defaults(logger))
+
+        with logs._config_lock:
+            for settings in updates:
+                logger = settings.logger
+                logger._level = settings.level
+                logger._filters = tuple(settings.filters)
+                logger._handlers = tuple(settings.handlers)
+                logger._propagate = settings.propagate
+            # Logger.log keeps using the dispatch plan it already had, which holds the old
+            # levels, filters and handlers, until this makes every logger build a new one
+            logs._invalidate_caches()
+
+        in_use = {id(built.obj) for built in builder.built.values()}
+        unused = [
+            built.obj for built in _applied.values() if isinstance(built.obj, Handler) and id(built.obj) not in in_use
+        ]
+        _applied.clear()
+        _applied.update(builder.built)
+        _configured.clear()
+        _configured.update(configured)
+
+    if unused:
+        closer = threading.Timer(close_delay, _close, args=(unused,))
+        closer.daemon = True
+        closer.start()
+
+
+def _close(handlers: list[Handler]) -> None:
+    for handler in handlers:
+        try:
+            handler.close()
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+
+
+def load(path: str | os.PathLike[str]) -> dict[str, t.Any]:
+    """Read a configuration from a .toml or .json file"""
+    path = os.fspath(path)
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as file:
+            config = json.load(file)
+    elif path.endswith(".toml"):
+        if tomllib is None:  # pragma: no cover
+            raise ConfigError("Reading TOML on Python < 3.11 needs the tomli package")
+        with open(path, "rb") as file:
+            config = tomllib.load(file)
+    else:
+        raise ConfigError(f"Don't know how to read {path!r}, expected a .toml or .json file")
+    if not isinstance(config, dict):
+        raise ConfigError(f"{path} should contain a table / object")
+    return config
+
+
+def configure_from_file(path: str | os.PathLike[str], *, close_delay: float = 1.0) -> None:
+    configure(load(path), close_delay=close_delay)
+
+
+class Watcher:
+    """Re-applies a configuration file whenever it changes.
+
+    Changes are noticed by polling the file's metadata every `interval` seconds.
+    A configuration that fails to load or apply is reported on stderr and the current one is kept.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], interval: float = 1.0, *, close_delay: float = 1.0) -> None:
+        self.path = os.fspath(path)
+        self.interval = interval
+        self.close_delay = close_delay
+        self._version: tuple[int, int, int] | None = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _stat(self) -> tuple[int, int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        # the inode changes when editors and deployment tools replace the file instead of writing to it
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def check(self) -> bool:
+        """Apply the file if it changed since it was last applied, returning True if it was"""
+        version = self._stat()
+        if version is None or version == self._version:
+            return False
+        self._version = version
+        configure_from_file(self.path, close_delay=self.close_delay)
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("Watcher was already started")
+        self._thread = threading.Thread(target=self._run, name="logs.config.Watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                traceback.print_exc(file=sys.stderr)
+
+
+def watch(path: str | os.PathLike[str], interval: float = 1.0, *, close_delay: float = 1.0) -> Watcher:
+    """Apply a configuration file now and again whenever it changes, errors in the first load are raised"""
+    watcher = Watcher(path, interval, close_delay=close_delay)
+    watcher.check()
+    watcher.start()
+    return watcher
@@ -0,0 +1,57 @@
+import argparse
+import mmap
+import os
+import sys
+import typing as t
+
+from logs import Formatter, LogRecord
+from logs._binary import MAGIC, DecodeError, Decoder  # noqa: F401
+from logs.formatters import CompiledFormatter, JSONFormatter
+
+
+def read(path: str | os.PathLike[str]) -> t.Iterator[LogRecord]:
+    """Yield the records in a file written by BinaryHandler, oldest first.
+
+    The file is memory mapped and decoded as the records are consumed,
+    a partially written last record (e.g. from a file that is still being written) is skipped.
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[: len(MAGIC)] != MAGIC:
+                raise DecodeError(f"{os.fspath(path)} was not written by BinaryHandler")
+            yield from Decoder(data, len(MAGIC)).records()
+
+
+def render(records: t.Iterable[LogRecord], formatter: Formatter) -> t.Iterator[str]:
+    """Format `records` with `formatter` as they are consumed"""
+    for record in records:
+        yield formatter.format(record)
+
+
+def main(argv: t.Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m logs.decode", description="Print files written by BinaryHandler")
+    parser.add_argument("paths", nargs="+", metavar="PATH", help="files to print, in order")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--format", default="{created_at} {level} {name}: {message}", help="a Formatter template")
+    output.add_argument("--json", action="store_true", help="print one JSON object per line")
+    args = parser.parse_args(argv)
+
+    formatter = JSONFormatter() if args.json else CompiledFormatter(args.format)
+    try:
+        for path in args.paths:
+            for line in render(read(path), formatter):
+                sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+    except DecodeError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # e.g. piped into head: stop quietly
+        sys.stderr.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
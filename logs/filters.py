@@ -0,0 +1,312 @@
+import itertools
+import operator
+import random
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+
+import logs
+from logs import Lazy, LogRecord
+from logs._batch import Predicate, RecordBatch
+from logs.levels import FiltererLevel, LogLevel
+
+Key = t.Callable[[LogRecord], t.Hashable]
+
+
+def by_template(record: LogRecord) -> t.Hashable:
+    return record.template
+
+
+def by_name(record: LogRecord) -> t.Hashable:
+    return record.name
+
+
+def by_extra(key: str) -> Key:
+    """Key records by the value of `record.extra[key]` (None if missing)"""
+
+    def get(record: LogRecord) -> t.Hashable:
+        return record.extra.get(key)
+
+    return get
+
+
+_T = t.TypeVar("_T")
+
+
+class _KeyedState(t.Generic[_T]):
+    """Per-key state with bounded memory.
+
+    Keys are spread over independently locked shards so that threads
+    logging different keys rarely contend; each shard evicts its least
+    recently used keys once it holds more than its share of `max_keys`.
+    """
+
+    def __init__(self, factory: t.Callable[[], _T], max_keys: int, shards: int = 16) -> None:
+        self._factory = factory
+        self._shards: list[tuple[threading.Lock, OrderedDict[t.Hashable, _T]]] = [
+            (threading.Lock(), OrderedDict()) for _ in range(shards)
+        ]
+        self._max_shard_keys = max(max_keys // shards, 1)
+        logs._reinit_after_fork(self)
+
+    def _at_fork_reinit(self) -> None:
+        self._shards = [(threading.Lock(), states) for _, states in self._shards]
+
+    def __len__(self) -> int:
+        return sum(len(states) for _, states in self._shards)
+
+    def update(self, key: t.Hashable, func: t.Callable[..., t.Any], *args: t.Any) -> t.Any:
+        """Call `func` with the state for `key` (and `args`) while holding its shard's lock"""
+        lock, states = self._shards[hash(key) % len(self._shards)]
+        with lock:
+            state = states.get(key)
+            if state is None:
+                state = states[key] = self._factory()
+                if len(states) > self._max_shard_keys:
+                    states.popitem(last=False)
+            else:
+                states.move_to_end(key)
+            return func(state, *args)
+
+    def visit(self, func: t.Callable[[_T], t.Any]) -> list[t.Any]:
+        """Call `func` with every key's state while holding its shard's lock, returning what is not None"""
+        results = []
+        for lock, states in self._shards:
+            with lock:
+                for state in states.values():
+                    result = func(state)
+                    if result is not None:
+                        results.append(result)
+        return results
+
+    def pop_all(self) -> list[_T]:
+        """Forget every key, returning their states"""
+        popped: list[_T] = []
+        for lock, states in self._shards:
+            with lock:
+                popped.extend(states.values())
+                states.clear()
+        return popped
+
+
+class SampleFilter:
+    """Deterministically keep 1 in every `n` records"""
+
+    def __init__(self, n: int) -> None:
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        self.n = n
+        # next() on itertools.count is atomic, so no lock is needed
+        self._counter = itertools.count()
+
+    def __call__(self, record: LogRecord) -> LogRecord | None:
+        if next(self._counter) % self.n:
+            return None
+        return record
+
+
+class RandomSampleFilter:
+    """Keep each record with probability `probability`"""
+
+    def __init__(self, probability: float, seed: int | None = None) -> None:
+        if not 0 <= probability <= 1:
+            raise ValueError("probability must be between 0 and 1")
+        self.probability = probability
+        self._random = random.Random(seed).random
+
+    def __call__(self, record: LogRecord) -> LogRecord | None:
+        if self._random() < self.probability:
+            return record
+        return None
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimitFilter:
+    """Allow at most `rate` records per second per key, with bursts of up to `burst` records.
+
+    Records are keyed by their template unless `key` says otherwise (see `by_extra`).
+    At most `max_keys` keys are tracked; the least recently seen ones are forgotten first.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        *,
+        key: Key = by_template,
+        max_keys: int = 10_000,
+        clock: t.Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.key = key
+        self.clock = clock
+        self._buckets = _KeyedState(lambda: _Bucket(float(burst), clock()), max_keys)
+
+    def _take(self, bucket: _Bucket) -> bool:
+        now = self.clock()
+        bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+        bucket.updated = now
+        if bucket.tokens < 1:
+            return False
+        bucket.tokens -= 1
+        return True
+
+    def __call__(self, record: LogRecord) -> LogRecord | None:
+        if self._buckets.update(self.key(record), self._take):
+            return record
+        return None
+
+
+class _Seen:
+    __slots__ = ("count", "suppressed", "last", "seen_at")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.suppressed = 0
+        # the last suppressed record, which flush() turns into a summary
+        self.last: LogRecord | None = None
+        self.seen_at = 0.0
+
+
+class DedupFilter:
+    """Let the first `first` records for each key through, then only every `every`th one.
+
+    The record that breaks a run of suppressed records gets the number
+    of records suppressed since the last one that went through
+    in `extra[count_key]`, so it doubles as a summary of what was dropped.
+    A key that has not been seen for `quiet` seconds starts over, as a new storm.
+
+    When a storm ends between two records that go through, nothing breaks the run:
+    `flush()` returns summaries of the records suppressed since, to be logged or handled
+    like any other record (e.g. periodically, and before shutting down).
+    """
+
+    def __init__(
+        self,
+        first: int = 1,
+        every: int = 100,
+        *,
+        key: Key = by_template,
+        count_key: str = "suppressed",
+        max_keys: int = 10_000,
+        quiet: float = 60.0,
+        clock: t.Callable[[], float] = time.monotonic,
+    ) -> None:
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.first = first
+        self.every = every
+        self.key = key
+        self.count_key = count_key
+        self.quiet = quiet
+        self.clock = clock
+        self._seen = _KeyedState(_Seen, max_keys)
+
+    def _see(self, seen: _Seen, record: LogRecord) -> int | None:
+        """Returns the number of suppressed records if this one should be emitted"""
+        now = self.clock()
+        if now - seen.seen_at >= self.quiet:
+            seen.count = 0
+        seen.seen_at = now
+        seen.count += 1
+        if seen.count <= self.first or (seen.count - self.first) % self.every == 0:
+            suppressed, seen.suppressed = seen.suppressed, 0
+            seen.last = None
+            return suppressed
+        seen.suppressed += 1
+        seen.last = record
+        return None
+
+    def __call__(self, record: LogRecord) -> LogRecord | None:
+        suppressed = self._seen.update(self.key(record), self._see, record)
+        if suppressed is None:
+            return None
+        if suppressed:
+            record = record.copy()
+            record.extra[self.count_key] = suppressed
+        return record
+
+    def _summarize(self, seen: _Seen) -> LogRecord | None:
+        if seen.last is None:
+            return None
+        summary = seen.last.copy()
+        summary.extra[self.count_key] = seen.suppressed
+        seen.suppressed = 0
+        seen.last = None
+        return summary
+
+    def flush(self) -> list[LogRecord]:
+        """A summary for every key with suppressed records that were not reported yet.
+
+        Each is a copy of the last record suppressed for the key, with the number suppressed
+        since the last one that went through in `extra[count_key]`.
+        """
+        return self._seen.visit(self._summarize)
+
+
+# Predicates are plain filters that Filterer.filter_batch() can also evaluate column-wise over many records at once
+
+
+class LevelFilter(Predicate):
+    """Keep records at or above `level`"""
+
+    def __init__(self, level: FiltererLevel | LogLevel) -> None:
+        self.level = level
+        self._value = level.value
+
+    def matches(self, record: LogRecord) -> bool:
+        return record.level.value >= self._value
+
+    def mask(self, batch: RecordBatch) -> t.Iterable[bool]:
+        return map(self._value.__le__, batch.levels)
+
+
+class NameFilter(Predicate):
+    """Keep records from the loggers called `names` and their descendants"""
+
+    def __init__(self, *names: str) -> None:
+        self.names = names
+        # "" is the root logger, which every other logger descends from
+        self._prefixes = tuple(name + "." if name else "" for name in names)
+
+    def matches(self, record: LogRecord) -> bool:
+        return (record.name + ".").startswith(self._prefixes)
+
+    def mask(self, batch: RecordBatch) -> t.Iterable[bool]:
+        return map(operator.methodcaller("startswith", self._prefixes), batch.dotted_names)
+
+
+_MISSING: t.Any = object()
+
+
+class ExtraFilter(Predicate):
+    """Keep records whose `extra` contains `key`, or maps it to `value` if one is given"""
+
+    def __init__(self, key: str, value: t.Any = _MISSING) -> None:
+        self.key = key
+        self.value = value
+
+    def matches(self, record: LogRecord) -> bool:
+        if self.value is _MISSING:
+            return self.key in record.extra
+        found = record.extra.get(self.key, _MISSING)
+        if found.__class__ is Lazy:
+            found = found.value
+        return bool(found == self.value)
+
+    def mask(self, batch: RecordBatch) -> t.Iterable[bool]:
+        if self.value is _MISSING:
+            return map(operator.contains, batch.extras, itertools.repeat(self.key))
+        found = list(map(operator.methodcaller("get", self.key, _MISSING), batch.extras))
+        if Lazy in set(map(type, found)):
+            found = [value.value if value.__class__ is Lazy else value for value in found]
+        return map(operator.eq, found, itertools.repeat(self.value))
@@ -0,0 +1,145 @@
+import json
+import operator
+import typing as t
+from json.encoder import encode_basestring_ascii  # type: ignore[attr-defined]
+
+from logs import _RECORD_FIELDS, Formatter, Lazy, LogRecord
+from logs._templates import CompiledTemplate, compile_template
+from logs.levels import LogLevel
+
+
+class CompiledFormatter(Formatter):
+    """A Formatter that parses `fmt` once and renders only the fields it references.
+
+    Output is identical to `Formatter`, including `format_message` and
+    `format_time` overrides, but no per-record dict of fields is built.
+    """
+
+    _template: CompiledTemplate
+    _getters: tuple[t.Callable[[LogRecord], t.Any], ...]
+
+    @property  # type: ignore[override]
+    def fmt(self) -> str:
+        return self._template.template
+
+    @fmt.setter
+    def fmt(self, fmt: str) -> None:
+        self._template = compile_template(fmt)
+        self._getters = tuple(self._getter(name) for name in self._template.fields)
+
+    def _getter(self, name: str) -> t.Callable[[LogRecord], t.Any]:
+        if name == "message":
+            return self.format_message
+        if name == "created_at":
+            return self.format_time
+        if name in _RECORD_FIELDS:
+            return operator.attrgetter(name)
+        return operator.methodcaller("get_field", name)  # raises KeyError, just like str.format
+
+    def format(self, record: LogRecord) -> str:
+        template = self._template
+        if template.static is not None:
+            return template.static
+        return template.render([getter(record) for getter in self._getters])
+
+
+_encode_str: t.Callable[[str], str] = encode_basestring_ascii  # type: ignore[assignment]
+
+
+def _encode_float(value: float) -> str:
+    if value != value or value in (float("inf"), float("-inf")):
+        return json.dumps(value)
+    return float.__repr__(value)
+
+
+# exact types that can be encoded without going through json.dumps
+_NATIVE_ENCODERS: dict[type, t.Callable[[t.Any], str]] = {
+    str: _encode_str,
+    int: int.__repr__,
+    float: _encode_float,
+    bool: lambda value: "true" if value else "false",
+    type(None): lambda value: "null",
+}
+
+_RESERVED_KEYS = frozenset(("name", "level", "created_at", "process", "thread", "message"))
+
+
+class JSONFormatter(Formatter):
+    """Render each record as a single line JSON object (NDJSON).
+
+    The object has `name`, `level`, `created_at`, `process`, `thread` and `message`
+    keys followed by the keys in `extra`. Extra keys that clash with those are prefixed with "extra.".
+
+    Values that are not natively JSON serializable are passed through `default`
+    (just like `json.dumps(default=...)`), which defaults to `str`.
+    `Lazy` values are encoded as whatever they evaluate to.
+    """
+
+    def __init__(self, default: t.Callable[[t.Any], t.Any] = str) -> None:
+        super().__init__()
+        self.default = default
+        self._levels = {level: _encode_str(str(level)) for level in LogLevel}
+        self._names: dict[str, str] = {}
+        self._keys: dict[str, str] = {}
+
+    def _encode_name(self, name: str) -> str:
+        encoded = self._names.get(name)
+        if encoded is None:
+            if len(self._names) > 4096:
+                self._names.clear()
+            encoded = self._names[name] = _encode_str(name)
+        return encoded
+
+    def _encode_key(self, key: str) -> str:
+        encoded = self._keys.get(key)
+        if encoded is None:
+            if len(self._keys) > 4096:
+                self._keys.clear()
+            name = key if isinstance(key, str) else str(key)
+            encoded = self._keys[key] = _encode_str(f"extra.{name}" if name in _RESERVED_KEYS else name)
+        return encoded
+
+    @property
+    def default(self) -> t.Callable[[t.Any], t.Any]:
+        return self._default
+
+    @default.setter
+    def default(self, default: t.Callable[[t.Any], t.Any]) -> None:
+        def resolve(value: t.Any) -> t.Any:
+            if value.__class__ is Lazy:
+                return value.value
+            return default(value)
+
+        self._default = default
+        self._encoder = json.JSONEncoder(default=resolve, separators=(",", ":"))
+
+    def encode_value(self, value: t.Any) -> str:
+        if value.__class__ is Lazy:
+            value = value.value
+        encoder = _NATIVE_ENCODERS.get(value.__class__)
+        if encoder is not None:
+            return encoder(value)
+        return self._encoder.encode(value)
+
+    def format(self, record: LogRecord) -> str:
+        out = (
+            f'{{"name":{self._encode_name(record.name)}'
+            f',"level":{self._levels[record.level]}'
+            f',"created_at":{_encode_str(self.format_time(record))}'
+            f',"process":{record.process}'
+            f',"thread":{record.thread}'
+            f',"message":{_encode_str(self.format_message(record))}'
+        )
+        extra = record.extra
+        if not extra:
+            return out + "}"
+        if extra.__class__ is dict and len(extra) > 8 and _RESERVED_KEYS.isdisjoint(extra):
+            # for larger dicts the C encoder wins, even with the slice
+            try:
+                return f"{out},{self._encoder.encode(extra)[1:]}"
+            except TypeError:
+                # keys it cannot encode, which the loop below turns into strings
+                pass
+        encode_key = self._encode_key
+        encode_value = self.encode_value
+        return out + "".join([f",{encode_key(key)}:{encode_value(value)}" for key, value in extra.items()]) + "}"
@@ -1 +1,1541 @@
-from logs import StreamHandler  # noqa
+import abc
+import asyncio
+import atexit
+import glob
+import gzip
+import multiprocessing
+import operator
+import os
+import pickle
+import shutil
+import socket
+import struct
+import sys
+import threading
+import time
+import traceback
+import typing as t
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from enum import Enum, IntEnum
+from queue import Empty
+
+import logs
+from logs import Handler, Lazy, LogRecord, StreamHandler  # noqa
+from logs._binary import MAGIC, Encoder
+from logs.filters import Key, _KeyedState, by_name
+from logs.formatters import CompiledFormatter
+from logs.levels import FiltererLevel, LogLevel
+
+
+class OverflowPolicy(Enum):
+    """What a full RecordQueue does with a new record"""
+
+    BLOCK = "block"  # wait for the writer to make space
+    DROP_NEWEST = "drop_newest"  # discard the incoming record
+    DROP_OLDEST = "drop_oldest"  # evict the oldest queued record
+    SAMPLE = "sample"  # keep 1 in `sample_rate` overflowing records, evicting the oldest
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class RecordQueue:
+    """A bounded FIFO of records shared between emitting threads and a QueueListener"""
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+        *,
+        sample_rate: int = 10,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if sample_rate < 1:
+            raise ValueError("sample_rate must be at least 1")
+        self.max_size = max_size
+        self.overflow = overflow
+        self.sample_rate = sample_rate
+        self.dropped = 0
+        self._overflowed = 0
+        self._records: deque[LogRecord] = deque()
+        self._unfinished = 0
+        self._closed = False
+        self._init_lock()
+        logs._reinit_after_fork(self)
+
+    def _init_lock(self) -> None:
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._all_done = threading.Condition(self._lock)
+
+    def _at_fork_reinit(self) -> None:
+        self._init_lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, record: LogRecord) -> bool:
+        """Enqueue a record, returning False if it was dropped or the queue is closed"""
+        with self._lock:
+            if self._closed:
+                return False
+            if len(self._records) >= self.max_size:
+                if self.overflow is OverflowPolicy.BLOCK:
+                    while len(self._records) >= self.max_size and not self._closed:
+                        self._not_full.wait()
+                    if self._closed:
+                        return False
+                elif self.overflow is OverflowPolicy.DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                elif self.overflow is OverflowPolicy.DROP_OLDEST:
+                    self._evict_oldest()
+                else:
+                    self._overflowed += 1
+                    if self._overflowed % self.sample_rate:
+                        self.dropped += 1
+                        return False
+                    self._evict_oldest()
+            self._records.append(record)
+            self._unfinished += 1
+            self._not_empty.notify()
+            return True
+
+    def _evict_oldest(self) -> None:
+        self._records.popleft()
+        self._unfinished -= 1
+        self.dropped += 1
+
+    def get_batch(self, max_records: int, timeout: float | None = None) -> list[LogRecord]:
+        """Wait for records and take up to `max_records` of them.
+
+        Returns an empty list once the queue is closed and drained,
+        or if `timeout` expires first.
+        """
+        with self._lock:
+            if not self._records and not self._closed:
+                self._not_empty.wait_for(lambda: self._records or self._closed, timeout)
+            records = self._records
+            batch = [records.popleft() for _ in range(min(max_records, len(records)))]
+            if batch:
+                self._not_full.notify_all()
+            return batch
+
+    def task_done(self, count: int = 1) -> None:
+        with self._lock:
+            self._unfinished -= count
+            if self._unfinished <= 0:
+                self._all_done.notify_all()
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait until every queued record has been handled"""
+        with self._lock:
+            return self._all_done.wait_for(lambda: self._unfinished <= 0, timeout)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+
+_listeners: "weakref.WeakSet[QueueListener]" = weakref.WeakSet()
+
+
+class QueueListener:
+    """Drains a RecordQueue on a background thread, handing records to `handlers` in batches"""
+
+    def __init__(self, queue: RecordQueue, *handlers: Handler, batch_size: int = 256) -> None:
+        self.queue = queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("QueueListener was already started")
+        self._thread = threading.Thread(target=self._run, name="logs.QueueListener", daemon=True)
+        self._thread.start()
+        _listeners.add(self)
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Handle every record still in the queue and stop the writer thread"""
+        self.queue.close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        _listeners.discard(self)
+        for handler in self.handlers:
+            handler.flush()
+
+    def handle_batch(self, records: list[LogRecord]) -> None:
+        for handler in self.handlers:
+            try:
+                handler.handle_batch(records)
+            except Exception:
+                traceback.print_exc(file=sys.stderr)
+
+    def _run(self) -> None:
+        queue = self.queue
+        while True:
+            batch = queue.get_batch(self.batch_size)
+            if not batch:
+                if queue.closed:
+                    return
+                continue
+            try:
+                self.handle_batch(batch)
+            finally:
+                queue.task_done(len(batch))
+
+
+class QueueHandler(Handler):
+    """Hand records off to a background thread that writes them to `handler`.
+
+    The calling thread only pays for filtering and an enqueue;
+    formatting and I/O happen on the QueueListener's thread.
+    Once the listener has been stopped records are handled synchronously.
+    """
+
+    def __init__(
+        self,
+        handler: Handler,
+        level: FiltererLevel = FiltererLevel.NOTSET,
+        *,
+        max_size: int = 10_000,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+        sample_rate: int = 10,
+        batch_size: int = 256,
+    ) -> None:
+        super().__init__(level=level)
+        self.handler = handler
+        self.queue = RecordQueue(max_size, overflow, sample_rate=sample_rate)
+        self.listener = QueueListener(self.queue, handler, batch_size=batch_size)
+        self.listener.start()
+
+    @property
+    def dropped(self) -> int:
+        return self.queue.dropped
+
+    def handle(self, record: LogRecord) -> None:
+        filtered = self.filter(record)
+        if filtered is None:
+            return
+        if not self.queue.put(filtered) and self.queue.closed:
+            self.handler.handle(filtered)
+
+    def _at_fork_reinit(self) -> None:
+        super()._at_fork_reinit()
+        if self.queue.closed:
+            return
+        # the listener thread was not copied into the child, and the records
+        # still queued are the parent's to write: start over with a fresh queue
+        queue = self.queue
+        self.queue = RecordQueue(queue.max_size, queue.overflow, sample_rate=queue.sample_rate)
+        self.listener = QueueListener(self.queue, self.handler, batch_size=self.listener.batch_size)
+        self.listener.start()
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until every record enqueued so far has been handled and flushed"""
+        self.queue.join(timeout)
+        self.handler.flush()
+
+    def close(self, timeout: float | None = None) -> None:
+        self.listener.stop(timeout)
+
+
+class _Ring:
+    """A fixed size circular buffer of records, allocated up front"""
+
+    __slots__ = ("records", "start", "size")
+
+    def __init__(self, capacity: int) -> None:
+        self.records: list[LogRecord | None] = [None] * capacity
+        self.start = 0
+        self.size = 0
+
+    def append(self, record: LogRecord) -> None:
+        records = self.records
+        capacity = len(records)
+        if self.size < capacity:
+            records[(self.start + self.size) % capacity] = record
+            self.size += 1
+        else:
+            # full: overwrite the oldest record
+            records[self.start] = record
+            self.start = (self.start + 1) % capacity
+
+    def drain(self) -> list[LogRecord]:
+        records = self.records
+        end = self.start + self.size
+        drained = records[self.start : end] + records[: max(end - len(records), 0)]
+        records[:] = [None] * len(records)
+        self.start = self.size = 0
+        return drained  # type: ignore[return-value]
+
+
+class RingBufferHandler(Handler):
+    """Buffer the last `capacity` records, writing them to `target` once one at `trigger_level` or above arrives.
+
+    There is a separate buffer per `key`: one per logger by default,
+    or e.g. one per request with `key=by_extra("request_id")` and `bind(request_id=...)`.
+    Only the buffer the triggering record belongs to is written out.
+    At most `max_keys` buffers are kept, the least recently used ones are dropped first.
+
+    Buffered records are not formatted until they are written out,
+    so values in their `extra` should not be mutated after logging.
+    """
+
+    def __init__(
+        self,
+        target: Handler,
+        capacity: int = 1000,
+        trigger_level: FiltererLevel = FiltererLevel.ERROR,
+        level: FiltererLevel = FiltererLevel.NOTSET,
+        *,
+        key: Key = by_name,
+        max_keys: int = 1000,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        super().__init__(level=level)
+        self.target = target
+        self.capacity = capacity
+        self.trigger_level = trigger_level
+        self.key = key
+        self._buffers: _KeyedState[_Ring] = _KeyedState(lambda: _Ring(capacity), max_keys)
+
+    def handle(self, record: LogRecord) -> None:
+        filtered = self.filter(record)
+        if filtered is None:
+            return
+        if filtered.level.value < self.trigger_level.value:
+            self._buffers.update(self.key(filtered), _Ring.append, filtered)
+            return
+        history = self._buffers.update(self.key(filtered), _Ring.drain)
+        history.append(filtered)
+        self.target.handle_batch(history)
+
+    def dump(self) -> None:
+        """Write out every buffered record, oldest first, without waiting for a trigger"""
+        records = [record for ring in self._buffers.pop_all() for record in ring.drain()]
+        if records:
+            records.sort(key=lambda record: record.created_ns)
+            self.target.handle_batch(records)
+
+    def flush(self) -> None:
+        self.target.flush()
+
+
+class AsyncHandler(Handler):
+    """Write records from asyncio services without blocking the event loop.
+
+    Records are put on an asyncio.Queue and formatted and written in batches by a task on the loop the handler
+    was started on (by `start()`, or automatically by the first record logged from a running loop).
+    `stream` is either an asyncio.StreamWriter or a regular text stream, which is then written to on a worker thread.
+    Records logged from other threads are handed to the loop with `call_soon_threadsafe`.
+
+    Records that do not fit in the queue (`max_size`) are dropped and counted in `dropped`.
+    Before the handler is started and after it is closed records are written synchronously,
+    except that a StreamWriter (like any asyncio transport) is only written to from its loop's thread:
+    records from other threads are handed to the loop, or dropped if it is not running.
+    """
+
+    def __init__(
+        self,
+        stream: asyncio.StreamWriter | t.TextIO = sys.stderr,
+        level: FiltererLevel = FiltererLevel.NOTSET,
+        *,
+        max_size: int = 10_000,
+        batch_size: int = 256,
+        encoding: str = "utf-8",
+    ) -> None:
+        super().__init__(level=level)
+        self.stream = stream
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.encoding = encoding
+        self.dropped = 0
+        self._write_lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        # the loop the handler was last started on, which a StreamWriter belongs to
+        self._writer_loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[LogRecord] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._closed = False
+
+    def start(self) -> None:
+        """Start writing from the running event loop"""
+        if self._task is not None and not self._task.done():
+            raise RuntimeError("AsyncHandler was already started")
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(self.max_size)
+        self._task = loop.create_task(self._run(self._queue), name="logs.AsyncHandler")
+        self._loop_thread = threading.get_ident()
+        self._loop = self._writer_loop = loop
+
+    def handle(self, record: LogRecord) -> None:
+        filtered = self.filter(record)
+        if filtered is None:
+            return
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            if self._closed:
+                self._write_now([filtered])
+                return
+            try:
+                self.start()
+            except RuntimeError:
+                self._write_now([filtered])
+                return
+            loop = self._loop
+        if threading.get_ident() == self._loop_thread:
+            self._put(filtered)
+            return
+        try:
+            loop.call_soon_threadsafe(self._put, filtered)  # type: ignore[union-attr]
+        except RuntimeError:  # the loop was closed in the meantime
+            self._write_now([filtered])
+
+    def _put(self, record: LogRecord) -> None:
+        queue = self._queue
+        if queue is None:  # closed after the record was handed over from another thread
+            self._write_now([record])
+            return
+        try:
+            queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def _format(self, records: list[LogRecord]) -> str:
+        formatter = self.formatter
+        lines = [formatter.format(record) + "\n" for record in records]
+        callsites = logs._callsites
+        if callsites is not None:
+            for record, line in zip(records, lines):
+                callsites.formatted(record, len(line))
+        return "".join(lines)
+
+    def _write_now(self, records: list[LogRecord]) -> None:
+        text = self._format(records)
+        if isinstance(self.stream, asyncio.StreamWriter):
+            data = text.encode(self.encoding)
+            loop = self._writer_loop
+            if threading.get_ident() == self._loop_thread:
+                self._write_bytes(self.stream, data, len(records))
+            elif loop is not None and loop.is_running():
+                try:
+                    loop.call_soon_threadsafe(self._write_bytes, self.stream, data, len(records))
+                except RuntimeError:  # the loop was closed in the meantime
+                    self.dropped += len(records)
+            else:
+                self.dropped += len(records)
+            return
+        with self._write_lock:
+            self.stream.write(text)
+
+    def _write_bytes(self, writer: asyncio.StreamWriter, data: bytes, count: int) -> None:
+        if writer.is_closing():
+            self.dropped += count
+        else:
+            # no backpressure without awaiting drain(), but the transport buffers the write for us
+            writer.write(data)
+
+    async def _write(self, records: list[LogRecord]) -> None:
+        if isinstance(self.stream, asyncio.StreamWriter):
+            self.stream.write(self._format(records).encode(self.encoding))
+            await self.stream.drain()
+        else:
+            await asyncio.to_thread(self._write_now, records)
+
+    async def _run(self, queue: "asyncio.Queue[LogRecord]") -> None:
+        batch: list[LogRecord] = []
+        try:
+            while True:
+                batch.append(await queue.get())
+                while len(batch) < self.batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+                try:
+                    await self._write(batch)
+                except Exception:
+                    traceback.print_exc(file=sys.stderr)
+                finally:
+                    for _ in batch:
+                        queue.task_done()
+                    batch = []
+        except asyncio.CancelledError:
+            # the loop is shutting down without aclose(): don't lose what is still queued
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+                queue.task_done()
+            if batch:
+                self._write_now(batch)
+            raise
+
+    async def aflush(self) -> None:
+        """Wait until every record logged so far has been written"""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+        if isinstance(self.stream, asyncio.StreamWriter):
+            await self.stream.drain()
+        else:
+            await asyncio.to_thread(self._flush_stream)
+
+    async def aclose(self) -> None:
+        """Write out every pending record and stop the writer task"""
+        await self.aflush()
+        self._closed = True
+        task, self._task, self._loop, self._queue = self._task, None, None, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def _flush_stream(self) -> None:
+        with self._write_lock:
+            self.stream.flush()  # type: ignore[union-attr]
+
+    def _at_fork_reinit(self) -> None:
+        super()._at_fork_reinit()
+        # held by a to_thread worker that was writing when the process forked
+        self._write_lock = threading.Lock()
+
+    def flush(self) -> None:
+        """Wait for pending records from threads other than the event loop's, which cannot block"""
+        loop = self._loop
+        if loop is not None and threading.get_ident() != self._loop_thread and loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.aflush(), loop).result()
+        elif not isinstance(self.stream, asyncio.StreamWriter):
+            self._flush_stream()
+
+
+def _formatter_key(formatter: logs.Formatter) -> t.Hashable:
+    # the output of these only depends on their template, so equal ones can share their output,
+    # anything else (e.g. a subclass overriding format_time) is only shared with itself
+    if formatter.__class__ is logs.Formatter or formatter.__class__ is CompiledFormatter:
+        return formatter.__class__, formatter.fmt
+    return id(formatter)
+
+
+def _format(formatter: logs.Formatter, record: LogRecord) -> str:
+    text = formatter.format(record) + "\n"
+    if logs._callsites is not None:
+        logs._callsites.formatted(record, len(text))
+    return text
+
+
+def _format_batch(formatter: logs.Formatter, records: t.Sequence[LogRecord]) -> str:
+    lines = [formatter.format(record) for record in records]
+    if logs._callsites is not None:
+        logs._callsites.formatted_batch(records, lines)
+    lines.append("")
+    return "\n".join(lines)
+
+
+class _Sink:
+    """The writes pending for one background child of a FanoutHandler.
+
+    At most one pool task drains a sink at a time, which keeps its writes in order.
+    """
+
+    def __init__(self, handler: Handler, writes_text: bool) -> None:
+        self.handler = handler
+        self.writes_text = writes_text
+        # formatted text for StreamHandlers, records for other handlers
+        self.pending: deque[t.Any] = deque()
+        self.scheduled = False
+        self.ready = threading.Condition(threading.Lock())
+
+
+class FanoutHandler(Handler):
+    """Send records to several handlers, formatting each record only once per distinct formatter.
+
+    StreamHandler children (FileHandler, RotatingFileHandler, ...) are handed formatted text:
+    children that share a formatter, or have a plain Formatter or CompiledFormatter with the same
+    template, share the output of a single format call. Other handlers get the record as usual.
+
+    Children in `background` are written to on a thread pool rather than on the calling thread,
+    each in the order records were logged, so a slow sink holds up neither the caller nor the other children.
+    At most `max_pending` writes are kept waiting per background child, beyond that logging blocks.
+    Closing a FanoutHandler waits for pending writes but leaves its children open.
+    """
+
+    def __init__(
+        self,
+        handlers: t.Sequence[Handler],
+        level: FiltererLevel = FiltererLevel.NOTSET,
+        *,
+        background: t.Sequence[Handler] = (),
+        max_pending: int = 10_000,
+    ) -> None:
+        super().__init__(level=level)
+        self.handlers = list(handlers)
+        self.background = list(background)
+        self.max_pending = max_pending
+        self._closed = False
+        self._start()
+
+    def _start(self) -> None:
+        children: list[tuple[Handler, bool, _Sink | None]] = []
+        for handler in self.handlers:
+            children.append((handler, self._writes_text(handler), None))
+        for handler in self.background:
+            writes_text = self._writes_text(handler)
+            children.append((handler, writes_text, _Sink(handler, writes_text)))
+        self._children = children
+        self._pool = (
+            ThreadPoolExecutor(max_workers=len(self.background), thread_name_prefix="logs.FanoutHandler")
+            if self.background
+            else None
+        )
+
+    @staticmethod
+    def _writes_text(handler: Handler) -> bool:
+        # only handlers that handle records the way StreamHandler does can be given its formatted output
+        return isinstance(handler, StreamHandler) and type(handler).handle is StreamHandler.handle
+
+    def handle(self, record: LogRecord) -> None:
+        filtered = self.filter(record)
+        if filtered is None:
+            return
+        record = filtered
+        texts: dict[t.Hashable, str] = {}
+        for handler, writes_text, sink in self._children:
+            if not writes_text:
+                if sink is None:
+                    handler.handle(record)
+                else:
+                    self._submit(sink, record)
+                continue
+            stream_handler = t.cast(StreamHandler, handler)
+            filtered = stream_handler.filter(record)
+            if filtered is None:
+                continue
+            if filtered is record:
+                key = _formatter_key(stream_handler.formatter)
+                text = texts.get(key)
+                if text is None:
+                    text = texts[key] = _format(stream_handler.formatter, record)
+            else:
+                # a filter of the child's own changed the record
+                text = _format(stream_handler.formatter, filtered)
+            if sink is None:
+                stream_handler.write(text)
+            else:
+                self._submit(sink, text)
+
+    def handle_batch(self, records: t.Sequence[LogRecord]) -> None:
+        records = self.filter_batch(records)
+        if not records:
+            return
+        texts: dict[t.Hashable, str] = {}
+        for handler, writes_text, sink in self._children:
+            if not writes_text:
+                if sink is None:
+                    handler.handle_batch(records)
+                else:
+                    for record in records:
+                        self._submit(sink, record)
+                continue
+            stream_handler = t.cast(StreamHandler, handler)
+            kept = stream_handler.filter_batch(records)
+            if not kept:
+                continue
+            if len(kept) == len(records) and all(map(operator.is_, kept, records)):
+                key = _formatter_key(stream_handler.formatter)
+                text = texts.get(key)
+                if text is None:
+                    text = texts[key] = _format_batch(stream_handler.formatter, records)
+            else:
+                text = _format_batch(stream_handler.formatter, kept)
+            if sink is None:
+                stream_handler.write(text)
+            else:
+                self._submit(sink, text)
+
+    def _submit(self, sink: _Sink, item: t.Any) -> None:
+        with sink.ready:
+            closed = self._closed
+            if not closed:
+                while len(sink.pending) >= self.max_pending:
+                    sink.ready.wait()
+                sink.pending.append(item)
+                if sink.scheduled:
+                    return
+                sink.scheduled = True
+        if closed:
+            self._write(sink, [item])
+        else:
+            t.cast(ThreadPoolExecutor, self._pool).submit(self._drain, sink)
+
+    def _drain(self, sink: _Sink) -> None:
+        while True:
+            with sink.ready:
+                if not sink.pending:
+                    sink.scheduled = False
+                    sink.ready.notify_all()
+                    return
+                items = list(sink.pending)
+                sink.pending.clear()
+                sink.ready.notify_all()
+            self._write(sink, items)
+
+    @staticmethod
+    def _write(sink: _Sink, items: list[t.Any]) -> None:
+        try:
+            if sink.writes_text:
+                t.cast(StreamHandler, sink.handler).write("".join(items))
+            else:
+                sink.handler.handle_batch(items)
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+
+    def _wait(self) -> None:
+        for _, _, sink in self._children:
+            if sink is None:
+                continue
+            with sink.ready:
+                while sink.scheduled:
+                    sink.ready.wait()
+
+    def flush(self) -> None:
+        """Wait for pending background writes, then flush every child"""
+        self._wait()
+        for handler, _, _ in self._children:
+            handler.flush()
+
+    def close(self) -> None:
+        """Write out everything pending and stop the thread pool, records logged afterwards are written synchronously"""
+        # a record submitted before this was scheduled under its sink's lock, so waiting covers it
+        self._closed = True
+        self._wait()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def _at_fork_reinit(self) -> None:
+        super()._at_fork_reinit()
+        # the pool's threads were not copied into the child, and what they had pending is the parent's to write
+        if not self._closed:
+            self._start()
+
+
+class FsyncPolicy(Enum):
+    """When a FileHandler forces written data to disk"""
+
+    NEVER = "never"  # leave it to the OS
+    ON_FLUSH = "on_flush"  # every time the write buffer is flushed (on flush(), rotation and close())
+    ALWAYS = "always"  # after every write, this is slow
+
+    def __str__(self) -> str:
+        return self.value
+
+
+_open_files: "weakref.WeakSet[FileHandler | BinaryHandler | _NetworkHandler]" = weakref.WeakSet()
+
+
+@atexit.register
+def _shutdown() -> None:
+    # background writers first: the records they still hold go to files and sockets that are closed last
+    for listener in list(_listeners):
+        listener.stop()
+    for handler in list(_open_files):
+        handler.close()
+
+
+class FileHandler(StreamHandler):
+    """Append formatted records to a file through a large write buffer"""
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        level: FiltererLevel = FiltererLevel.NOTSET,
+        *,
+        encoding: str = "utf-8",
+        buffer_size: int = 64 * 1024,
+        fsync: FsyncPolicy = FsyncPolicy.NEVER,
+    ) -> None:
+        self.path = os.fspath(path)
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.fsync = fsync
+        super().__init__(level=level, stream=self._open())
+        _open_files.add(self)
+
+    def _open(self) -> t.TextIO:
+        return open(self.path, "a", buffering=self.buffer_size, encoding=self.encoding)
+
+    def _stream_state(self) -> None:
+        # another process appends to the file through a stream of its own
+        return None
+
+    def _restore_stream(self, state: None) -> t.TextIO:
+        _open_files.add(self)
+        return self._open()
+
+    def write(self, text: str) -> None:
+        with self._stream_lock:
+            self.stream.write(text)
+            if self.fsync is FsyncPolicy.ALWAYS:
+                self._flush()
+
+    def _flush(self) -> None:
+        self.stream.flush()
+        if self.fsync is not FsyncPolicy.NEVER:
+            os.fsync(self.stream.fileno())
+
+    def flush(self) -> None:
+        with self._stream_lock:
+            if not self.stream.closed:
+                self._flush()
+
+    def close(self) -> None:
+        with self._stream_lock:
+            if not self.stream.closed:
+                self._flush()
+                self.stream.close()
+        _open_files.discard(self)
+
+
+class BinaryHandler(Handler):
+    """Append records to a file in a compact binary format, use `logs.decode` to read them back.
+
+    Logger names, templates and `extra` keys are written once and referenced by id afterwards,
+    timestamps are stored as the difference to the previous record's. The formatter is not used.
+    Once `max_strings` strings were written the handler starts over, defining them again as they are used.
+
+    A forked child continues in its own file, `<path>.<pid>`,
+    since every entry depends on what the same writer wrote before it.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        level: FiltererLevel = FiltererLevel.NOTSET,
+        *,
+        buffer_size: int = 64 * 1024,
+        max_strings: int = 10_000,
+    ) -> None:
+        super().__init__(level=level)
+        self.path = os.fspath(path)
+        self.buffer_size = buffer_size
+        self.max_strings = max_strings
+        self._stream_lock = threading.Lock()
+        self._open()
+        _open_files.add(self)
+
+    def _open(self) -> None:
+        self._stream = open(self.path, "ab", buffering=self.buffer_size)
+        if self._stream.tell() == 0:
+            self._stream.write(MAGIC)
+        self._encoder = Encoder(self.max_strings)
+
+    def handle(self, record: LogRecord) -> None:
+        filtered = self.filter(record)
+        if filtered is None:
+            return
+        out = bytearray()
+        with self._stream_lock:
+            self._encoder.encode(filtered, out)
+            self._stream.write(out)
+
+    def handle_batch(self, records: t.Sequence[LogRecord]) -> None:
+        filtered = self.filter_batch(records)
+        if not filtered:
+            return
+        out = bytearray()
+        with self._stream_lock:
+            encode = self._encoder.encode
+            for record in filtered:
+                encode(record, out)
+            self._stream.write(out)
+
+    def flush(self) -> None:
+        with self._stream_lock:
+            if not self._stream.closed:
+                self._stream.flush()
+
+    def close(self) -> None:
+        with self._stream_lock:
+            self._stream.close()
+        _open_files.discard(self)
+
+    def _before_fork(self) -> None:
+        self.flush()
+
+    def _at_fork_reinit(self) -> None:
+        super()._at_fork_reinit()
+        self._stream_lock = threading.Lock()
+        if not self._stream.closed:
+            self.path = f"{self.path}.{os.getpid()}"
+            self._open()
+
+
+try:  # Python 3.14+
+    from compression import zstd as _zstd  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover
+    _zstd = None
+
+
+def _compressor(compression: str | None) -> tuple[str, t.Callable[..., t.BinaryIO]] | None:
+    if compression is None:
+        return None
+    if compression == "zstd" and _zstd is not None:
+        return ".zst", _zstd.open
+    if compression in ("zstd", "gzip"):
+        # gzip.open is overloaded on the mode, and only ever called with "wb"
+        return ".gz", t.cast(t.Callable[..., t.BinaryIO], gzip.open)
+    raise ValueError(f"Unknown compression {compression!r}, expected 'gzip' or 'zstd'")
+
+
+class RotatingFileHandler(FileHandler):
+    """A FileHandler that rotates the file by size and/or age.
+
+    Rotation renames the current file to `<path>.<timestamp>` and opens a fresh one.
+    Compressing rotated files and deleting ones beyond `backup_count` happen
+    on a background thread so that emitting threads never wait on them.
+
+    `compression` is "gzip" or "zstd" (which falls back to gzip if the
+    standard library has no zstd support).
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        level: FiltererLevel = FiltererLevel.NOTSET,
+        *,
+        max_bytes: int | None = None,
+        interval: float | None = None,
+        backup_count: int | None = None,
+        compression: str | None = None,
+        encoding: str = "utf-8",
+        buffer_size: int = 64 * 1024,
+        fsync: FsyncPolicy = FsyncPolicy.NEVER,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self._compressor = _compressor(compression)
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="logs.RotatingFileHandler")
+        super().__init__(path, level, encoding=encoding, buffer_size=buffer_size, fsync=fsync)
+
+    def _open(self) -> t.TextIO:
+        stream = super()._open()
+        # size is tracked in characters written, which matches bytes for ASCII logs
+        self._size = stream.tell()
+        self._rollover_at = time.time() + self.interval if self.interval is not None else None
+        return stream
+
+    def write(self, text: str) -> None:
+        with self._stream_lock:
+            if self._should_rollover(len(text)):
+                self.rollover()
+            self.stream.write(text)
+            self._size += len(text)
+            if self.fsync is FsyncPolicy.ALWAYS:
+                self._flush()
+
+    def _should_rollover(self, size: int) -> bool:
+        if self._size == 0:
+            return False
+        if self.max_bytes is not None and self._size + size > self.max_bytes:
+            return True
+        return self._rollover_at is not None and time.time() >= self._rollover_at
+
+    def rollover(self) -> None:
+        with self._stream_lock:
+            self._flush()
+            self.stream.close()
+            rotated = self._rotated_name()
+            os.replace(self.path, rotated)
+            self.stream = self._open()
+        self._worker.submit(self._finish_rotation, rotated)
+
+    def _rotated_name(self) -> str:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        rotated = f"{self.path}.{stamp}"
+        suffix = 0
+        while glob.glob(glob.escape(rotated) + "*"):
+            suffix += 1
+            rotated = f"{self.path}.{stamp}-{suffix}"
+        return rotated
+
+    def _finish_rotation(self, rotated: str) -> None:
+        try:
+            if self._compressor is not None:
+                extension, open_compressed = self._compressor
+                tmp = f"{rotated}{extension}.tmp"
+                with open(rotated, "rb") as src, open_compressed(tmp, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                os.replace(tmp, rotated + extension)
+                os.remove(rotated)
+            if self.backup_count is not None:
+                backups = sorted(name for name in glob.glob(glob.escape(self.path) + ".*") if not name.endswith(".tmp"))
+                for name in backups[: max(len(backups) - self.backup_count, 0)]:
+                    os.remove(name)
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+
+    def _at_fork_reinit(self) -> None:
+        super()._at_fork_reinit()
+        # the worker thread was not copied into the child: pending rotations are left to the parent
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="logs.RotatingFileHandler")
+
+    def __getstate__(self) -> dict[str, t.Any]:
+        state = super().__getstate__()
+        del state["_worker"]
+        return state
+
+    def __setstate__(self, state: dict[str, t.Any]) -> None:
+        super().__setstate__(state)
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="logs.RotatingFileHandler")
+
+    def close(self) -> None:
+        super().close()
+        self._worker.shutdown(wait=True)
+
+
+_LEVELS = {level.value: level for level in LogLevel}
+
+
+def _encode_record(record: LogRecord) -> bytes:
+    extra = {key: value.value if value.__class__ is Lazy else value for key, value in record.extra.items()}
+    payload = (
+        record.template,
+        record.name,
+        record.level.value,
+        extra,
+        record.created_ns,
+        record.process,
+        record.thread,
+    )
+    try:
+        return pickle.dumps(payload, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        # don't lose the record over a value that can't cross the process boundary
+        payload = payload[:3] + ({key: _picklable(value) for key, value in extra.items()},) + payload[4:]
+        return pickle.dumps(payload, pickle.HIGHEST_PROTOCOL)
+
+
+def _picklable(value: t.Any) -> t.Any:
+    try:
+        pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return repr(value)
+    return value
+
+
+def _decode_record(data: bytes) -> LogRecord:
+    template, name, level, extra, created_ns, process, thread = pickle.loads(data)
+    return LogRecord(template, name, _LEVELS[level], extra, process=process, thread=thread, created_ns=created_ns)
+
+
+class ProcessQueueHandler(Handler):
+    """Send records to a ProcessQueueListener over a `multiprocessing` queue.
+
+    Records are pickled into a compact tuple on the calling thread and
+    formatted by the listener's handlers in the listener process,
+    so worker processes never pay for formatting and a single process owns the sink.
+    `Lazy` extra values are evaluated before sending; values that can't be pickled are sent as their repr().
+    """
+
+    def __init__(
+        self,
+        queue: "multiprocessing.Queue[bytes | None]",
+        level: FiltererLevel = FiltererLevel.NOTSET,
+    ) -> None:
+        super().__init__(level=level)
+        self.queue = queue
+
+    def handle(self, record: LogRecord) -> None:
+        filtered = self.filter(record)
+        if filtered is None:
+            return
+        self.queue.put(_encode_record(filtered))
+
+
+def _listen(queue: "multiprocessing.Queue[bytes | None]", handlers: t.Sequence[Handler], batch_size: int) -> None:
+    # this process must not inherit logging config (which could route records back into the queue);
+    # if it was forked, the handlers' locks have already been replaced by the library's at-fork hook
+    logs._log_manager.initialize()
+    stopping = False
+    while not stopping:
+        payloads = [queue.get()]
+        while len(payloads) < batch_size:
+            try:
+                payloads.append(queue.get_nowait())
+            except Empty:
+                break
+        records = []
+        for payload in payloads:
+            if payload is None:
+                stopping = True
+            else:
+                records.append(_decode_record(payload))
+        if records:
+            for handler in handlers:
+                try:
+                    handler.handle_batch(records)
+                except Exception:
+                    traceback.print_exc(file=sys.stderr)
+    for handler in handlers:
+        handler.close()
+
+
+class ProcessQueueListener:
+    """A dedicated process that receives records from ProcessQueueHandlers and writes them to `handlers`.
+
+    With the "spawn" and "forkserver" start methods `handlers` are pickled
+    into the listener process, with "fork" they are inherited. Pickled file
+    handlers open their file again in the listener, a StreamHandler can only
+    be pickled if it writes to stdout or stderr.
+    """
+
+    def __init__(
+        self,
+        *handlers: Handler,
+        context: multiprocessing.context.BaseContext | None = None,
+        batch_size: int = 256,
+    ) -> None:
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self._context = context or multiprocessing.get_context()
+        self.queue: "multiprocessing.Queue[bytes | None]" = self._context.Queue()
+        self._process: multiprocessing.process.BaseProcess | None = None
+
+    def handler(self, level: FiltererLevel = FiltererLevel.NOTSET) -> ProcessQueueHandler:
+        """Create a handler that sends records to this listener"""
+        return ProcessQueueHandler(self.queue, level=level)
+
+    def start(self) -> None:
+        if self._process is not None:
+            raise RuntimeError("ProcessQueueListener was already started")
+        self._process = self._context.Process(  # type: ignore[attr-defined]
+            target=_listen,
+            args=(self.queue, self.handlers, self.batch_size),
+            name="logs.ProcessQueueListener",
+            daemon=True,
+        )
+        self._process.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Write out every record sent so far and stop the listener process"""
+        if self._process is None:
+            return
+        self.queue.put(None)
+        self._process.join(timeout)
+        self._process = None
+
+
+class _NetworkHandler(Handler, abc.ABC):
+    """Format records into frames on the calling thread and send them from a background thread.
+
+    Frames wait in a buffer of at most `max_buffer` bytes, when it overflows (e.g. while the peer
+    is unreachable) the oldest frames are dropped. The sender gathers up to `batch_size` bytes
+    per send, waiting at most `flush_interval` seconds for a batch to fill up, and after a failure
+    reconnects with exponential backoff, from `backoff` up to `max_backoff` seconds.
+
+    Delivery is counted in `sent` (records), `dropped` (records) and `errors` (failed attempts),
+    the last failure is kept in `last_error`.
+    """
+
+    def __init__(
+        self,
+        level: FiltererLevel = FiltererLevel.NOTSET,
+        *,
+        max_buffer: int = 4 * 1024 * 1024,
+        batch_size: int = 64 * 1024,
+        flush_interval: float = 0.05,
+        backoff: float = 0.1,
+        max_backoff: float = 30.0,
+        timeout: float = 5.0,
+    ) -> None:
+        super().__init__(level=level)
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error: OSError | None = None
+        self._closed = False
+        self._start()
+        _open_files.add(self)
+
+    def _start(self) -> None:
+        self._frames: deque[bytes] = deque()
+        self._buffered = 0
+        # records taken by the sender that are neither delivered nor back in _frames yet
+        self._in_flight = 0
+        self._flushing = 0
+        self._down = False
+        self._sock: socket.socket | None = None
+        self._ready = threading.Condition(threading.Lock())
+        self._thread = threading.Thread(target=self._run, name=f"logs.{type(self).__name__}", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Records logged but not sent yet"""
+        return len(self._frames) + self._in_flight
+
+    @abc.abstractmethod
+    def _connect(self) -> socket.socket:
+        """Open a connection to the peer, raise OSError if it cannot be reached"""
+
+    @abc.abstractmethod
+    def _frame(self, record: LogRecord) -> bytes:
+        """Format `record` into the bytes sent for it"""
+
+    @abc.abstractmethod
+    def _send(self, sock: socket.socket, frames: list[bytes]) -> int:
+        """Send `frames`, returning how many of them were delivered, raise OSError if none were"""
+
+    def handle(self, record: LogRecord) -> None:
+        filtered = self.filter(record)
+        if filtered is None:
+            return
+        self._enqueue([self._frame(filtered)])
+
+    def handle_batch(self, records: t.Sequence[LogRecord]) -> None:
+        records = self.filter_batch(records)
+        if records:
+            self._enqueue([self._frame(record) for record in records])
+
+    def _enqueue(self, frames: list[bytes]) -> None:
+        with self._ready:
+            if self._closed:
+                self.dropped += len(frames)
+                return
+            was_empty = not self._frames
+            below_batch_size = self._buffered < self.batch_size
+            self._frames.extend(frames)
+            self._buffered += sum(map(len, frames))
+            self._trim()
+            # the sender waits for a first frame, then for a full batch (or flush_interval)
+            if was_empty or (below_batch_size and self._buffered >= self.batch_size):
+                self._ready.notify_all()
+
+    def _trim(self) -> None:
+        while self._buffered > self.max_buffer and self._frames:
+            self._buffered -= len(self._frames.popleft())
+            self.dropped += 1
+
+    def _take(self) -> list[bytes]:
+        batch = [self._frames.popleft()]
+        size = len(batch[0])
+        while self._frames and size + len(self._frames[0]) <= self.batch_size:
+            frame = self._frames.popleft()
+            batch.append(frame)
+            size += len(frame)
+        self._buffered -= size
+        self._in_flight = len(batch)
+        return batch
+
+    def _run(self) -> None:
+        delay = self.backoff
+        try:
+            while True:
+                with self._ready:
+                    while not self._frames and not self._closed:
+                        self._ready.wait()
+                    if not self._frames:
+                        return
+                    if self._buffered < self.batch_size and not (self._closed or self._flushing):
+                        self._ready.wait(self.flush_interval)
+                    batch = self._take()
+                if self._deliver(batch):
+                    delay = self.backoff
+                    continue
+                with self._ready:
+                    if self._closed:
+                        # nothing is going to wait for a reconnect
+                        self.dropped += len(self._frames)
+                        self._frames.clear()
+                        self._buffered = 0
+                        self._ready.notify_all()
+                        return
+                    self._down = True
+                    self._ready.notify_all()
+                    deadline = time.monotonic() + delay
+                    while not self._closed and (remaining := deadline - time.monotonic()) > 0:
+                        self._ready.wait(remaining)
+                    self._down = False
+                delay = min(delay * 2, self.max_backoff)
+        finally:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+    def _deliver(self, batch: list[bytes]) -> bool:
+        delivered = 0
+        try:
+            if self._sock is None:
+                self._sock = self._connect()
+            delivered = self._send(self._sock, batch)
+        except OSError as error:
+            self.last_error = error
+        with self._ready:
+            self.sent += delivered
+            self._in_flight = 0
+            failed = delivered < len(batch)
+            if failed:
+                self.errors += 1
+                rest = batch[delivered:]
+                self._frames.extendleft(reversed(rest))
+                self._buffered += sum(map(len, rest))
+                self._trim()
+            self._ready.notify_all()
+        if failed and self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        return not failed
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Send what was logged so far, waiting until it was sent or an attempt to send it failed"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._ready:
+            errors = self.errors
+            self._flushing += 1
+            self._ready.notify_all()
+            try:
+                while (self._frames or self._in_flight) and self.errors == errors and not self._down:
+                    if deadline is None:
+                        self._ready.wait()
+                    elif not self._ready.wait(deadline - time.monotonic()):
+                        break
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout: float | None = None) -> None:
+        """Send what is left (records still waiting after one failed attempt are dropped) and stop the sender"""
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+        self._thread.join(timeout)
+        _open_files.discard(self)
+
+    def _at_fork_reinit(self) -> None:
+        super()._at_fork_reinit()
+        if self._closed:
+            return
+        # the sender thread was not copied into the child, the frames it was sending are the parent's,
+        # and the parent keeps using the connection: only close the child's copy of it
+        if self._sock is not None:
+            self._sock.close()
+        self._start()
+
+
+_LENGTH = struct.Struct(">I")
+
+
+class SocketHandler(_NetworkHandler):
+    """Send records over TCP, to a `(host, port)` address, or over a Unix stream socket, to a path.
+
+    With `framing="newline"` each record is followed by a newline, so messages must not contain
+    newlines themselves (JSONFormatter escapes them). With `framing="length"` each record is
+    preceded by its length in bytes, as a 4 byte big-endian integer.
+
+    Records are sent in batches over a single connection that is kept open. Records can be
+    sent twice after a failed send, and are lost if the peer goes away in the middle of one.
+    """
+
+    def __init__(
+        self,
+        address: tuple[str, int] | str,
+        level: FiltererLevel = FiltererLevel.NOTSET,
+        *,
+        framing: str = "newline",
+        encoding: str = "utf-8",
+        max_buffer: int = 4 * 1024 * 1024,
+        batch_size: int = 64 * 1024,
+        flush_interval: float = 0.05,
+        backoff: float = 0.1,
+        max_backoff: float = 30.0,
+        timeout: float = 5.0,
+    ) -> None:
+        if framing not in ("newline", "length"):
+            raise ValueError(f"Unknown framing {framing!r}, expected 'newline' or 'length'")
+        self.address = address
+        self.framing = framing
+        self.encoding = encoding
+        super().__init__(
+            level,
+            max_buffer=max_buffer,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            backoff=backoff,
+            max_backoff=max_backoff,
+            timeout=timeout,
+        )
+
+    def _connect(self) -> socket.socket:
+        if isinstance(self.address, str):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.settimeout(self.timeout)
+                sock.connect(self.address)
+            except OSError:
+                sock.close()
+                raise
+            return sock
+        return socket.create_connection(self.address, timeout=self.timeout)
+
+    def _frame(self, record: LogRecord) -> bytes:
+        text = self.formatter.format(record)
+        if logs._callsites is not None:
+            logs._callsites.formatted(record, len(text) + 1)
+        data = text.encode(self.encoding)
+        if self.framing == "length":
+            return _LENGTH.pack(len(data)) + data
+        return data + b"\n"
+
+    def _send(self, sock: socket.socket, frames: list[bytes]) -> int:
+        # a connection the peer closed still accepts a write, check for the close first
+        sock.setblocking(False)
+        try:
+            closed = not sock.recv(1, socket.MSG_PEEK)
+        except BlockingIOError:
+            closed = False
+        finally:
+            sock.settimeout(self.timeout)
+        if closed:
+            raise ConnectionResetError("Connection closed by the peer")
+        sock.sendall(b"".join(frames))
+        return len(frames)
+
+
+class SyslogFacility(IntEnum):
+    KERN = 0
+    USER = 1
+    MAIL = 2
+    DAEMON = 3
+    AUTH = 4
+    SYSLOG = 5
+    LPR = 6
+    NEWS = 7
+    UUCP = 8
+    CRON = 9
+    AUTHPRIV = 10
+    FTP = 11
+    LOCAL0 = 16
+    LOCAL1 = 17
+    LOCAL2 = 18
+    LOCAL3 = 19
+    LOCAL4 = 20
+    LOCAL5 = 21
+    LOCAL6 = 22
+    LOCAL7 = 23
+
+
+_SEVERITIES = {
+    LogLevel.DEBUG: 7,
+    LogLevel.INFO: 6,
+    LogLevel.WARNING: 4,
+    LogLevel.ERROR: 3,
+    LogLevel.CRITICAL: 2,
+}
+
+
+def _header_field(value: str, max_length: int) -> str:
+    # header fields are 1 to max_length printable ASCII characters other than space, "-" when empty
+    field = "".join(char if "!" <= char <= "~" else "_" for char in value[:max_length])
+    return field or "-"
+
+
+class SyslogHandler(_NetworkHandler):
+    """Send records as RFC 5424 syslog messages.
+
+    Messages go over UDP to a `(host, port)` address, or over a Unix datagram socket to a path
+    like "/dev/log". The formatted record is the message, the logger name its MSGID. Each message
+    is a datagram of its own, cut off at `max_size` bytes. UDP delivery is not confirmed: only
+    messages the local network stack rejects (e.g. after an ICMP "port unreachable") are kept and
+    sent again.
+    """
+
+    def __init__(
+        self,
+        address: tuple[str, int] | str = ("localhost", 514),
+        level: FiltererLevel = FiltererLevel.NOTSET,
+        *,
+        facility: SyslogFacility = SyslogFacility.USER,
+        app_name: str | None = None,
+        hostname: str | None = None,
+        max_size: int = 8192,
+        max_buffer: int = 4 * 1024 * 1024,
+        batch_size: int = 64 * 1024,
+        flush_interval: float = 0.05,
+        backoff: float = 0.1,
+        max_backoff: float = 30.0,
+        timeout: float = 5.0,
+    ) -> None:
+        self.address = address
+        self.facility = SyslogFacility(facility)
+        self.app_name = _header_field(os.path.basename(sys.argv[0]) if app_name is None else app_name, 48)
+        self.hostname = _header_field(socket.gethostname() if hostname is None else hostname, 255)
+        self.max_size = max_size
+        super().__init__(
+            level,
+            max_buffer=max_buffer,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            backoff=backoff,
+            max_backoff=max_backoff,
+            timeout=timeout,
+        )
+
+    def _connect(self) -> socket.socket:
+        target: str | tuple[t.Any, ...]
+        if isinstance(self.address, str):
+            family, target = socket.AF_UNIX, self.address
+        else:
+            family, _, _, _, target = socket.getaddrinfo(*self.address, type=socket.SOCK_DGRAM)[0]
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        try:
+            sock.settimeout(self.timeout)
+            # connected, so that errors reported for earlier datagrams surface on the next send
+            sock.connect(target)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _frame(self, record: LogRecord) -> bytes:
+        text = self.formatter.format(record)
+        if logs._callsites is not None:
+            logs._callsites.formatted(record, len(text))
+        seconds, nanoseconds = divmod(record.created_ns, 1_000_000_000)
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        header = (
+            f"<{self.facility * 8 + _SEVERITIES[record.level]}>1 {timestamp}.{nanoseconds // 1000:06d}Z"
+            f" {self.hostname} {self.app_name} {record.process} {_header_field(record.name, 32)} - "
+        )
+        # a UTF-8 message starts with a byte order mark
+        return (header.encode("ascii") + b"\xef\xbb\xbf" + text.encode("utf-8"))[: self.max_size]
+
+    def _send(self, sock: socket.socket, frames: list[bytes]) -> int:
+        for sent, frame in enumerate(frames):
+            try:
+                sock.send(frame)
+            except OSError:
+                if not sent:
+                    raise
+                return sent
+        return len(frames)
@@ -0,0 +1,307 @@
+import bisect
+import itertools
+import threading
+import time
+import typing as t
+
+import logs
+from logs import Filterer, Handler, Logger, LogRecord, StreamHandler
+
+# histogram bucket upper bounds, in seconds, anything slower goes in an implicit +Inf bucket
+BUCKETS = (
+    1e-6,
+    2.5e-6,
+    5e-6,
+    1e-5,
+    2.5e-5,
+    5e-5,
+    1e-4,
+    2.5e-4,
+    5e-4,
+    1e-3,
+    2.5e-3,
+    5e-3,
+    1e-2,
+    2.5e-2,
+    5e-2,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+_BUCKETS_NS = [round(bound * 1e9) for bound in BUCKETS]
+
+
+class Histogram(t.NamedTuple):
+    # how many observations fell in each of BUCKETS and then +Inf (not cumulative)
+    counts: tuple[int, ...]
+    # in seconds
+    sum: float
+
+    @property
+    def total(self) -> int:
+        """The number of observations"""
+        return sum(self.counts)
+
+
+class Snapshot(t.NamedTuple):
+    # records logged, by (logger name, level)
+    emitted: dict[tuple[str, str], int]
+    # how many of them were dropped by a level or filter before reaching the end of the propagation chain
+    dropped: dict[tuple[str, str], int]
+    # records dropped by (logger or handler, filter), "level" means the logger's or handler's level
+    filter_drops: dict[tuple[str, str], int]
+    # by handler
+    format_seconds: dict[str, Histogram]
+    write_seconds: dict[str, Histogram]
+    lock_wait_seconds: dict[str, Histogram]
+
+
+class _Store:
+    """One thread's metrics, so that threads never contend on updating them"""
+
+    def __init__(self) -> None:
+        self.emitted: dict[tuple[str, str], int] = {}
+        self.dropped: dict[tuple[str, str], int] = {}
+        self.filter_drops: dict[tuple[str, str], int] = {}
+        # histograms are a count per bucket, followed by the sum in nanoseconds
+        self.format: dict[str, list[int]] = {}
+        self.write: dict[str, list[int]] = {}
+        self.lock_wait: dict[str, list[int]] = {}
+
+    def add(self, other: "_Store") -> None:
+        for totals, counts in (
+            (self.emitted, other.emitted),
+            (self.dropped, other.dropped),
+            (self.filter_drops, other.filter_drops),
+        ):
+            for key, count in counts.copy().items():
+                totals[key] = totals.get(key, 0) + count
+        for total_histograms, histograms in zip(
+            (self.format, self.write, self.lock_wait), (other.format, other.write, other.lock_wait)
+        ):
+            for label, buckets in histograms.copy().items():
+                summed = total_histograms.setdefault(label, [0] * len(buckets))
+                for idx, count in enumerate(list(buckets)):
+                    summed[idx] += count
+
+
+def _observe(histograms: dict[str, list[int]], label: str, elapsed_ns: int) -> None:
+    counts = histograms.get(label)
+    if counts is None:
+        counts = histograms[label] = [0] * (len(_BUCKETS_NS) + 2)
+    counts[bisect.bisect_left(_BUCKETS_NS, elapsed_ns)] += 1
+    counts[-1] += elapsed_ns
+
+
+def _filter_name(filter: t.Any) -> str:
+    return getattr(filter, "__qualname__", None) or type(filter).__qualname__
+
+
+_handler_ids = itertools.count(1)
+
+
+class _Collector:
+    """Dispatches records like Logger.log does, measuring as it goes"""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        # the store of every thread that logged, until it exits and its metrics are added to _finished
+        self._stores: list[tuple[threading.Thread, _Store]] = []
+        self._finished = _Store()
+        self._lock = threading.Lock()
+        logs._reinit_after_fork(self)
+
+    def _at_fork_reinit(self) -> None:
+        self._lock = threading.Lock()
+
+    def _store(self) -> _Store:
+        try:
+            return self._local.store  # type: ignore[no-any-return]
+        except AttributeError:
+            store = self._local.store = _Store()
+            with self._lock:
+                # a new thread, maybe in place of one that exited: keep the number of stores bounded
+                self._fold_finished()
+                self._stores.append((threading.current_thread(), store))
+            return store
+
+    def _fold_finished(self) -> None:
+        # called with the lock held
+        running = []
+        for thread, store in self._stores:
+            if thread.is_alive():
+                running.append((thread, store))
+            else:
+                self._finished.add(store)
+        self._stores = running
+
+    def _label(self, handler: Handler) -> str:
+        label: str | None = handler.__dict__.get("_metrics_label")
+        if label is None:
+            label = f"{type(handler).__name__}-{next(_handler_ids)}"
+            handler._metrics_label = label  # type: ignore[attr-defined]
+        return label
+
+    def log(self, logger: Logger, record: LogRecord) -> None:
+        store = self._store()
+        key = (logger.name, record.level._name_)
+        store.emitted[key] = store.emitted.get(key, 0) + 1
+        plan = logger._dispatch_plan
+        if plan is None:
+            plan = logger._get_dispatch_plan()
+        for current, level, filters, handlers in plan:
+            filtered = self._apply(store, current.name, record, level, filters)
+            if filtered is None:
+                store.dropped[key] = store.dropped.get(key, 0) + 1
+                if logs._callsites is not None:
+                    logs._callsites.drop(record)
+                return
+            record = filtered
+            for handler in handlers:
+                self._handle(store, handler, record)
+
+    def _drop(self, store: _Store, label: str, filter: str) -> None:
+        key = (label, filter)
+        store.filter_drops[key] = store.filter_drops.get(key, 0) + 1
+
+    def _filter(self, store: _Store, filterer: Filterer, label: str, record: LogRecord) -> LogRecord | None:
+        if type(filterer).filter is not Filterer.filter:
+            filtered = filterer.filter(record)
+            if filtered is None:
+                self._drop(store, label, _filter_name(type(filterer).filter))
+            return filtered
+        return self._apply(store, label, record, filterer.level.value, filterer.filters)
+
+    def _apply(
+        self, store: _Store, label: str, record: LogRecord, level: int, filters: t.Sequence[logs.Filter]
+    ) -> LogRecord | None:
+        if record.level.value < level:
+            self._drop(store, label, "level")
+            return None
+        for filter in filters:
+            filtered = filter(record)
+            if filtered is None:
+                self._drop(store, label, _filter_name(filter))
+                return None
+            record = filtered
+        return record
+
+    def _handle(self, store: _Store, handler: Handler, record: LogRecord) -> None:
+        label = self._label(handler)
+        if type(handler).handle is not StreamHandler.handle:
+            # formatting and writing are up to the handler, which may not do either right away
+            start = time.perf_counter_ns()
+            handler.handle(record)
+            _observe(store.write, label, time.perf_counter_ns() - start)
+            return
+        stream_handler = t.cast(StreamHandler, handler)
+        filtered = self._filter(store, stream_handler, label, record)
+        if filtered is None:
+            return
+        start = time.perf_counter_ns()
+        text = stream_handler.formatter.format(filtered) + "\n"
+        formatted = time.perf_counter_ns()
+        if logs._callsites is not None:
+            logs._callsites.formatted(filtered, len(text))
+        # write() takes the lock again, which costs next to nothing since it is reentrant
+        lock = stream_handler._stream_lock
+        lock.acquire()
+        acquired = time.perf_counter_ns()
+        try:
+            stream_handler.write(text)
+        finally:
+            lock.release()
+        written = time.perf_counter_ns()
+        _observe(store.format, label, formatted - start)
+        _observe(store.lock_wait, label, acquired - formatted)
+        _observe(store.write, label, written - acquired)
+
+    def snapshot(self) -> Snapshot:
+        total = _Store()
+        with self._lock:
+            self._fold_finished()
+            # _finished only changes while the lock is held, so add it up now
+            total.add(self._finished)
+            stores = [store for _, store in self._stores]
+        for store in stores:
+            # other threads keep updating their stores, add() only ever reads copies
+            total.add(store)
+        format_seconds, write_seconds, lock_wait_seconds = (
+            {label: Histogram(tuple(counts[:-1]), counts[-1] / 1e9) for label, counts in sorted(totals.items())}
+            for totals in (total.format, total.write, total.lock_wait)
+        )
+        return Snapshot(
+            total.emitted, total.dropped, total.filter_drops, format_seconds, write_seconds, lock_wait_seconds
+        )
+
+
+_collector = _Collector()
+
+
+def enable() -> None:
+    """Start collecting metrics, this makes every record that is logged somewhat slower"""
+    logs._metrics = _collector
+
+
+def disable() -> None:
+    """Stop collecting metrics, what was collected so far is kept"""
+    logs._metrics = None
+
+
+def is_enabled() -> bool:
+    return logs._metrics is not None
+
+
+def reset() -> None:
+    """Forget everything collected so far"""
+    global _collector
+    enabled = is_enabled()
+    _collector = _Collector()
+    if enabled:
+        enable()
+
+
+def snapshot() -> Snapshot:
+    return _collector.snapshot()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def to_prometheus(snap: Snapshot | None = None) -> str:
+    """Render a snapshot (by default a fresh one) in the Prometheus text exposition format"""
+    if snap is None:
+        snap = snapshot()
+    lines = []
+    counters = (
+        ("logs_records_total", "Records logged", snap.emitted, ("logger", "level")),
+        ("logs_records_dropped_total", "Records dropped by a level or filter", snap.dropped, ("logger", "level")),
+        ("logs_filter_drops_total", "Records dropped, by filter", snap.filter_drops, ("filterer", "filter")),
+    )
+    for name, description, values, label_names in counters:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} counter")
+        for key, value in sorted(values.items()):
+            lines.append(f"{name}{_labels(**dict(zip(label_names, key)))} {value}")
+    histograms = (
+        ("logs_handler_format_seconds", "Time spent formatting records", snap.format_seconds),
+        ("logs_handler_write_seconds", "Time spent writing (or otherwise handling) records", snap.write_seconds),
+        ("logs_handler_lock_wait_seconds", "Time spent waiting for a handler's stream lock", snap.lock_wait_seconds),
+    )
+    for name, description, by_handler in histograms:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} histogram")
+        for handler, histogram in by_handler.items():
+            cumulative = 0
+            for bound, count in zip((*map(repr, BUCKETS), "+Inf"), histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(handler=handler, le=bound)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(handler=handler)} {histogram.sum!r}")
+            lines.append(f"{name}_count{_labels(handler=handler)} {cumulative}")
+    return "\n".join(lines) + "\n"
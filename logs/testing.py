@@ -58,4 +58,4 @@ def capture_logs(
         yield recorder
     finally:
         logger.level = original_level
-        logger.handlers.pop()  # remove handler we just added
+        logger.remove_handler(handler)
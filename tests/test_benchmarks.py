@@ -0,0 +1,20 @@
+import io
+import json
+
+from benchmarks import runner
+
+
+def test_benchmarks_run():
+    out = io.StringIO()
+    results = runner.run(repeat=2, loops=1, out=out)
+    assert {result.name for result in results} == {case.name for case in runner.cases()}
+    assert len(out.getvalue().splitlines()) == len(results)
+
+
+def test_compare():
+    results = runner.run(["disabled/depth=1"], repeat=1, loops=1, out=io.StringIO())
+    baseline = json.loads(json.dumps(runner.to_json(results)))
+    baseline["benchmarks"]["disabled/depth=1"]["min"] = results[0].min / 2
+    out = io.StringIO()
+    assert runner.compare(results, baseline, threshold=0.1, out=out) == ["disabled/depth=1"]
+    assert "REGRESSION" in out.getvalue()
@@ -129,3 +129,48 @@ def test_exception_handling(logger: Logger):
         logger.info("TEST")
     assert logs.records[0].extra["key"] == "value"
     assert "key" not in logs.records[1].extra
+
+
+def test_bind_does_not_add_filters(logger: Logger):
+    with bind(logger, key="value"):
+        assert logger.filters == ()
+        assert get_logger("").filters == ()
+
+
+def test_bind_does_not_mutate_callers_extra(logger: Logger):
+    extra = {"explicit": 1}
+    with capture_logs() as logs:
+        with bind(logger, key="value"):
+            logger.info("TEST", extra=extra)
+    assert logs.records[0].extra == {"explicit": 1, "key": "value"}
+    assert extra == {"explicit": 1}
+
+
+def test_bind_applies_to_descendants_only_through_propagation(logger: Logger):
+    child = get_logger("test.child")
+    isolated = get_logger("test.isolated")
+    isolated.propagate = False
+    with capture_logs() as logs, capture_logs(isolated) as isolated_logs:
+        with bind(logger, key="value"):
+            child.info("TEST")
+            isolated.info("TEST")
+            get_logger("other").info("TEST")
+
+    assert logs.records[0].extra == {"key": "value"}
+    assert isolated_logs.records[0].extra == {}
+    assert logs.records[1].extra == {}
+
+
+def test_many_concurrent_binds(logger: Logger):
+    async def log(idx: int):
+        with bind(logger, idx=idx):
+            await asyncio.sleep(0)
+            logger.info("TEST")
+
+    async def run():
+        await asyncio.gather(*(log(idx) for idx in range(1000)))
+
+    with capture_logs() as logs:
+        asyncio.run(run())
+
+    assert sorted(record.extra["idx"] for record in logs.records) == list(range(1000))
@@ -0,0 +1,140 @@
+import threading
+from io import StringIO
+from typing import Iterator
+
+import pytest
+
+from logs import Logger, LogRecord, StreamHandler, callsites, metrics
+from logs.filters import SampleFilter
+from logs.levels import FiltererLevel, LogLevel
+
+
+@pytest.fixture(autouse=True)
+def track() -> Iterator[None]:
+    callsites.reset()
+    callsites.enable()
+    yield
+    callsites.disable()
+    callsites.reset()
+
+
+def make_logger() -> tuple[Logger, StringIO]:
+    logger = Logger("app")
+    stream = StringIO()
+    logger.add_handler(StreamHandler(stream=stream))
+    return logger, stream
+
+
+def test_ids_and_counts():
+    logger, stream = make_logger()
+    logger.add_filter(SampleFilter(2))
+    records = []
+    logger.add_filter(lambda record: records.append(record) or record)
+    for idx in range(4):
+        logger.info("hot {extra[idx]}", extra={"idx": idx})
+    logger.warning("cold")
+    other = Logger("other")
+    other.add_handler(StreamHandler(stream=StringIO()))
+    other.info("hot {extra[idx]}", extra={"idx": 0})
+
+    hot, cold = records[0].callsite, records[-1].callsite
+    assert hot != cold and {record.callsite for record in records[:-1]} == {hot}
+    assert callsites.lookup(hot) == ("app", "hot {extra[idx]}")
+    stats = {(stat.name, stat.template): stat for stat in callsites.stats()}
+    assert stats["app", "hot {extra[idx]}"] == (hot, "app", "hot {extra[idx]}", 4, 2, len("hot 0\nhot 2\n"), False)
+    assert (stats["app", "cold"].emitted, stats["app", "cold"].dropped) == (1, 0)
+    assert stats["other", "hot {extra[idx]}"].emitted == 1
+    assert [stat.template for stat in callsites.top(1)] == ["hot {extra[idx]}"]
+    assert [(stat.name, stat.formatted) for stat in callsites.top(by="formatted")] == [
+        ("app", 12),
+        ("other", 6),
+        ("app", 5),
+    ]
+    assert stream.getvalue() == "hot 0\nhot 2\ncold\n"
+
+
+def test_log_many_and_metrics():
+    logger, stream = make_logger()
+    logger.level = FiltererLevel.WARNING
+    batch = [LogRecord("many", "app", level, {}) for level in (LogLevel.INFO, LogLevel.ERROR)]
+    logger.log_many(batch)
+    metrics.enable()
+    try:
+        logger.log_many([record.copy() for record in batch])
+    finally:
+        metrics.disable()
+        metrics.reset()
+    (stat,) = callsites.stats()
+    assert (stat.emitted, stat.dropped, stat.formatted) == (4, 2, len("many\n") * 2)
+    assert stream.getvalue() == "many\nmany\n"
+
+
+def test_silence():
+    logger, stream = make_logger()
+    callsite = callsites.silence("app", "noisy")
+    logger.info("noisy")
+    logger.info("quiet")
+    callsites.disable()
+    logger.info("noisy")
+    callsites.enable()
+    callsites.unsilence("app", "noisy")
+    logger.info("noisy")
+    assert stream.getvalue() == "quiet\nnoisy\nnoisy\n"
+    stats = {stat.id: stat for stat in callsites.stats()}
+    assert (stats[callsite].emitted, stats[callsite].dropped, stats[callsite].silenced) == (2, 1, False)
+
+
+def test_untracked_call_sites():
+    callsites.reset()
+    callsites.enable(max_callsites=2)
+    logger, stream = make_logger()
+    for idx in range(5):
+        logger.info(f"formatted {idx}")
+    assert [stat.id for stat in callsites.stats()] == [callsites.UNTRACKED, 1, 2]
+    assert callsites.stats()[0].emitted == 3
+    with pytest.raises(ValueError):
+        callsites.silence("app", "another")
+    with pytest.raises(KeyError):
+        callsites.lookup(callsites.UNTRACKED)
+    callsites.enable(max_callsites=10_000)
+
+
+def test_threads_are_merged():
+    logger, _ = make_logger()
+
+    def run(idx: int) -> None:
+        for _ in range(100):
+            logger.info("shared")
+            logger.info(f"thread {idx}")
+
+    threads = [threading.Thread(target=run, args=(idx,)) for idx in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    top = callsites.top()
+    assert (top[0].template, top[0].emitted) == ("shared", 400)
+    assert sorted(stat.emitted for stat in top[1:]) == [100] * 4
+
+
+def test_exited_threads_are_folded():
+    logger, _ = make_logger()
+    for idx in range(50):
+        thread = threading.Thread(target=logger.info, args=(f"thread {idx % 5}",))
+        thread.start()
+        thread.join()
+    # only the counters of threads that are still running are kept apart
+    assert len(callsites._registry._counters) <= 2
+    assert sorted(stat.emitted for stat in callsites.stats()) == [10] * 5
+    logger.info("thread 0")
+    assert callsites.top(1)[0].emitted == 11
+
+
+def test_disabled():
+    callsites.disable()
+    logger, _ = make_logger()
+    records = []
+    logger.add_filter(lambda record: records.append(record) or record)
+    logger.info("info")
+    assert records[0].callsite == callsites.UNTRACKED
+    assert callsites.stats() == []
@@ -1,9 +1,18 @@
+import json
 import sys
+import threading
+import time
+import typing as t
+from pathlib import Path
 from tempfile import TemporaryFile
+from typing import Iterator
 
 import pytest
 
-from logs import StreamHandler, get_logger
+from logs import Handler, LogRecord, StreamHandler, config, get_logger
+from logs.formatters import CompiledFormatter
+from logs.handlers import RingBufferHandler
+from logs.levels import FiltererLevel
 from tests.utils import redirect_stream
 
 
@@ -22,3 +31,275 @@ def test_default_logging_config():
             handler.stream.flush()
         output.seek(0)
         assert output.read() == "test\n"
+
+
+class Collect(Handler):
+    """Keeps the messages it handles in SINKS[sink]"""
+
+    def __init__(self, sink: str, level: FiltererLevel = FiltererLevel.NOTSET) -> None:
+        super().__init__(level=level)
+        self.sink = SINKS.setdefault(sink, [])
+        self.closed = False
+
+    def handle(self, record: LogRecord) -> None:
+        filtered = self.filter(record)
+        if filtered is not None:
+            self.sink.append(self.formatter.format(filtered))
+
+    def close(self) -> None:
+        self.closed = True
+
+
+SINKS: dict[str, list[str]] = {}
+COLLECT = "tests.test_configuration.Collect"
+
+
+@pytest.fixture(autouse=True)
+def clear_sinks() -> Iterator[None]:
+    yield
+    SINKS.clear()
+
+
+def make_config(sink: str = "a", level: str = "INFO") -> dict[str, t.Any]:
+    return {
+        "formatters": {"short": {"fmt": "{level} {message}"}},
+        "filters": {"no_debug": {"class": "logs.filters.LevelFilter", "level": "info"}},
+        "handlers": {
+            "collect": {"class": COLLECT, "sink": sink, "formatter": "short"},
+            "errors": {
+                "class": "logs.handlers.RingBufferHandler",
+                "target": "cfg://handlers.collect",
+                "capacity": 10,
+                "filters": ["no_debug"],
+            },
+        },
+        "loggers": {
+            "": {"level": "WARNING", "handlers": []},
+            "app": {"level": level, "handlers": ["collect"], "propagate": False},
+            "app.db": {"level": "DEBUG", "handlers": ["errors"]},
+        },
+    }
+
+
+def test_configure():
+    config.configure(make_config())
+    app, db = get_logger("app"), get_logger("app.db")
+    assert get_logger("").level == FiltererLevel.WARNING
+    assert (app.level, app.propagate, db.level) == (FiltererLevel.INFO, False, FiltererLevel.DEBUG)
+    collect, errors = app.handlers[0], db.handlers[0]
+    assert isinstance(collect, Collect) and isinstance(errors, RingBufferHandler)
+    assert errors.target is collect
+    assert isinstance(collect.formatter, CompiledFormatter)
+
+    app.debug("hidden")
+    app.info("info")
+    db.debug("filtered by no_debug")
+    db.info("buffered")
+    db.error("failed")
+    # app.db propagates to app, so collect gets its records directly as well as from the ring buffer
+    assert SINKS["a"] == ["INFO info", "INFO buffered", "INFO buffered", "ERROR failed", "ERROR failed"]
+
+
+@pytest.mark.parametrize("suffix", ["toml", "json"])
+def test_files(tmp_path: Path, suffix: str):
+    path = tmp_path / f"logging.{suffix}"
+    if suffix == "toml":
+        path.write_text(
+            """
+            [handlers.out]
+            stream = "ext://sys.stdout"
+            level = "ERROR"
+
+            [loggers.app]
+            handlers = ["out"]
+            """
+        )
+    else:
+        path.write_text(
+            json.dumps({"handlers": {"out": {"level": "ERROR"}}, "loggers": {"app": {"handlers": ["out"]}}})
+        )
+    config.configure_from_file(path)
+    (handler,) = get_logger("app").handlers
+    assert isinstance(handler, StreamHandler)
+    assert handler.level == FiltererLevel.ERROR
+    assert handler.stream is (sys.stdout if suffix == "toml" else sys.stderr)
+
+
+def test_reconfigure_reuses_unchanged_objects():
+    config.configure(make_config(), close_delay=0)
+    collect = get_logger("app").handlers[0]
+    errors = get_logger("app.db").handlers[0]
+
+    config.configure(make_config(level="DEBUG"), close_delay=0)
+    assert get_logger("app").level == FiltererLevel.DEBUG
+    assert get_logger("app").handlers[0] is collect
+    assert get_logger("app.db").handlers[0] is errors
+
+    # the ring buffer refers to the collect handler, so both are replaced
+    config.configure(make_config(sink="b"), close_delay=0)
+    new_collect, new_errors = get_logger("app").handlers[0], get_logger("app.db").handlers[0]
+    assert new_collect is not collect and new_errors is not errors
+    assert new_errors.target is new_collect  # type: ignore[attr-defined]
+    for _ in range(100):
+        if collect.closed:  # type: ignore[attr-defined]
+            break
+        time.sleep(0.01)
+    assert collect.closed  # type: ignore[attr-defined]
+    assert not new_collect.closed  # type: ignore[attr-defined]
+
+
+def test_unconfigured_loggers_are_reset():
+    config.configure(make_config())
+    del_config = make_config()
+    del del_config["loggers"]["app.db"], del_config["loggers"][""]
+    config.configure(del_config)
+    db, root = get_logger("app.db"), get_logger("")
+    assert (db.level, db.handlers, db.propagate) == (FiltererLevel.NOTSET, (), True)
+    assert root.level == FiltererLevel.INFO
+    assert [type(handler) for handler in root.handlers] == [StreamHandler]
+
+
+@pytest.mark.parametrize(
+    "change, error",
+    [
+        (lambda c: c.update(handler={}), "Unknown configuration sections"),
+        (lambda c: c["loggers"]["app"].update(handlers=["missing"]), "Handler 'missing' is not configured"),
+        (lambda c: c["loggers"]["app"].update(level="LOUD"), "Unknown level 'LOUD'"),
+        (lambda c: c["loggers"]["app"].update(colour=True), "Unknown settings"),
+        (lambda c: c["handlers"]["collect"].update(colour=True), "Could not create handlers.collect"),
+        (lambda c: c["handlers"]["collect"].update(sink="cfg://handlers.errors"), "refers to itself"),
+        (lambda c: c["filters"]["no_debug"].update({"class": "logs.filters.Missing"}), "Cannot import"),
+    ],
+)
+def test_invalid_config_keeps_current_one(change: t.Callable[[dict[str, t.Any]], None], error: str):
+    config.configure(make_config())
+    handlers = get_logger("app").handlers
+    invalid = make_config(level="DEBUG")
+    change(invalid)
+    with pytest.raises(config.ConfigError, match=error):
+        config.configure(invalid)
+    assert get_logger("app").level == FiltererLevel.INFO
+    assert get_logger("app").handlers == handlers
+
+
+class Tracked(Collect):
+    created: list["Tracked"] = []
+
+    def __init__(self, sink: str) -> None:
+        super().__init__(sink)
+        self.created.append(self)
+
+
+@pytest.mark.parametrize(
+    "change, created",
+    [
+        # found before anything is built
+        (lambda c: c["loggers"]["app"].update(colour=True), 0),
+        (lambda c: c["loggers"]["app"].update(filters=["missing"]), 0),
+        # found while building the handlers, after the first one was created
+        (lambda c: c["handlers"]["errors"].update(colour=True), 1),
+    ],
+)
+def test_invalid_config_closes_what_it_created(change: t.Callable[[dict[str, t.Any]], None], created: int):
+    config.configure(make_config())
+    current = get_logger("app").handlers[0]
+    invalid = make_config(sink="b")
+    invalid["handlers"]["collect"]["class"] = "tests.test_configuration.Tracked"
+    change(invalid)
+    Tracked.created.clear()
+    with pytest.raises(config.ConfigError):
+        config.configure(invalid)
+    assert len(Tracked.created) == created
+    assert all(handler.closed for handler in Tracked.created)
+    assert not current.closed  # type: ignore[attr-defined]
+
+
+def test_reconfigure_while_logging():
+    config.configure(make_config("a"))
+    logger = get_logger("app")
+    stop = threading.Event()
+    logged = [0] * 4
+
+    def run(idx: int) -> None:
+        while not stop.is_set():
+            logger.info("info")
+            logged[idx] += 1
+
+    threads = [threading.Thread(target=run, args=(idx,)) for idx in range(len(logged))]
+    for thread in threads:
+        thread.start()
+    for idx in range(20):
+        config.configure(make_config("b" if idx % 2 == 0 else "a"), close_delay=0.1)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    # every record was handled exactly once, by whichever handler was configured at the time
+    assert len(SINKS["a"]) + len(SINKS["b"]) == sum(logged)
+
+
+class Stamp:
+    """Adds its tag to the record's `seen` list, yielding the GIL so that configure() can run in between"""
+
+    def __init__(self, tag: str) -> None:
+        self.tag = tag
+
+    def __call__(self, record: LogRecord) -> LogRecord:
+        stamped = record.copy()
+        stamped.extra["seen"] = [*record.extra.get("seen", []), self.tag]
+        time.sleep(0)
+        return stamped
+
+
+class CollectSeen(Collect):
+    def handle(self, record: LogRecord) -> None:
+        self.sink.append(",".join(record.extra["seen"]))
+
+
+def test_reconfigure_while_logging_uses_one_config_per_record():
+    def make_stamped_config(tag: str) -> dict[str, t.Any]:
+        return {
+            "filters": {"stamp": {"class": "tests.test_configuration.Stamp", "tag": tag}},
+            "handlers": {"collect": {"class": "tests.test_configuration.CollectSeen", "sink": tag}},
+            "loggers": {
+                "app": {"level": "INFO", "filters": ["stamp"], "handlers": ["collect"], "propagate": False},
+                "app.db": {"level": "DEBUG", "filters": ["stamp"]},
+            },
+        }
+
+    config.configure(make_stamped_config("a"))
+    logger = get_logger("app.db")
+    stop = threading.Event()
+
+    def run() -> None:
+        while not stop.is_set():
+            logger.info("info")
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for idx in range(50):
+        config.configure(make_stamped_config("b" if idx % 2 == 0 else "a"), close_delay=0.1)
+        time.sleep(0.001)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    # both loggers' filters and the handler a record reaches all come from the same configuration
+    assert SINKS["a"] and SINKS["b"]
+    assert set(SINKS["a"]) == {"a,a"}
+    assert set(SINKS["b"]) == {"b,b"}
+
+
+def test_watch(tmp_path: Path):
+    path = tmp_path / "logging.json"
+    path.write_text(json.dumps(make_config(level="INFO")))
+    watcher = config.watch(path, interval=0.01)
+    try:
+        assert get_logger("app").level == FiltererLevel.INFO
+        path.write_text(json.dumps(make_config(level="ERROR")))
+        for _ in range(200):
+            if get_logger("app").level == FiltererLevel.ERROR:
+                break
+            time.sleep(0.01)
+        assert get_logger("app").level == FiltererLevel.ERROR
+    finally:
+        watcher.stop()
@@ -0,0 +1,137 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from logs import Lazy, Logger, LogRecord
+from logs.decode import DecodeError, main, read, render
+from logs.formatters import CompiledFormatter
+from logs.handlers import BinaryHandler
+from logs.levels import LogLevel
+
+
+def make_record(template: str = "test", **extra) -> LogRecord:
+    return LogRecord(template=template, name="app.db", level=LogLevel.WARNING, extra=extra)
+
+
+def test_round_trip(tmp_path: Path):
+    path = tmp_path / "app.bin"
+    extra = {
+        "none": None,
+        "flags": [True, False],
+        "int": -(2**70),
+        "float": 1.5,
+        "str": "ünïcode",
+        "bytes": b"\x00\xff",
+        "nested": {"a": (1, 2), 3: {"b": None}},
+        "lazy": Lazy(lambda: "evaluated"),
+        "other": Path("/tmp"),
+    }
+    first = make_record("first {extra[int]}", **extra)
+    # records are not always written in the order they were created in
+    second = LogRecord("second", "app", LogLevel.ERROR, {}, created_ns=first.created_ns - 1000)
+    records = [first, second]
+    handler = BinaryHandler(path)
+    handler.handle_batch(records)
+    handler.close()
+
+    decoded = list(read(path))
+    assert [record.template for record in decoded] == ["first {extra[int]}", "second"]
+    for original, record in zip(records, decoded):
+        assert (record.name, record.level, record.created_ns, record.process, record.thread) == (
+            original.name,
+            original.level,
+            original.created_ns,
+            original.process,
+            original.thread,
+        )
+    assert decoded[0].extra == {
+        **extra,
+        "nested": {"a": [1, 2], 3: {"b": None}},
+        "lazy": "evaluated",
+        "other": "/tmp",
+    }
+    assert decoded[0].message == f"first {-(2**70)}"
+
+
+def test_strings_are_written_once(tmp_path: Path):
+    path = tmp_path / "app.bin"
+    logger = Logger("app.db")
+    handler = BinaryHandler(path)
+    logger.add_handler(handler)
+    for idx in range(100):
+        logger.info("query took {extra[ms]}ms", extra={"ms": idx})
+    handler.close()
+    data = path.read_bytes()
+    assert data.count(b"query took") == 1
+    assert data.count(b"app.db") == 1
+    assert [record.message for record in read(path)] == [f"query took {idx}ms" for idx in range(100)]
+
+
+def test_string_table_is_bounded(tmp_path: Path):
+    path = tmp_path / "app.bin"
+    logger = Logger("app.db")
+    handler = BinaryHandler(path, max_strings=50)
+    logger.add_handler(handler)
+    for idx in range(1000):
+        logger.info(f"request {idx} done", extra={"ms": idx})
+    assert len(handler._encoder._ids) <= 50 + 3
+    handler.close()
+    assert [(record.message, record.extra) for record in read(path)] == [
+        (f"request {idx} done", {"ms": idx}) for idx in range(1000)
+    ]
+
+
+def test_appending_and_truncated_files(tmp_path: Path):
+    path = tmp_path / "app.bin"
+    for template in ("a", "b"):
+        handler = BinaryHandler(path)
+        handler.handle(make_record(template, key=template))
+        handler.close()
+    records = list(read(path))
+    assert [(record.template, record.extra) for record in records] == [("a", {"key": "a"}), ("b", {"key": "b"})]
+
+    path.write_bytes(path.read_bytes()[:-3])
+    assert [record.template for record in read(path)] == ["a"]
+
+
+def test_not_a_binary_log(tmp_path: Path):
+    path = tmp_path / "app.log"
+    path.write_text("hello\n")
+    with pytest.raises(DecodeError):
+        list(read(path))
+    (tmp_path / "empty.bin").touch()
+    assert list(read(tmp_path / "empty.bin")) == []
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_children_write_their_own_file(tmp_path: Path):
+    path = tmp_path / "app.bin"
+    handler = BinaryHandler(path)
+    handler.handle(make_record("parent"))
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        handler.handle(make_record("child"))
+        handler.close()
+        os._exit(0)
+    os.waitpid(pid, 0)
+    handler.handle(make_record("parent again"))
+    handler.close()
+    assert [record.template for record in read(path)] == ["parent", "parent again"]
+    assert [record.template for record in read(f"{path}.{pid}")] == ["child"]
+
+
+def test_render_and_cli(tmp_path: Path, capsys: pytest.CaptureFixture[str]):
+    path = tmp_path / "app.bin"
+    handler = BinaryHandler(path)
+    handler.handle(make_record("hello {extra[user]}", user="bob"))
+    handler.close()
+
+    assert list(render(read(path), CompiledFormatter("{level} {name}: {message}"))) == ["WARNING app.db: hello bob"]
+    assert main([str(path), "--format", "{message}"]) == 0
+    assert capsys.readouterr().out == "hello bob\n"
+    assert main(["--json", str(path)]) == 0
+    output = json.loads(capsys.readouterr().out)
+    assert output["message"] == "hello bob"
+    assert output["user"] == "bob"
@@ -0,0 +1,190 @@
+import threading
+
+import pytest
+
+from logs import Filterer, Lazy, LogRecord
+from logs.filters import (
+    DedupFilter,
+    ExtraFilter,
+    LevelFilter,
+    NameFilter,
+    RandomSampleFilter,
+    RateLimitFilter,
+    SampleFilter,
+    by_extra,
+)
+from logs.levels import FiltererLevel, LogLevel
+
+
+def make_record(template: str = "test", **extra) -> LogRecord:
+    return LogRecord(template=template, name="test", level=LogLevel.INFO, extra=extra)
+
+
+def test_sample_filter():
+    sample = SampleFilter(3)
+    kept = [idx for idx in range(10) if sample(make_record()) is not None]
+    assert kept == [0, 3, 6, 9]
+
+
+def test_sample_filter_is_thread_safe():
+    sample = SampleFilter(10)
+    kept = []
+
+    def run() -> None:
+        for _ in range(1000):
+            if sample(make_record()) is not None:
+                kept.append(1)
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(kept) == 800
+
+
+def test_random_sample_filter():
+    assert all(RandomSampleFilter(1)(make_record()) for _ in range(100))
+    assert not any(RandomSampleFilter(0)(make_record()) for _ in range(100))
+    sample = RandomSampleFilter(0.5, seed=0)
+    kept = sum(sample(make_record()) is not None for _ in range(1000))
+    assert 400 < kept < 600
+
+
+def test_rate_limit_filter():
+    now = 0.0
+    limit = RateLimitFilter(rate=1, burst=2, clock=lambda: now)
+    assert [limit(make_record()) is not None for _ in range(3)] == [True, True, False]
+    # other templates have their own bucket
+    assert limit(make_record("other")) is not None
+    now += 1
+    assert [limit(make_record()) is not None for _ in range(2)] == [True, False]
+
+
+def test_rate_limit_filter_by_extra_key():
+    limit = RateLimitFilter(rate=1, key=by_extra("user"), clock=lambda: 0.0)
+    assert limit(make_record(user="a")) is not None
+    assert limit(make_record(user="a")) is None
+    assert limit(make_record(user="b")) is not None
+
+
+def test_rate_limit_filter_memory_is_bounded():
+    limit = RateLimitFilter(rate=1, max_keys=32, clock=lambda: 0.0)
+    for idx in range(1000):
+        limit(make_record(str(idx)))
+    assert len(limit._buckets) <= 32
+
+
+@pytest.mark.parametrize(
+    "first, every, expected",
+    (
+        (1, 3, [0, 3, 6, 9]),
+        (2, 4, [0, 1, 5, 9]),
+        (1, 1, list(range(10))),
+    ),
+)
+def test_dedup_filter(first: int, every: int, expected: list[int]):
+    dedup = DedupFilter(first=first, every=every)
+    emitted = {idx: dedup(make_record()) for idx in range(10)}
+    assert [idx for idx, record in emitted.items() if record is not None] == expected
+
+
+def test_dedup_filter_summarizes_suppressed_records():
+    dedup = DedupFilter(first=1, every=3)
+    original = make_record(key="value")
+    records = [dedup(original) for _ in range(4)]
+    assert records[0] is original
+    assert records[3] is not None
+    assert records[3].extra == {"key": "value", "suppressed": 2}
+    assert original.extra == {"key": "value"}
+
+
+def test_dedup_filter_flush_reports_a_storm_that_ended_mid_window():
+    dedup = DedupFilter(first=1, every=100)
+    emitted = [record for record in (dedup(make_record(idx=idx)) for idx in range(150)) if record is not None]
+    assert [record.extra.get("suppressed") for record in emitted] == [None, 99]
+    (summary,) = dedup.flush()
+    assert summary.extra == {"idx": 149, "suppressed": 49}
+    assert dedup.flush() == []
+
+
+def test_dedup_filter_starts_over_after_a_quiet_period():
+    now = [0.0]
+    dedup = DedupFilter(first=1, every=100, quiet=10, clock=lambda: now[0])
+    records = [dedup(make_record()) for _ in range(5)]
+    assert [record is not None for record in records] == [True, False, False, False, False]
+    now[0] = 10.0
+    record = dedup(make_record())
+    assert record is not None and record.extra == {"suppressed": 4}
+    assert dedup(make_record()) is None
+    assert dedup.flush()[0].extra == {"suppressed": 1}
+
+
+def _lazy_user(idx: int) -> Lazy:
+    return Lazy(lambda: idx % 3)
+
+
+def make_records() -> list[LogRecord]:
+    records = []
+    for idx in range(200):
+        name = ("app", "app.db", "apple", "other.app")[idx % 4]
+        level = list(LogLevel)[idx % 5]
+        extra = {"user": idx % 3} if idx % 2 else {"user": _lazy_user(idx), "request": idx}
+        records.append(LogRecord(template="test", name=name, level=level, extra=extra))
+    return records
+
+
+def _filterer(*filters, level: FiltererLevel = FiltererLevel.NOTSET) -> Filterer:
+    filterer = Filterer(level)
+    for filter in filters:
+        filterer.add_filter(filter)
+    return filterer
+
+
+@pytest.mark.parametrize(
+    "predicate",
+    [
+        LevelFilter(FiltererLevel.WARNING),
+        NameFilter("app"),
+        NameFilter("apple", "other"),
+        NameFilter(""),
+        ExtraFilter("request"),
+        ExtraFilter("user", 2),
+        ExtraFilter("request", 8),
+    ],
+)
+def test_predicates_match_the_same_records_in_batches(predicate):
+    records = make_records()
+    filterer = _filterer(predicate)
+    expected = [record for record in records if predicate(record) is not None]
+    assert expected
+    assert filterer.filter_batch(records) == expected
+
+
+def test_name_filter_stops_at_name_boundaries():
+    names = [record.name for record in _filterer(NameFilter("app")).filter_batch(make_records())]
+    assert set(names) == {"app", "app.db"}
+
+
+def test_filter_batch_mixes_predicates_and_callables_in_order():
+    seen = []
+
+    def tag(record: LogRecord) -> LogRecord | None:
+        seen.append(record)
+        if record.extra["user"] == 0:
+            return None
+        record = record.copy()
+        record.extra = {**record.extra, "tagged": True}
+        return record
+
+    records = make_records()
+    filterer = _filterer(
+        NameFilter("app"), tag, ExtraFilter("tagged", True), ExtraFilter("request"), level=FiltererLevel.INFO
+    )
+    expected = [filtered for filtered in map(filterer.filter, records) if filtered is not None]
+    per_record = list(seen)
+    seen.clear()
+    assert filterer.filter_batch(records) == expected
+    # callables only see records that got past everything before them, in the same order
+    assert seen == per_record
+    assert all(record.name.startswith("app") and record.level.value >= 20 for record in seen)
@@ -0,0 +1,150 @@
+import os
+import signal
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
+import logs.metrics
+from logs import Handler, Logger, StreamHandler
+from logs.filters import RateLimitFilter
+from logs.handlers import AsyncHandler, FileHandler, QueueHandler
+from logs.levels import FiltererLevel
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+class _SlowStream(StringIO):
+    def write(self, text: str) -> int:
+        # give up the GIL while the handler's lock is held
+        time.sleep(0)
+        return super().write(text)
+
+
+def _wait(pid: int, timeout: float = 10) -> int:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            return os.waitstatus_to_exitcode(status)
+        time.sleep(0.005)
+    os.kill(pid, signal.SIGKILL)
+    os.waitpid(pid, 0)
+    pytest.fail("forked child deadlocked")
+
+
+def _in_child(func) -> int:  # type: ignore[no-untyped-def]
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        try:
+            func()
+        except BaseException:
+            os._exit(1)
+        os._exit(0)
+    return _wait(pid)
+
+
+def test_fork_while_other_threads_log():
+    handler = StreamHandler(stream=_SlowStream())
+    handler.add_filter(RateLimitFilter(rate=1e9, burst=1_000_000))
+    logger = logs.get_logger("app")
+    logger.add_handler(handler)
+    stop = threading.Event()
+
+    errors: list[BaseException] = []
+
+    def work(n: int) -> None:
+        try:
+            log(n)
+        except BaseException as exc:
+            errors.append(exc)
+
+    def log(n: int) -> None:
+        i = 0
+        while not stop.is_set():
+            # new loggers take the manager's lock and _config_lock, emitting takes the handler's locks
+            logs.get_logger(f"app.worker{n}.{i % 50}").info("working {extra[i]}", extra={"i": i})
+            logger.level = FiltererLevel.DEBUG if i % 2 else FiltererLevel.NOTSET
+            i += 1
+
+    def child() -> None:
+        stream = StringIO()
+        handler.stream = stream
+        logs.get_logger("app.child").info("hello from the child")
+        assert stream.getvalue() == "hello from the child\n"
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for _ in range(30):
+            assert _in_child(child) == 0
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    assert errors == []
+
+
+def test_buffered_output_is_not_written_twice(tmp_path: Path):
+    path = tmp_path / "app.log"
+    handler = FileHandler(path)
+    logger = Logger("app")
+    logger.add_handler(handler)
+    logger.info("before fork")
+
+    def child() -> None:
+        logger.info("in child")
+        handler.close()
+
+    assert _in_child(child) == 0
+    handler.close()
+    assert path.read_text().splitlines() == ["before fork", "in child"]
+
+
+def test_queue_handler_works_in_child():
+    stream = StringIO()
+    handler = QueueHandler(StreamHandler(stream=stream))
+    logger = Logger("app")
+    logger.add_handler(handler)
+    logger.info("parent")
+
+    def child() -> None:
+        logger.info("child")
+        handler.flush(timeout=5)
+        assert stream.getvalue().splitlines()[-1] == "child"
+
+    assert _in_child(child) == 0
+    handler.close()
+    assert "child" not in stream.getvalue().splitlines()
+
+
+def test_async_handler_writes_in_child_forked_during_a_write():
+    stream = StringIO()
+    handler = AsyncHandler(stream)
+    logger = Logger("app")
+    logger.add_handler(handler)
+    # as if a worker thread was writing a batch when the process forked
+    with handler._write_lock:
+
+        def child() -> None:
+            logger.info("child")
+            assert stream.getvalue().splitlines()[-1] == "child"
+
+        assert _in_child(child) == 0
+
+
+def test_metrics_work_in_child_forked_while_collecting():
+    collector = logs.metrics._collector
+    with collector._lock:
+
+        def child() -> None:
+            logger = Logger("app")
+            logger.add_handler(Handler())
+            logs.metrics.enable()
+            logger.info("child")
+            assert logs.metrics.snapshot().emitted == {("app", "INFO"): 1}
+
+        assert _in_child(child) == 0
@@ -1,6 +1,13 @@
+import json
+import typing as t
+from collections import ChainMap, UserDict
 from datetime import datetime
 
+import pytest
+
 from logs import Formatter, LogRecord
+from logs._templates import compile_template
+from logs.formatters import CompiledFormatter, JSONFormatter
 from logs.levels import LogLevel
 from logs.testing import CapturedRecord, CapturingHandler
 
@@ -22,3 +29,130 @@ def test_formatter():
     handler.formatter = formatter
     handler.handle(record)
     assert recorder.output == ["2021-09-01T00:00:00 - val1: val2"]
+
+
+def make_record(template: str = "{extra[test2]}") -> LogRecord:
+    return LogRecord(
+        template=template,
+        name="test",
+        level=LogLevel.INFO,
+        extra={"test1": "val1", "test2": "val2", "num": 3.14159},
+        created_at=datetime(year=2021, month=9, day=1, hour=0, minute=0, second=0),
+        process=0,
+        thread=0,
+    )
+
+
+@pytest.mark.parametrize(
+    "fmt",
+    (
+        "{message}",
+        "static",
+        "{{escaped}} {message}",
+        "{created_at} - {extra[test1]}: {message}",
+        "{level} {level!r} {name:>8} {extra[num]:.2f}",
+        "{extra[num]:{extra[test1]!s:.0}>10}",
+        "{extra}",
+        "{process}{thread}{message}{process}",
+    ),
+)
+def test_compiled_formatter_matches_formatter(fmt: str):
+    record = make_record()
+    assert CompiledFormatter(fmt).format(record) == Formatter(fmt).format(record)
+
+
+def test_compiled_formatter_uses_overrides():
+    class CustomFormatter(CompiledFormatter):
+        def format_time(self, record: LogRecord) -> str:
+            return "2021"
+
+    formatter = CustomFormatter(fmt="{message} - {created_at}")
+    assert formatter.format(make_record()) == "val2 - 2021"
+    formatter.fmt = "{created_at}"
+    assert formatter.format(make_record()) == "2021"
+
+
+def test_compiled_formatter_unknown_field():
+    with pytest.raises(KeyError):
+        CompiledFormatter("{nope}").format(make_record())
+
+
+@pytest.mark.parametrize(
+    "template, expected",
+    (
+        ("static", "static"),
+        ("{{static}}", "{static}"),
+        ("{name} {extra[test1]!r}", "test 'val1'"),
+        ("{level:>6}", "  INFO"),
+    ),
+)
+def test_message_uses_compiled_template(template: str, expected: str):
+    assert make_record(template).message == expected
+    assert compile_template(template) is compile_template(template)
+
+
+def test_json_formatter():
+    record = make_record("{extra[str]!r} done")
+    record.extra = {"str": "a\nb", "int": 1, "float": 1.5, "bool": True, "none": None, "list": [1, "2"], "name": "x"}
+    output = JSONFormatter().format(record)
+    assert "\n" not in output
+    assert json.loads(output) == {
+        "name": "test",
+        "level": "INFO",
+        "created_at": "2021-09-01T00:00:00",
+        "process": 0,
+        "thread": 0,
+        "message": "'a\\nb' done",
+        "str": "a\nb",
+        "int": 1,
+        "float": 1.5,
+        "bool": True,
+        "none": None,
+        "list": [1, "2"],
+        "extra.name": "x",
+    }
+
+
+def test_json_formatter_default_encoder():
+    class Point:
+        def __init__(self, x: int, y: int) -> None:
+            self.x = x
+            self.y = y
+
+    record = make_record("static")
+    record.extra = {"point": Point(1, 2), "nested": {"point": Point(3, 4)}}
+    assert json.loads(JSONFormatter().format(record))["point"].startswith("<")
+    output = JSONFormatter(default=vars).format(record)
+    assert json.loads(output)["point"] == {"x": 1, "y": 2}
+    assert json.loads(output)["nested"] == {"point": {"x": 3, "y": 4}}
+
+
+def test_json_formatter_many_extra_keys():
+    record = make_record("static")
+    record.extra = {f"key{idx}": idx for idx in range(50)}
+    assert json.loads(JSONFormatter().format(record)) == {
+        "name": "test",
+        "level": "INFO",
+        "created_at": "2021-09-01T00:00:00",
+        "process": 0,
+        "thread": 0,
+        "message": "static",
+        **record.extra,
+    }
+
+
+@pytest.mark.parametrize(
+    "extra",
+    [
+        ChainMap({f"key{idx}": idx for idx in range(50)}),
+        UserDict({f"key{idx}": idx for idx in range(50)}),
+        # keys the C encoder cannot encode
+        {(f"key{idx}",): idx for idx in range(50)},
+    ],
+)
+def test_json_formatter_many_extra_keys_of_other_types(extra: t.Any):
+    record = make_record("static")
+    record.extra = extra
+    decoded = json.loads(JSONFormatter().format(record))
+    assert decoded["message"] == "static"
+    assert {key: decoded[str(key)] for key in extra} == dict(extra)
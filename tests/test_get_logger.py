@@ -1,6 +1,21 @@
+import gc
+import threading
+import weakref
+from typing import Callable, Iterator
+
 import pytest
 
-from logs import get_logger
+from logs import (
+    Handler,
+    Logger,
+    _log_manager,
+    get_logger,
+    register_logger,
+    register_loggers,
+    remove_logger,
+    set_max_loggers,
+)
+from logs.levels import FiltererLevel
 
 
 def test_get_root_logger():
@@ -26,3 +41,112 @@ def test_get_logger_children():
     child_one = get_logger("parent.child_one")
     child_two = get_logger("parent.child_two")
     assert child_one.parent == child_two.parent
+
+
+def test_remove_logger_removes_descendants():
+    parent = get_logger("parent")
+    child = get_logger("parent.child")
+    remove_logger("parent")
+    assert get_logger("parent") is not parent
+    assert get_logger("parent.child") is not child
+    remove_logger("parent")
+    assert get_logger("parent.child").parent is get_logger("parent")
+
+
+def test_remove_logger_updates_parent_children():
+    parent = get_logger("parent")
+    child = get_logger("parent.child")
+    remove_logger("parent.child")
+    assert child not in _log_manager._children[parent]
+    remove_logger("parent")
+    with pytest.raises(KeyError):
+        remove_logger("parent")
+
+
+def test_register_loggers():
+    loggers = [Logger("one.two.three"), Logger("one"), Logger("one.two")]
+    register_loggers(loggers)
+    three, one, two = loggers
+    assert get_logger("one") is one
+    assert get_logger("one.two") is two
+    assert get_logger("one.two.three") is three
+    assert three.parent is two
+    assert two.parent is one
+
+
+def test_concurrent_get_logger_returns_one_logger():
+    barrier = threading.Barrier(8)
+    results: list[Logger] = []
+
+    def get() -> None:
+        barrier.wait()
+        results.append(get_logger("contended.name"))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(logger is results[0] for logger in results)
+
+
+@pytest.fixture
+def max_loggers() -> Iterator[int]:
+    set_max_loggers(10)
+    try:
+        yield 10
+    finally:
+        set_max_loggers(None)
+
+
+def test_bounded_loggers_are_collected(max_loggers: int):
+    refs = [weakref.ref(get_logger(f"svc.tenant.{idx}")) for idx in range(100)]
+    gc.collect()
+    alive = [ref for ref in refs if ref() is not None]
+    assert len(alive) == max_loggers
+    # the most recently used ones are kept
+    assert alive == refs[-max_loggers:]
+    # anything still around is still found
+    assert get_logger("svc.tenant.99") is refs[-1]()
+
+
+def test_bounded_loggers_keep_configuration(max_loggers: int):
+    configured = get_logger("svc.configured")
+    configured.level = FiltererLevel.ERROR
+    configured_ref = weakref.ref(configured)
+    del configured
+    for idx in range(100):
+        get_logger(f"svc.tenant.{idx}")
+    gc.collect()
+    assert get_logger("svc.configured") is configured_ref()
+    assert get_logger("svc.configured").level == FiltererLevel.ERROR
+
+
+@pytest.mark.parametrize(
+    "configure",
+    [
+        lambda logger: setattr(logger, "level", FiltererLevel.ERROR),
+        lambda logger: setattr(logger, "propagate", False),
+        lambda logger: logger.add_handler(Handler()),
+        lambda logger: logger.add_filter(lambda record: record),
+    ],
+)
+def test_bounded_loggers_configured_after_eviction(max_loggers: int, configure: Callable[[Logger], None]):
+    held = get_logger("svc.held")
+    for idx in range(100):
+        get_logger(f"svc.tenant.{idx}")
+    # out of the recently used ones, but still referenced
+    configure(held)
+    held_ref = weakref.ref(held)
+    del held
+    gc.collect()
+    assert get_logger("svc.held") is held_ref()
+
+
+def test_registered_loggers_are_never_collected(max_loggers: int):
+    register_logger(Logger("svc.registered"))
+    registered_ref = weakref.ref(get_logger("svc.registered"))
+    for idx in range(100):
+        get_logger(f"svc.tenant.{idx}")
+    gc.collect()
+    assert registered_ref() is not None
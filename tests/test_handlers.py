@@ -1,8 +1,46 @@
+import asyncio
+import gzip
+import multiprocessing
+import os
+import pickle
+import re
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+import typing as t
 from datetime import datetime
 from io import StringIO
+from pathlib import Path
+from threading import Event, Thread
 
-from logs import LogRecord, StreamHandler
-from logs.levels import LogLevel
+import pytest
+
+import logs.handlers
+from logs import Formatter, Handler, Lazy, Logger, LogRecord, StreamHandler
+from logs.bind import bind
+from logs.filters import by_extra
+from logs.handlers import (
+    AsyncHandler,
+    FanoutHandler,
+    FileHandler,
+    FsyncPolicy,
+    OverflowPolicy,
+    ProcessQueueListener,
+    QueueHandler,
+    QueueListener,
+    RecordQueue,
+    RingBufferHandler,
+    RotatingFileHandler,
+    SocketHandler,
+    SyslogFacility,
+    SyslogHandler,
+    _decode_record,
+    _encode_record,
+)
+from logs.levels import FiltererLevel, LogLevel
 
 
 def test_stream_handler():
@@ -20,3 +58,726 @@ def test_stream_handler():
     handler = StreamHandler(stream=stream)
     handler.handle(record)
     assert stream.getvalue() == "test\n"
+
+
+def make_record(template: str = "test") -> LogRecord:
+    return LogRecord(
+        template=template,
+        name="test",
+        level=LogLevel.INFO,
+        extra={},
+        created_at=datetime(year=2021, month=9, day=1),
+        process=0,
+        thread=0,
+    )
+
+
+def test_queue_handler():
+    stream = StringIO()
+    handler = QueueHandler(StreamHandler(stream=stream))
+    for template in ("a", "b", "c"):
+        handler.handle(make_record(template))
+    handler.flush(timeout=5)
+    assert stream.getvalue() == "a\nb\nc\n"
+    handler.close()
+    # once closed records are written synchronously
+    handler.handle(make_record("d"))
+    assert stream.getvalue() == "a\nb\nc\nd\n"
+
+
+def test_queue_handler_close_drains_queue():
+    stream = StringIO()
+    handler = QueueHandler(StreamHandler(stream=stream))
+    for idx in range(100):
+        handler.handle(make_record(str(idx)))
+    handler.close()
+    assert stream.getvalue() == "".join(f"{idx}\n" for idx in range(100))
+
+
+_EXIT_SCRIPT = """
+import sys, time
+from logs import Logger
+from logs.handlers import FileHandler, QueueHandler
+
+class SlowFileHandler(FileHandler):
+    def write(self, text):
+        time.sleep(0.001)
+        super().write(text)
+
+logger = Logger("app")
+logger.add_handler(QueueHandler(SlowFileHandler(sys.argv[1]), batch_size=1))
+for idx in range(50):
+    logger.info("{extra[idx]}", extra={"idx": idx})
+"""
+
+
+def test_queued_records_are_written_at_exit(tmp_path: Path):
+    path = tmp_path / "app.log"
+    # the interpreter exits with most records still queued: they go to the file before it is closed
+    result = subprocess.run(
+        [sys.executable, "-c", _EXIT_SCRIPT, str(path)],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0
+    assert result.stderr == ""
+    assert path.read_text().splitlines() == [str(idx) for idx in range(50)]
+
+
+@pytest.mark.parametrize(
+    "overflow, expected, dropped",
+    (
+        (OverflowPolicy.DROP_NEWEST, ["0", "1", "2"], 7),
+        (OverflowPolicy.DROP_OLDEST, ["7", "8", "9"], 7),
+        (OverflowPolicy.SAMPLE, ["2", "5", "8"], 7),
+    ),
+)
+def test_record_queue_overflow(overflow: OverflowPolicy, expected: list[str], dropped: int):
+    queue = RecordQueue(max_size=3, overflow=overflow, sample_rate=3)
+    for idx in range(10):
+        queue.put(make_record(str(idx)))
+    assert [record.template for record in queue.get_batch(10)] == expected
+    assert queue.dropped == dropped
+
+
+def test_record_queue_blocks_when_full():
+    queue = RecordQueue(max_size=1, overflow=OverflowPolicy.BLOCK)
+    queue.put(make_record("a"))
+    unblocked = Event()
+
+    def put() -> None:
+        queue.put(make_record("b"))
+        unblocked.set()
+
+    thread = Thread(target=put)
+    thread.start()
+    assert not unblocked.wait(0.05)
+    assert [record.template for record in queue.get_batch(1)] == ["a"]
+    assert unblocked.wait(5)
+    thread.join()
+    assert [record.template for record in queue.get_batch(1)] == ["b"]
+    assert queue.dropped == 0
+
+
+def test_queue_listener_batches():
+    batches: list[list[str]] = []
+    queue = RecordQueue()
+    for idx in range(5):
+        queue.put(make_record(str(idx)))
+
+    class BatchRecorder(QueueListener):
+        def handle_batch(self, records: list[LogRecord]) -> None:
+            batches.append([record.template for record in records])
+
+    listener = BatchRecorder(queue, batch_size=2)
+    listener.start()
+    listener.stop(timeout=5)
+    assert batches == [["0", "1"], ["2", "3"], ["4"]]
+
+
+def test_stream_handler_batch_is_a_single_write():
+    class CountingStream(StringIO):
+        writes = 0
+
+        def write(self, s: str) -> int:
+            self.writes += 1
+            return super().write(s)
+
+    stream = CountingStream()
+    handler = StreamHandler(stream=stream)
+    handler.add_filter(lambda record: None if record.template == "b" else record)
+    handler.handle_batch([make_record("a"), make_record("b"), make_record("c")])
+    assert stream.getvalue() == "a\nc\n"
+    assert stream.writes == 1
+    handler.handle_batch([make_record("b")])
+    assert stream.writes == 1
+
+
+def test_file_handler(tmp_path: Path):
+    path = tmp_path / "test.log"
+    handler = FileHandler(path, fsync=FsyncPolicy.ON_FLUSH)
+    handler.handle(make_record("a"))
+    handler.handle_batch([make_record("b"), make_record("c")])
+    handler.flush()
+    assert path.read_text() == "a\nb\nc\n"
+    handler.close()
+    handler = FileHandler(path)
+    handler.handle(make_record("d"))
+    handler.close()
+    assert path.read_text() == "a\nb\nc\nd\n"
+
+
+def read_backups(path: Path) -> list[str]:
+    contents = []
+    for backup in sorted(path.parent.glob(f"{path.name}.*")):
+        if backup.suffix == ".gz":
+            contents.append(gzip.decompress(backup.read_bytes()).decode())
+        else:
+            contents.append(backup.read_text())
+    return contents
+
+
+def test_rotating_file_handler_by_size(tmp_path: Path):
+    path = tmp_path / "test.log"
+    handler = RotatingFileHandler(path, max_bytes=4)
+    for template in ("a", "b", "c", "d", "e"):
+        handler.handle(make_record(template))
+    handler.close()
+    assert read_backups(path) == ["a\nb\n", "c\nd\n"]
+    assert path.read_text() == "e\n"
+
+
+def test_rotating_file_handler_by_time(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    now = time.time()
+    monkeypatch.setattr(logs.handlers.time, "time", lambda: now)
+    path = tmp_path / "test.log"
+    handler = RotatingFileHandler(path, interval=60)
+    handler.handle(make_record("a"))
+    handler.handle(make_record("b"))
+    now += 61
+    handler.handle(make_record("c"))
+    handler.close()
+    assert read_backups(path) == ["a\nb\n"]
+    assert path.read_text() == "c\n"
+
+
+def test_rotating_file_handler_compression_and_backup_count(tmp_path: Path):
+    path = tmp_path / "test.log"
+    handler = RotatingFileHandler(path, max_bytes=2, backup_count=2, compression="gzip")
+    for template in ("a", "b", "c", "d"):
+        handler.handle(make_record(template))
+    handler.close()
+    assert [backup.suffix for backup in sorted(tmp_path.glob("test.log.*"))] == [".gz", ".gz"]
+    assert read_backups(path) == ["b\n", "c\n"]
+    assert path.read_text() == "d\n"
+
+
+def _log_from_worker(handler: Handler, worker: int) -> None:
+    logger = Logger(f"worker{worker}")
+    logger.add_handler(handler)
+    for idx in range(200):
+        logger.info("{extra[worker]}-{extra[idx]}-" + "x" * 100, extra={"worker": worker, "idx": idx})
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="requires fork")
+def test_process_queue_listener(tmp_path: Path):
+    path = tmp_path / "test.log"
+    context = multiprocessing.get_context("fork")
+    listener = ProcessQueueListener(FileHandler(path), context=context)
+    listener.start()
+    workers = [context.Process(target=_log_from_worker, args=(listener.handler(), worker)) for worker in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(10)
+    listener.stop(timeout=10)
+    lines = path.read_text().splitlines()
+    assert sorted(lines) == sorted(f"{worker}-{idx}-" + "x" * 100 for worker in range(4) for idx in range(200))
+
+
+def test_process_queue_listener_spawn(tmp_path: Path):
+    context = multiprocessing.get_context("spawn")
+    # handlers are pickled into the listener process, which opens the files again
+    files = FileHandler(tmp_path / "test.log"), RotatingFileHandler(tmp_path / "rotating.log", max_bytes=1000)
+    # one write per record, so that the file rotates between them
+    listener = ProcessQueueListener(*files, context=context, batch_size=1)
+    listener.start()
+    worker = context.Process(target=_log_from_worker, args=(listener.handler(), 0))
+    worker.start()
+    worker.join(30)
+    listener.stop(timeout=30)
+    for handler in files:
+        handler.close()
+    assert (tmp_path / "test.log").read_text().splitlines() == [f"0-{idx}-" + "x" * 100 for idx in range(200)]
+    assert len(list(tmp_path.glob("rotating.log*"))) > 1
+
+    with pytest.raises(TypeError, match="only to stdout or stderr"):
+        pickle.dumps(StreamHandler(stream=StringIO()))
+    assert isinstance(pickle.loads(pickle.dumps(StreamHandler())).stream, type(sys.stderr))
+
+
+def test_process_queue_payloads_round_trip():
+    record = make_record("{extra[lazy]}")
+    record.extra = {"lazy": Lazy(lambda: 1), "lock": threading.Lock()}
+    decoded = _decode_record(_encode_record(record))
+    assert decoded.extra["lazy"] == 1
+    assert decoded.extra["lock"].startswith("<unlocked _thread.lock")
+    assert decoded.created_ns == record.created_ns
+    assert (decoded.template, decoded.name, decoded.level) == (record.template, record.name, record.level)
+
+
+class _Collect(Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: list[list[str]] = []
+
+    def handle(self, record: LogRecord) -> None:
+        self.batches.append([record.message])
+
+    def handle_batch(self, records) -> None:
+        self.batches.append([record.message for record in records])
+
+
+def test_ring_buffer_handler_writes_history_on_error():
+    target = _Collect()
+    logger = Logger("app")
+    logger.add_handler(RingBufferHandler(target, capacity=3))
+    for idx in range(5):
+        logger.debug(f"debug {idx}")
+    assert target.batches == []
+    logger.error("boom")
+    assert target.batches == [["debug 2", "debug 3", "debug 4", "boom"]]
+    # the history was written out with the error, it is not repeated
+    logger.info("after")
+    logger.critical("boom again")
+    assert target.batches[1] == ["after", "boom again"]
+
+
+def test_ring_buffer_handler_keys():
+    target = _Collect()
+    handler = RingBufferHandler(target, capacity=10, key=by_extra("request"))
+    root = Logger("root")
+    root.add_handler(handler)
+    for request in (1, 2):
+        with bind(root, request=request):
+            root.info("start {extra[request]}")
+    with bind(root, request=2):
+        root.error("failed {extra[request]}")
+    assert target.batches == [["start 2", "failed 2"]]
+    handler.dump()
+    assert target.batches[1] == ["start 1"]
+    handler.dump()
+    assert len(target.batches) == 2
+
+
+def test_ring_buffer_handler_bounds_keys():
+    target = _Collect()
+    handler = RingBufferHandler(target, capacity=2, max_keys=16)
+    for idx in range(1000):
+        handler.handle(LogRecord(template="test", name=f"logger{idx}", level=LogLevel.INFO, extra={}))
+    assert len(handler._buffers) <= 16
+    handler.dump()
+    assert len(target.batches[0]) <= 16
+
+
+class _SlowStream(StringIO):
+    def write(self, text: str) -> int:
+        time.sleep(0.05)
+        return super().write(text)
+
+
+def test_async_handler_does_not_block_the_loop():
+    stream = _SlowStream()
+    handler = AsyncHandler(stream)
+    logger = Logger("app")
+    logger.add_handler(handler)
+
+    async def main() -> float:
+        start = time.perf_counter()
+        for idx in range(10):
+            logger.info(f"record {idx}")
+        elapsed = time.perf_counter() - start
+        await handler.aflush()
+        return elapsed
+
+    assert asyncio.run(main()) < 0.05
+    assert stream.getvalue() == "".join(f"record {idx}\n" for idx in range(10))
+
+
+def test_async_handler_stream_writer():
+    read, write = os.pipe()
+
+    async def main() -> None:
+        loop = asyncio.get_running_loop()
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, os.fdopen(write, "wb"))
+        writer = asyncio.StreamWriter(transport, protocol, None, loop)
+        handler = AsyncHandler(writer)
+        handler.start()
+        for template in ("a", "b", "c"):
+            handler.handle(make_record(template))
+        await handler.aclose()
+        writer.close()
+
+    asyncio.run(main())
+    with os.fdopen(read, "rb") as pipe:
+        assert pipe.read() == b"a\nb\nc\n"
+
+
+class _ThreadCheckingWriter(asyncio.StreamWriter):
+    loop_thread: int
+
+    def write(self, data: bytes | bytearray | memoryview) -> None:
+        assert threading.get_ident() == self.loop_thread
+        super().write(data)
+
+
+def test_async_handler_stream_writer_from_other_threads_after_aclose():
+    read, write = os.pipe()
+    handler = None
+
+    async def main() -> None:
+        nonlocal handler
+        loop = asyncio.get_running_loop()
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, os.fdopen(write, "wb"))
+        writer = _ThreadCheckingWriter(transport, protocol, None, loop)
+        writer.loop_thread = threading.get_ident()
+        handler = AsyncHandler(writer)
+        handler.start()
+        handler.handle(make_record("started"))
+        await handler.aclose()
+        # handed to the loop, which is still running
+        await asyncio.to_thread(handler.handle, make_record("closed"))
+        await asyncio.sleep(0)
+        writer.close()
+
+    asyncio.run(main())
+    assert handler is not None
+    # the loop is closed, so there is nothing left to write with
+    thread = threading.Thread(target=handler.handle, args=(make_record("after the loop"),))
+    thread.start()
+    thread.join()
+    assert handler.dropped == 1
+    with os.fdopen(read, "rb") as pipe:
+        assert pipe.read() == b"started\nclosed\n"
+
+
+def test_async_handler_from_other_threads():
+    stream = StringIO()
+    handler = AsyncHandler(stream)
+
+    def emit(thread: int) -> None:
+        for idx in range(100):
+            handler.handle(make_record(f"{thread}-{idx}"))
+
+    async def main() -> None:
+        handler.start()
+        await asyncio.gather(*(asyncio.to_thread(emit, thread) for thread in range(4)))
+        # flush() from another thread waits for the loop to write everything
+        await asyncio.to_thread(handler.flush)
+        assert len(stream.getvalue().splitlines()) == 400
+        await handler.aclose()
+
+    asyncio.run(main())
+    lines = stream.getvalue().splitlines()
+    for thread in range(4):
+        assert [line for line in lines if line.startswith(f"{thread}-")] == [f"{thread}-{idx}" for idx in range(100)]
+
+
+def test_async_handler_outside_of_the_loop():
+    stream = StringIO()
+    handler = AsyncHandler(stream)
+    handler.handle(make_record("before"))
+
+    async def main() -> None:
+        handler.handle(make_record("during"))
+        # asyncio.run() cancels the writer task before it got to run
+
+    asyncio.run(main())
+    handler.handle(make_record("after"))
+    assert stream.getvalue() == "before\nduring\nafter\n"
+
+
+def test_async_handler_is_bounded():
+    handler = AsyncHandler(StringIO(), max_size=10)
+
+    async def main() -> None:
+        for _ in range(15):
+            handler.handle(make_record())
+        await handler.aclose()
+
+    asyncio.run(main())
+    assert handler.dropped == 5
+    handler.handle(make_record("closed"))
+    assert handler.stream.getvalue().splitlines()[-1] == "closed"
+
+
+def test_fanout_handler_formats_once_per_formatter(monkeypatch: pytest.MonkeyPatch):
+    calls = []
+    original = Formatter.format
+
+    def counting_format(self: Formatter, record: LogRecord) -> str:
+        calls.append(self.fmt)
+        return original(self, record)
+
+    monkeypatch.setattr(Formatter, "format", counting_format)
+    streams = [StringIO() for _ in range(4)]
+    first, second, third, errors = (StreamHandler(stream=stream) for stream in streams)
+    # equal templates share their output, even across formatter instances
+    first.formatter = Formatter("{level} {message}")
+    second.formatter = Formatter("{level} {message}")
+    third.formatter = Formatter("{message}")
+    errors.formatter = first.formatter
+    errors.level = FiltererLevel.ERROR
+    collect = _Collect()
+    handler = FanoutHandler([first, second, third, errors, collect])
+    handler.handle(make_record("info"))
+    handler.handle(LogRecord("error", "test", LogLevel.ERROR, {}))
+    assert calls == ["{level} {message}", "{message}"] * 2
+    assert [stream.getvalue() for stream in streams] == [
+        "INFO info\nERROR error\n",
+        "INFO info\nERROR error\n",
+        "info\nerror\n",
+        "ERROR error\n",
+    ]
+    assert collect.batches == [["info"], ["error"]]
+
+
+def test_fanout_handler_child_filters_that_change_records():
+    plain, tagged = StreamHandler(stream=StringIO()), StreamHandler(stream=StringIO())
+    tagged.formatter = plain.formatter = Formatter("{message} {extra}")
+
+    def tag(record: LogRecord) -> LogRecord:
+        record = record.copy()
+        record.extra["tagged"] = True
+        return record
+
+    tagged.add_filter(tag)
+    handler = FanoutHandler([plain, tagged])
+    handler.handle(make_record())
+    handler.handle_batch([make_record("first"), make_record("second")])
+    assert plain.stream.getvalue() == "test {}\nfirst {}\nsecond {}\n"
+    assert tagged.stream.getvalue() == "test {'tagged': True}\nfirst {'tagged': True}\nsecond {'tagged': True}\n"
+
+
+def test_fanout_handler_background_children_keep_order():
+    release = Event()
+
+    class BlockedStream(StringIO):
+        def write(self, text: str) -> int:
+            release.wait()
+            return super().write(text)
+
+    fast = StreamHandler(stream=StringIO())
+    slow = StreamHandler(stream=BlockedStream())
+    collect = _Collect()
+    handler = FanoutHandler([fast], background=[slow, collect], max_pending=50)
+    logger = Logger("app")
+    logger.add_handler(handler)
+
+    def run(thread: int) -> None:
+        for idx in range(100):
+            logger.info(f"{thread}-{idx}")
+
+    threads = [Thread(target=run, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    # the slow child holds up neither the callers nor the other children, until max_pending is reached
+    for _ in range(100):
+        if len(fast.stream.getvalue().splitlines()) >= 50:
+            break
+        time.sleep(0.01)
+    assert len(fast.stream.getvalue().splitlines()) >= 50
+    assert slow.stream.getvalue() == ""
+    release.set()
+    for thread in threads:
+        thread.join()
+    handler.flush()
+    for lines in (slow.stream.getvalue().splitlines(), [line for batch in collect.batches for line in batch]):
+        assert len(lines) == 400
+        for thread in range(4):
+            assert [line for line in lines if line.startswith(f"{thread}-")] == [
+                f"{thread}-{idx}" for idx in range(100)
+            ]
+
+    handler.close()
+    handler.handle(make_record("closed"))
+    assert slow.stream.getvalue().splitlines()[-1] == "closed"
+
+
+class _Listener:
+    """An in-process stream server that collects the bytes it receives, one connection at a time"""
+
+    def __init__(self, family: socket.AddressFamily, address: tuple[str, int] | str) -> None:
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(address)
+        self.sock.listen()
+        self.sock.settimeout(0.01)
+        self.address = self.sock.getsockname()
+        self.data = bytearray()
+        self.connections = 0
+        self._stopped = False
+        self._thread = Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self) -> None:
+        while not self._stopped:
+            try:
+                conn, _ = self.sock.accept()
+            except TimeoutError:
+                continue
+            self.connections += 1
+            conn.settimeout(0.01)
+            with conn:
+                while not self._stopped:
+                    try:
+                        chunk = conn.recv(65536)
+                    except TimeoutError:
+                        continue
+                    if not chunk:
+                        break
+                    self.data += chunk
+
+    def close(self) -> None:
+        self._stopped = True
+        self._thread.join()
+        self.sock.close()
+
+
+def _wait_until(condition: t.Callable[[], bool], timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_socket_handler_sends_batches_over_tcp():
+    listener = _Listener(socket.AF_INET, ("127.0.0.1", 0))
+    handler = SocketHandler(listener.address)
+    logger = Logger("app")
+    logger.add_handler(handler)
+    for idx in range(1000):
+        logger.info("record {extra[idx]}", extra={"idx": idx})
+    logger.log_many([make_record(f"batched {idx}") for idx in range(10)])
+    handler.flush()
+    expected = [f"record {idx}" for idx in range(1000)] + [f"batched {idx}" for idx in range(10)]
+    _wait_until(lambda: len(listener.data.splitlines()) == len(expected))
+    assert listener.data.decode().splitlines() == expected
+    assert (handler.sent, handler.dropped, handler.errors, handler.pending) == (1010, 0, 0, 0)
+    assert listener.connections == 1
+
+    handler.close()
+    handler.handle(make_record("closed"))
+    assert handler.dropped == 1
+    listener.close()
+
+
+def _frames(data: bytes) -> list[str]:
+    messages = []
+    while data:
+        (size,) = struct.unpack(">I", data[:4])
+        messages.append(data[4 : 4 + size].decode())
+        data = data[4 + size :]
+    return messages
+
+
+def test_socket_handler_reconnects_to_a_restarted_listener(tmp_path):
+    path = str(tmp_path / "log.sock")
+    listener = _Listener(socket.AF_UNIX, path)
+    handler = SocketHandler(path, framing="length", backoff=0.01, max_backoff=0.05)
+    handler.handle(make_record("multi\nline"))
+    handler.flush()
+    _wait_until(lambda: _frames(bytes(listener.data)) == ["multi\nline"])
+
+    listener.close()
+    os.unlink(path)
+    for idx in range(5):
+        handler.handle(make_record(f"after {idx}"))
+    _wait_until(lambda: handler.errors > 0)
+    listener = _Listener(socket.AF_UNIX, path)
+    _wait_until(lambda: len(_frames(bytes(listener.data))) == 5)
+    assert _frames(bytes(listener.data)) == [f"after {idx}" for idx in range(5)]
+    assert (handler.sent, handler.dropped) == (6, 0)
+    assert isinstance(handler.last_error, OSError)
+    handler.close()
+    listener.close()
+
+
+def test_socket_handler_keeps_the_newest_records_while_disconnected():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        address = sock.getsockname()
+    # 10 bytes per record: only the 5 newest fit
+    handler = SocketHandler(address, max_buffer=50, backoff=0.01, max_backoff=0.02)
+    for idx in range(20):
+        handler.handle(make_record(f"record {idx:02}"))
+    errors = handler.errors
+    # wait for an attempt that started after the last record was logged
+    _wait_until(lambda: handler.errors >= errors + 2)
+    assert (handler.sent, handler.dropped, handler.pending) == (0, 15, 5)
+    handler.flush()  # returns after a failed attempt
+
+    listener = _Listener(socket.AF_INET, address)
+    _wait_until(lambda: listener.data.count(b"\n") == 5)
+    handler.close()
+    listener.close()
+    assert listener.data.decode().splitlines() == [f"record {idx}" for idx in range(15, 20)]
+    assert (handler.sent, handler.dropped) == (5, 15)
+
+
+SYSLOG = re.compile(
+    r"<(?P<pri>\d+)>1 (?P<timestamp>\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}Z) (?P<hostname>\S+) (?P<app>\S+)"
+    r" (?P<procid>\S+) (?P<msgid>\S+) - \ufeff(?P<message>.*)",
+    re.DOTALL,
+)
+
+
+def test_syslog_handler_sends_rfc5424_datagrams():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receiver:
+        receiver.bind(("127.0.0.1", 0))
+        receiver.settimeout(5)
+        handler = SyslogHandler(
+            receiver.getsockname(), facility=SyslogFacility.LOCAL0, app_name="my app", hostname="host", max_size=200
+        )
+        logger = Logger("app.db")
+        logger.add_handler(handler)
+        logger.info("connected")
+        logger.error("failed: {extra[error]}", extra={"error": "é" * 200})
+        handler.flush()
+        messages = [SYSLOG.fullmatch(receiver.recv(65536).decode("utf-8", "replace")) for _ in range(2)]
+
+    assert messages[0] and messages[1]
+    assert messages[0]["pri"] == str(16 * 8 + 6)
+    assert messages[1]["pri"] == str(16 * 8 + 3)
+    assert (messages[0]["hostname"], messages[0]["app"], messages[0]["procid"], messages[0]["msgid"]) == (
+        "host",
+        "my_app",
+        str(os.getpid()),
+        "app.db",
+    )
+    assert messages[0]["message"] == "connected"
+    assert messages[1]["message"].startswith("failed: éé")
+    assert len(messages[1].group(0).encode()) <= 200 + 2  # cut off within the last character
+    assert handler.sent == 2
+    handler.close()
+
+
+def test_syslog_handler_resends_rejected_datagrams():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        address = sock.getsockname()
+    handler = SyslogHandler(address, backoff=0.01, max_backoff=0.02)
+    handler.handle(make_record("lost"))
+    _wait_until(lambda: handler.sent == 1)
+    # the port unreachable reply to the first datagram makes the next send fail
+    handler.handle(make_record("kept"))
+    _wait_until(lambda: handler.errors > 0)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receiver:
+        receiver.bind(address)
+        receiver.settimeout(5)
+        message = SYSLOG.fullmatch(receiver.recv(65536).decode())
+    assert message and message["message"] == "kept"
+    _wait_until(lambda: handler.pending == 0)
+    assert (handler.sent, handler.dropped) == (2, 0)
+    handler.close()
+
+
+def test_syslog_handler_unix_datagrams(tmp_path):
+    path = str(tmp_path / "log")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as receiver:
+        receiver.bind(path)
+        receiver.settimeout(5)
+        handler = SyslogHandler(path, FiltererLevel.WARNING)
+        for level in LogLevel:
+            record = make_record(str(level))
+            record.level = level
+            handler.handle(record)
+        handler.flush()
+        messages = [SYSLOG.fullmatch(receiver.recv(65536).decode()) for _ in range(3)]
+    assert [(message["pri"], message["message"]) for message in messages if message] == [
+        ("12", "WARNING"),
+        ("11", "ERROR"),
+        ("10", "CRITICAL"),
+    ]
+    handler.close()
@@ -1,6 +1,13 @@
-from datetime import datetime
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from types import SimpleNamespace
 
-from logs import LogRecord
+import pytest
+
+from logs import Formatter, Lazy, LogRecord
+from logs.formatters import JSONFormatter
 from logs.levels import LogLevel
 
 
@@ -15,3 +22,107 @@ def test_message_formatting():
         thread=0,
     )
     assert record.message == "1"
+
+
+def make_record(**kwargs) -> LogRecord:
+    return LogRecord(**{"template": "{name}", "name": "test", "level": LogLevel.INFO, "extra": {}, **kwargs})
+
+
+def test_record_has_no_dict():
+    record = make_record()
+    assert not hasattr(record, "__dict__")
+
+
+def test_created_at_is_derived_from_created_ns():
+    now = datetime(year=2021, month=9, day=1, hour=12, minute=30, second=15, microsecond=123456)
+    record = make_record(created_ns=int(now.timestamp()) * 1_000_000_000 + 123456789)
+    assert record.created_at == now
+    assert make_record(created_at=now).created_ns == record.created_ns - 789
+
+
+def test_defaults_capture_process_and_thread():
+    record = make_record()
+    assert record.process == os.getpid()
+    assert record.thread == threading.get_ident()
+    assert abs(record.created_at - datetime.now()) < timedelta(seconds=5)
+
+
+def test_message_is_cached_and_not_copied():
+    record = make_record()
+    assert record.message == "test"
+    record.name = "other"
+    assert record.message == "test"
+    copied = record.copy()
+    assert copied == record
+    assert copied.message == "other"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_pid_is_refreshed_after_fork():
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        os.write(write, str(make_record().process).encode())
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert int(os.read(read, 32)) == pid
+    os.close(read)
+    os.close(write)
+
+
+def test_lazy_extra_values_are_evaluated_once():
+    calls = []
+
+    def expensive() -> SimpleNamespace:
+        calls.append(1)
+        return SimpleNamespace(id=123)
+
+    record = make_record(template="{extra[request].id}", extra={"request": Lazy(expensive), "n": Lazy(lambda: 2.5)})
+    assert calls == []
+    assert record.message == "123"
+    assert Formatter("{extra[n]:.2f} {extra[request].id}").format(record) == "2.50 123"
+    output = json.loads(JSONFormatter(default=vars).format(record))
+    assert output["n"] == 2.5
+    assert output["request"] == {"id": 123}
+    assert calls == [1]
+
+
+def test_callable_extra_is_evaluated_on_first_access():
+    calls = []
+
+    def extra() -> dict[str, int]:
+        calls.append(1)
+        return {"key": 1}
+
+    record = make_record(extra=extra)
+    copied = record.copy()
+    assert calls == []
+    assert record.extra == {"key": 1}
+    assert copied.extra == {"key": 1}
+    assert calls == [1]
+
+
+def test_copies_do_not_share_extra():
+    passed_in = {"user": "bob", "n": 1}
+    record = make_record(extra=passed_in)
+    copied = record.copy()
+    copied.extra["user"] = "alice"
+    del copied.extra["n"]
+    record.extra["n"] = 2
+    assert passed_in == {"user": "bob", "n": 1}
+    assert record.extra == {"user": "bob", "n": 2}
+    assert copied.extra == {"user": "alice"}
+
+    copied_again = copied.copy()
+    copied_again.extra["added"] = True
+    assert copied.extra == {"user": "alice"}
+    assert copied_again.extra == {"user": "alice", "added": True}
+
+
+def test_assigning_extra_to_a_copy():
+    record = make_record(extra={"n": 1})
+    copied = record.copy()
+    replacement = {"m": 2}
+    copied.extra = replacement
+    assert copied.extra is replacement
+    assert record.extra == {"n": 1}
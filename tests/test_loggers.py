@@ -1,7 +1,15 @@
 import pytest
 
-from logs import Filter, Logger, LogRecord, get_logger, register_logger, testing
-from logs.levels import FiltererLevel
+from logs import (
+    Filter,
+    Handler,
+    Logger,
+    LogRecord,
+    get_logger,
+    register_logger,
+    testing,
+)
+from logs.levels import FiltererLevel, LogLevel
 
 
 def test_root_logger_level():
@@ -101,3 +109,154 @@ def test_propagation_middle_is_disabled():
     with testing.capture_logs(grandparent) as captured_logs:
         child.info("test")
     assert captured_logs.output == []
+
+
+def test_effective_level_inherits_from_ancestors():
+    logger = get_logger("grandparent.parent.child")
+    assert logger.effective_level == FiltererLevel.INFO
+    get_logger("").level = FiltererLevel.WARNING
+    assert logger.effective_level == FiltererLevel.WARNING
+    get_logger("grandparent").level = FiltererLevel.ERROR
+    assert logger.effective_level == FiltererLevel.ERROR
+
+
+def test_effective_level_accounts_for_handlers():
+    logger = get_logger("test")
+    root = get_logger("")
+    root.handlers[0].level = FiltererLevel.ERROR
+    assert logger.effective_level == FiltererLevel.ERROR
+    with testing.capture_logs(logger, FiltererLevel.DEBUG):
+        assert logger.effective_level == FiltererLevel.DEBUG
+    assert logger.effective_level == FiltererLevel.ERROR
+    logger.propagate = False
+    assert logger.effective_level == FiltererLevel.DISABLED
+
+
+def test_disabled_calls_do_not_create_records(monkeypatch: pytest.MonkeyPatch):
+    logger = get_logger("test")
+    created: list[LogRecord] = []
+    create_record = logger._create_record
+
+    def spy(*args, **kwargs):
+        record = create_record(*args, **kwargs)
+        created.append(record)
+        return record
+
+    monkeypatch.setattr(logger, "_create_record", spy)
+    logger.debug("debug")
+    assert created == []
+    get_logger("").level = FiltererLevel.DEBUG
+    with testing.capture_logs(logger) as captured_logs:
+        logger.debug("debug")
+    assert captured_logs.output == ["debug"]
+    assert len(created) == 1
+
+
+def test_effective_level_after_reregistering_parent():
+    child = get_logger("parent.child")
+    child.info("warm up the cache")
+    register_logger(Logger("parent", level=FiltererLevel.CRITICAL))
+    assert child.effective_level == FiltererLevel.CRITICAL
+
+
+def test_log_many():
+    parent = get_logger("parent")
+    child = get_logger("parent.child")
+    child.add_filter(not_a_filter)
+    records = [child._create_record(template, LogLevel.INFO, None) for template in ("a", "b", "c")]
+    with testing.capture_logs(parent) as parent_logs, testing.capture_logs(child) as child_logs:
+        child.log_many(records)
+        child.log_many(iter(()))
+    assert child_logs.output == ["b", "c"]
+    assert parent_logs.output == ["b", "c"]
+
+
+def test_deep_hierarchy_does_not_recurse():
+    name = ".".join(f"level{idx}" for idx in range(2000))
+    logger = get_logger(name)
+    with testing.capture_logs(get_logger("level0")) as captured_logs:
+        logger.info("deep")
+    assert captured_logs.output == ["deep"]
+
+
+def test_handlers_added_while_emitting_see_the_next_record():
+    logger = get_logger("test")
+    late = testing.CapturedRecord([], [])
+
+    class AddingHandler(Handler):
+        def handle(self, record: LogRecord) -> None:
+            logger.add_handler(testing.CapturingHandler(recorder=late))
+
+    adding = AddingHandler()
+    logger.add_handler(adding)
+    logger.info("first")
+    assert late.output == []
+    logger.remove_handler(adding)
+    logger.info("second")
+    assert late.output == ["second"]
+
+
+def test_assigning_handlers_after_logging():
+    logger = get_logger("test")
+    logger.propagate = False
+    logger.info("builds the dispatch plan")
+    captured = testing.CapturedRecord([], [])
+    logger.handlers = [testing.CapturingHandler(recorder=captured)]
+    logger.info("assigned")
+    assert captured.output == ["assigned"]
+    with pytest.raises(AttributeError):
+        logger.handlers.append(Handler())  # type: ignore[attr-defined]
+    logger.handlers = []
+    logger.info("removed")
+    assert captured.output == ["assigned"]
+
+
+def test_assigning_filters_after_logging():
+    logger = get_logger("test")
+    logger.propagate = False
+    captured = testing.CapturedRecord([], [])
+    logger.add_handler(testing.CapturingHandler(recorder=captured))
+    logger.info("a")
+    with pytest.raises(AttributeError):
+        logger.filters.append(not_a_filter)  # type: ignore[attr-defined]
+    logger.filters = [not_a_filter]
+    # filter() uses the same settings as log()
+    assert logger.filter(LogRecord("a", "test", LogLevel.INFO, {})) is None
+    logger.info("a")
+    logger.info("b")
+    assert captured.output == ["a", "b"]
+
+
+def test_logger_subclass_filter_calling_super():
+    class Tagging(Logger):
+        def filter(self, record: LogRecord) -> LogRecord | None:
+            filtered = super().filter(record)
+            if filtered is not None:
+                filtered = filtered.copy()
+                filtered.template = f"tagged {filtered.template}"
+            return filtered
+
+    logger = Tagging("tagging")
+    logger.filters = [not_a_filter]
+    captured = testing.CapturedRecord([], [])
+    logger.add_handler(testing.CapturingHandler(recorder=captured))
+    logger.info("a")
+    logger.info("b")
+    assert captured.output == ["tagged b"]
+
+
+def test_lazy_extra_is_not_evaluated_for_dropped_records():
+    logger = get_logger("test")
+    logger.add_filter(not_a_filter)
+    calls = []
+
+    def extra() -> dict[str, str]:
+        calls.append(1)
+        return {"key": "value"}
+
+    with testing.capture_logs(logger, FiltererLevel.INFO) as captured_logs:
+        logger.debug("{extra[key]}", extra=extra)
+        logger.info("a", extra=extra)
+        logger.info("{extra[key]}", extra=extra)
+    assert captured_logs.output == ["value"]
+    assert calls == [1]
@@ -0,0 +1,143 @@
+import threading
+from io import StringIO
+from typing import Iterator
+
+import pytest
+
+from logs import Logger, LogRecord, StreamHandler, metrics
+from logs.filters import SampleFilter
+from logs.handlers import RingBufferHandler
+from logs.levels import FiltererLevel, LogLevel
+
+
+@pytest.fixture(autouse=True)
+def collect() -> Iterator[None]:
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def no_secrets(record: LogRecord) -> LogRecord | None:
+    return None if "secret" in record.extra else record
+
+
+def make_tree() -> tuple[Logger, StreamHandler, StreamHandler]:
+    parent = Logger("app")
+    child = Logger("app.db")
+    child.parent = parent
+    child.add_filter(no_secrets)
+    parent_handler = StreamHandler(stream=StringIO())
+    parent_handler.level = FiltererLevel.WARNING
+    parent.add_handler(parent_handler)
+    child_handler = StreamHandler(stream=StringIO())
+    child.add_handler(child_handler)
+    return child, child_handler, parent_handler
+
+
+def test_dispatch_is_unchanged():
+    outputs = []
+    for enabled in (True, False):
+        if not enabled:
+            metrics.disable()
+        logger, child_handler, parent_handler = make_tree()
+        logger.info("info")
+        logger.warning("warning")
+        logger.error("secret", extra={"secret": 1})
+        logger.log_many([LogRecord("many", "app.db", LogLevel.ERROR, {})])
+        outputs.append((child_handler.stream.getvalue(), parent_handler.stream.getvalue()))
+    assert outputs[0] == outputs[1] == ("info\nwarning\nmany\n", "warning\nmany\n")
+
+
+def test_counts():
+    logger, child_handler, parent_handler = make_tree()
+    logger.add_filter(SampleFilter(2))
+    for _ in range(4):
+        logger.info("info")
+        logger.error("secret", extra={"secret": 1})
+    snapshot = metrics.snapshot()
+    assert snapshot.emitted == {("app.db", "INFO"): 4, ("app.db", "ERROR"): 4}
+    assert snapshot.dropped == {("app.db", "INFO"): 2, ("app.db", "ERROR"): 4}
+    child_label = child_handler._metrics_label  # type: ignore[attr-defined]
+    parent_label = parent_handler._metrics_label  # type: ignore[attr-defined]
+    assert snapshot.filter_drops == {
+        ("app.db", "no_secrets"): 4,
+        ("app.db", "SampleFilter"): 2,
+        (parent_label, "level"): 2,
+    }
+    assert snapshot.format_seconds[child_label].total == 2
+    assert snapshot.write_seconds[child_label].total == 2
+    assert snapshot.lock_wait_seconds[child_label].total == 2
+    assert parent_label not in snapshot.format_seconds
+    assert snapshot.write_seconds[child_label].sum > 0
+
+
+def test_other_handlers_are_timed_as_a_whole():
+    logger = Logger("app")
+    handler = RingBufferHandler(StreamHandler(stream=StringIO()))
+    logger.add_handler(handler)
+    logger.info("buffered")
+    snapshot = metrics.snapshot()
+    assert snapshot.write_seconds[handler._metrics_label].total == 1  # type: ignore[attr-defined]
+    assert snapshot.format_seconds == {}
+
+
+def test_threads_are_merged():
+    logger = Logger("app")
+    logger.add_handler(StreamHandler(stream=StringIO()))
+
+    def run() -> None:
+        for _ in range(100):
+            logger.info("info")
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert metrics.snapshot().emitted == {("app", "INFO"): 400}
+
+
+def test_exited_threads_are_folded():
+    logger = Logger("app")
+    logger.add_handler(StreamHandler(stream=StringIO()))
+    for _ in range(50):
+        thread = threading.Thread(target=logger.info, args=("info",))
+        thread.start()
+        thread.join()
+    # only the stores of threads that are still running are kept apart
+    assert len(metrics._collector._stores) <= 2
+    snapshot = metrics.snapshot()
+    assert snapshot.emitted == {("app", "INFO"): 50}
+    assert [histogram.total for histogram in snapshot.write_seconds.values()] == [50]
+    logger.info("info")
+    assert metrics.snapshot().emitted == {("app", "INFO"): 51}
+
+
+def test_disabled():
+    metrics.disable()
+    logger = Logger("app")
+    logger.info("info")
+    assert metrics.snapshot().emitted == {}
+
+
+def test_prometheus():
+    logger = Logger('app "quoted"')
+    handler = StreamHandler(stream=StringIO())
+    logger.add_handler(handler)
+    logger.info("info")
+    logger.info("info")
+    text = metrics.to_prometheus()
+    label = handler._metrics_label  # type: ignore[attr-defined]
+    assert 'logs_records_total{logger="app \\"quoted\\"",level="INFO"} 2\n' in text
+    assert "# TYPE logs_handler_write_seconds histogram\n" in text
+    assert f'logs_handler_write_seconds_bucket{{handler="{label}",le="+Inf"}} 2\n' in text
+    assert f'logs_handler_write_seconds_count{{handler="{label}"}} 2\n' in text
+    buckets = [
+        int(line.rsplit(" ", 1)[1])
+        for line in text.splitlines()
+        if line.startswith("logs_handler_format_seconds_bucket")
+    ]
+    assert len(buckets) == len(metrics.BUCKETS) + 1
+    assert buckets == sorted(buckets)